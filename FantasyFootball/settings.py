@@ -12,6 +12,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -82,10 +83,36 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # The MyApp/MyApi migration histories both create current_squad, so the
+        # test database is built from the models instead of by migrating
+        "TEST": {"MIGRATE": False},
     }
 }
 
 
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# 'squad_results' holds generated squads per user. It is file based so every
+# worker process on the host sees the same entries; MAX_ENTRIES caps its size.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "squad_results": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / ".cache" / "squad_results",
+        "TIMEOUT": 60 * 60 * 6,
+        "OPTIONS": {
+            "MAX_ENTRIES": 5000,
+        },
+    },
+}
+
+# Most recently used generated squads kept per user in the 'squad_results' cache
+SQUAD_RESULTS_PER_USER = 10
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -127,6 +154,35 @@ STATICFILES_DIRS = [
     BASE_DIR / "MyApp" / "static",
 ]
 
+# Wall-clock budget (ms) for squad and substitution MILP solves on the request path.
+# Requests may override it with a 'time_limit_ms' field.
+SQUAD_SOLVER_TIME_LIMIT_MS = 500
+
+# Maximum concurrent FPL API requests when importing player histories.
+FPL_FETCH_CONCURRENCY = 16
+
+# Current gameweek import: 'history' requests every player's summary, 'live'
+# reads all players from the gameweek's live endpoint plus the fixtures list.
+FPL_GAMEWEEK_IMPORT_MODE = "history"
+
+# FPL API base URL. Set the FPL_API_BASE_URL environment variable to point the
+# importers and updaters at a local stand-in (manage.py fpl_standin). Whatever
+# it serves is written to the configured database, so any other base URL is
+# refused unless FPL_API_ALLOW_CUSTOM_BASE_URL=1 is also set.
+FPL_API_BASE_URL = os.environ.get("FPL_API_BASE_URL", "https://fantasy.premierleague.com/api/")
+FPL_API_ALLOW_CUSTOM_BASE_URL = os.environ.get("FPL_API_ALLOW_CUSTOM_BASE_URL", "").lower() in ("1", "true", "yes")
+
+# On-disk FPL API response cache. Modes: 'normal' (TTL + ETag/If-Modified-Since
+# revalidation), 'replay' (recorded responses only, no network) and 'off'.
+# Per-endpoint TTLs (seconds) can be overridden with FPL_HTTP_CACHE_TTLS.
+FPL_HTTP_CACHE_DIR = BASE_DIR / ".cache" / "fpl_http"
+FPL_HTTP_CACHE_MODE = os.environ.get("FPL_HTTP_CACHE_MODE", "normal")
+
+# Pooled FPL API client shared by the steps of a refresh run: maximum open
+# connections and per-request timeout (seconds).
+FPL_HTTP_POOL_SIZE = 20
+FPL_HTTP_TIMEOUT = 30
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
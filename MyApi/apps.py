@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class MyapiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "MyApi"
+
+    def ready(self):
+        from MyApi.utils.dataset_version import connect_signals
+
+        connect_signals()
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MyApi', '0012_playerfixture_projected_points'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SquadRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.IntegerField(db_index=True)),
+                ('squad_hash', models.CharField(max_length=64)),
+                ('dataset_version', models.CharField(max_length=255)),
+                ('package_budget', models.FloatField()),
+                ('individual_budget', models.FloatField()),
+                ('max_recommendations', models.IntegerField(default=4)),
+                ('package_data', models.TextField(default='{}')),
+                ('individual_data', models.TextField(default='{}')),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='squad_recommendations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'squad_recommendations',
+                'ordering': ['user', 'week'],
+                'unique_together': {('user', 'week')},
+            },
+        ),
+    ]
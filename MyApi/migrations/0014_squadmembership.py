@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MyApi', '0013_squadrecommendation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SquadMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.IntegerField()),
+                ('player_name', models.CharField(max_length=200)),
+                ('slot', models.CharField(max_length=20)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='squad_memberships', to=settings.AUTH_USER_MODEL)),
+                ('user_squad', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='MyApi.usersquad')),
+            ],
+            options={
+                'db_table': 'squad_membership',
+                'ordering': ['week', 'user', 'slot'],
+                'indexes': [models.Index(fields=['week', 'player_name'], name='squad_membe_week_cd0d98_idx'), models.Index(fields=['user', 'week'], name='squad_membe_user_id_553b67_idx')],
+                'unique_together': {('user_squad', 'player_name')},
+            },
+        ),
+    ]
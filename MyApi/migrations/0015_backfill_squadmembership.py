@@ -0,0 +1,60 @@
+import json
+
+from django.db import migrations
+
+
+# Copy of SquadMembership.SLOTS / SLOT_ALIASES (historical models have no methods)
+SLOTS = ('goalkeepers', 'defenders', 'midfielders', 'forwards')
+SLOT_ALIASES = {
+    'keeper': 'goalkeepers', 'goalkeeper': 'goalkeepers', 'gkp': 'goalkeepers', 'gk': 'goalkeepers',
+    'defender': 'defenders', 'def': 'defenders',
+    'midfielder': 'midfielders', 'mid': 'midfielders',
+    'attacker': 'forwards', 'forward': 'forwards', 'fwd': 'forwards',
+}
+
+
+def normalize_slot(value):
+    value = str(value or '').strip().lower()
+    return value if value in SLOTS else SLOT_ALIASES.get(value, '')
+
+
+def backfill_memberships(apps, schema_editor):
+    UserSquad = apps.get_model('MyApi', 'UserSquad')
+    SquadMembership = apps.get_model('MyApi', 'SquadMembership')
+    rows = []
+    for user_squad in UserSquad.objects.all().iterator():
+        try:
+            squad = json.loads(user_squad.squad_data) if user_squad.squad_data else {}
+        except ValueError:
+            continue
+        if isinstance(squad, dict):
+            entries = [(slot, player) for slot, players in squad.items() if isinstance(players, list) for player in players]
+        elif isinstance(squad, list):
+            entries = [(player.get('position', '') if isinstance(player, dict) else '', player) for player in squad]
+        else:
+            entries = []
+        seen = set()
+        for slot, player in entries:
+            name = player.get('name') if isinstance(player, dict) else None
+            if name and name not in seen:
+                seen.add(name)
+                rows.append(SquadMembership(
+                    user_squad_id=user_squad.id, user_id=user_squad.user_id,
+                    week=user_squad.week, player_name=name, slot=normalize_slot(slot)
+                ))
+    SquadMembership.objects.bulk_create(rows, batch_size=1000)
+
+
+def clear_memberships(apps, schema_editor):
+    apps.get_model('MyApi', 'SquadMembership').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("MyApi", "0014_squadmembership"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_memberships, clear_memberships),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MyApi', '0015_backfill_squadmembership'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='squadrecommendation',
+            name='captaincy_data',
+            field=models.TextField(default='{}'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MyApi', '0016_squadrecommendation_captaincy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='player',
+            name='fpl_id',
+            field=models.IntegerField(blank=True, db_index=True, help_text='FPL element id', null=True),
+        ),
+        migrations.AddField(
+            model_name='playerfixture',
+            name='fpl_id',
+            field=models.IntegerField(blank=True, db_index=True, help_text='FPL element id', null=True),
+        ),
+        migrations.AddField(
+            model_name='playermatch',
+            name='fpl_id',
+            field=models.IntegerField(blank=True, db_index=True, help_text='FPL element id', null=True),
+        ),
+        migrations.AddField(
+            model_name='projectedpoints',
+            name='fpl_id',
+            field=models.IntegerField(blank=True, db_index=True, help_text='FPL element id', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['week', 'fpl_id'], name='players_week_dd713a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerfixture',
+            index=models.Index(fields=['fpl_id', 'gameweek'], name='player_fixt_fpl_id_0a8c51_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playermatch',
+            index=models.Index(fields=['fpl_id', 'date'], name='player_matc_fpl_id_78d9b8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectedpoints',
+            index=models.Index(fields=['fpl_id', 'gameweek'], name='projected_p_fpl_id_546546_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:10
+
+from django.db import migrations, models
+
+
+def create_counter(apps, schema_editor):
+    DatasetVersion = apps.get_model('MyApi', 'DatasetVersion')
+    DatasetVersion.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MyApi', '0017_fpl_element_ids'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'dataset_version',
+            },
+        ),
+        migrations.RunPython(create_counter, migrations.RunPython.noop),
+    ]
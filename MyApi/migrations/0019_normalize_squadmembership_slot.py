@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+# Copy of SquadMembership.SLOTS / SLOT_ALIASES (historical models have no methods)
+SLOTS = ('goalkeepers', 'defenders', 'midfielders', 'forwards')
+SLOT_ALIASES = {
+    'keeper': 'goalkeepers', 'goalkeeper': 'goalkeepers', 'gkp': 'goalkeepers', 'gk': 'goalkeepers',
+    'defender': 'defenders', 'def': 'defenders',
+    'midfielder': 'midfielders', 'mid': 'midfielders',
+    'attacker': 'forwards', 'forward': 'forwards', 'fwd': 'forwards',
+}
+
+
+def normalize_slot(value):
+    value = str(value or '').strip().lower()
+    return value if value in SLOTS else SLOT_ALIASES.get(value, '')
+
+
+def normalize_slots(apps, schema_editor):
+    """Rewrite slots stored as position names (e.g. 'Keeper') before 0015 normalized them."""
+    SquadMembership = apps.get_model('MyApi', 'SquadMembership')
+    stored = SquadMembership.objects.exclude(slot__in=SLOTS).values_list('slot', flat=True).distinct()
+    for slot in list(stored):
+        normalized = normalize_slot(slot)
+        if normalized != slot:
+            SquadMembership.objects.filter(slot=slot).update(slot=normalized)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("MyApi", "0018_dataset_version"),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_slots, migrations.RunPython.noop),
+    ]
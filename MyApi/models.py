@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 import json
 
 class Team(models.Model):
@@ -23,6 +23,7 @@ class PlayerMatch(models.Model):
     This replaces the individual CSV files in elo_data folder.
     """
     player_name = models.CharField(max_length=200, db_index=True)
+    fpl_id = models.IntegerField(null=True, blank=True, db_index=True, help_text="FPL element id")
     season = models.CharField(max_length=20)  # e.g., "2022-2023"
     date = models.DateField()
     competition = models.CharField(max_length=100)  # Premier League, Champions League, etc.
@@ -52,6 +53,7 @@ class PlayerMatch(models.Model):
         # Add indexes for common queries
         indexes = [
             models.Index(fields=['player_name', 'date']),
+            models.Index(fields=['fpl_id', 'date']),
             models.Index(fields=['player_name', 'season']),
             models.Index(fields=['date', 'competition']),
             models.Index(fields=['player_name', 'elo_after_match']),
@@ -150,6 +152,7 @@ class Player(models.Model):
     ]
     
     name = models.CharField(max_length=200, db_index=True)
+    fpl_id = models.IntegerField(null=True, blank=True, db_index=True, help_text="FPL element id")
     position = models.CharField(max_length=20, choices=POSITION_CHOICES, db_index=True)
     elo = models.FloatField(help_text="Player's Elo rating")
     cost = models.FloatField(help_text="Player's cost in millions")
@@ -169,6 +172,7 @@ class Player(models.Model):
         # Add index for common queries
         indexes = [
             models.Index(fields=['week', 'position']),
+            models.Index(fields=['week', 'fpl_id']),
             models.Index(fields=['week', 'elo']),
             models.Index(fields=['position', 'elo']),
         ]
@@ -216,15 +220,23 @@ class CurrentSquad(models.Model):
     def squad(self):
         """
         Get the squad data as a Python dictionary.
+        The parsed value is memoized until squad_data changes and returned
+        as-is: callers that modify it must assign it back through the setter.
         """
+        cached = getattr(self, '_squad_cache', None)
+        if cached is not None and cached[0] is self.squad_data:
+            return cached[1]
         if self.squad_data:
-            return json.loads(self.squad_data)
-        return {
-            "goalkeepers": [],
-            "defenders": [],
-            "midfielders": [],
-            "forwards": []
-        }
+            value = json.loads(self.squad_data)
+        else:
+            value = {
+                "goalkeepers": [],
+                "defenders": [],
+                "midfielders": [],
+                "forwards": []
+            }
+        self._squad_cache = (self.squad_data, value)
+        return value
     
     @squad.setter
     def squad(self, value):
@@ -232,6 +244,7 @@ class CurrentSquad(models.Model):
         Set the squad data from a Python dictionary.
         """
         self.squad_data = json.dumps(value)
+        self._squad_cache = (self.squad_data, value)
     
     def initialize_default_squad(self):
         """
@@ -376,39 +389,49 @@ class CurrentSquad(models.Model):
         """
         Refresh existing squad data to include full player information (elo, cost, team).
         This is useful for updating squads that only have player names.
+        Missing players are loaded with one query for the current week plus one
+        fallback query for players not found in that week.
         """
-        from MyApi.models import SystemSettings
-        settings = SystemSettings.get_settings()
-        current_week = settings.current_gameweek
-        
         current_squad = self.squad
         
+        # Collect squad members missing elo or cost data
+        to_refresh = []
         for position in ['goalkeepers', 'defenders', 'midfielders', 'forwards']:
             if position in current_squad:
                 for i, player_data in enumerate(current_squad[position]):
                     if isinstance(player_data, dict) and 'name' in player_data:
-                        player_name = player_data['name']
-                        
-                        # Skip if already has elo and cost data
                         if 'elo' in player_data and 'cost' in player_data:
                             continue
-                        
-                        # Fetch full player data
-                        try:
-                            player = Player.objects.filter(name=player_name, week=current_week).first()
-                            if not player:
-                                player = Player.objects.filter(name=player_name).order_by('-week').first()
-                            
-                            if player:
-                                current_squad[position][i] = {
-                                    "name": player_name,
-                                    "elo": float(player.elo),
-                                    "cost": float(player.cost),
-                                    "team": player.team or "",
-                                    "position": player.position
-                                }
-                        except Exception as e:
-                            print(f"Error refreshing data for {player_name}: {e}")
+                        to_refresh.append((position, i, player_data['name']))
+        if not to_refresh:
+            return
+        
+        from MyApi.models import SystemSettings
+        settings = SystemSettings.get_settings()
+        current_week = settings.current_gameweek
+        
+        names = {name for _, _, name in to_refresh}
+        try:
+            players = {p.name: p for p in Player.objects.filter(name__in=names, week=current_week)}
+            missing = names - set(players)
+            if missing:
+                # Fallback to each player's latest week
+                for player in Player.objects.filter(name__in=missing).order_by('name', '-week'):
+                    players.setdefault(player.name, player)
+        except Exception as e:
+            print(f"Error refreshing squad data: {e}")
+            return
+        
+        for position, i, player_name in to_refresh:
+            player = players.get(player_name)
+            if player:
+                current_squad[position][i] = {
+                    "name": player_name,
+                    "elo": float(player.elo),
+                    "cost": float(player.cost),
+                    "team": player.team or "",
+                    "position": player.position
+                }
         
         self.squad = current_squad
         self.save()
@@ -495,6 +518,7 @@ class PlayerFixture(models.Model):
     Used for projecting points for next 3 games.
     """
     player_name = models.CharField(max_length=200, db_index=True)
+    fpl_id = models.IntegerField(null=True, blank=True, db_index=True, help_text="FPL element id")
     team = models.CharField(max_length=100)  # Player's team
     gameweek = models.IntegerField(db_index=True)  # FPL gameweek number
     opponent = models.CharField(max_length=100)  # Opposition team
@@ -512,6 +536,7 @@ class PlayerFixture(models.Model):
         unique_together = ['player_name', 'gameweek', 'opponent']
         indexes = [
             models.Index(fields=['player_name', 'gameweek']),
+            models.Index(fields=['fpl_id', 'gameweek']),
             models.Index(fields=['gameweek', 'team']),
             models.Index(fields=['fixture_date']),
         ]
@@ -528,6 +553,7 @@ class ProjectedPoints(models.Model):
     Uses the same expected points formula as ELO calculator.
     """
     player_name = models.CharField(max_length=200, db_index=True)
+    fpl_id = models.IntegerField(null=True, blank=True, db_index=True, help_text="FPL element id")
     gameweek = models.IntegerField(db_index=True)
     opponent = models.CharField(max_length=100)
     is_home = models.BooleanField(default=True)
@@ -555,6 +581,7 @@ class ProjectedPoints(models.Model):
         unique_together = ['player_name', 'gameweek', 'opponent']
         indexes = [
             models.Index(fields=['player_name', 'gameweek']),
+            models.Index(fields=['fpl_id', 'gameweek']),
             models.Index(fields=['gameweek']),
             models.Index(fields=['expected_points']),
             models.Index(fields=['adjusted_expected_points']),
@@ -653,3 +680,145 @@ class UserSquad(models.Model):
     @squad.setter
     def squad(self, value):
         self.squad_data = json.dumps(value)
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.sync_memberships()
+
+    def membership_rows(self):
+        """
+        (slot, player_name) pairs in the squad, accepting grouped dicts and legacy flat lists.
+        Slots are normalized to the squad keys (see SquadMembership.normalize_slot).
+        """
+        squad = self.squad
+        if isinstance(squad, dict):
+            entries = [(slot, player) for slot, players in squad.items() if isinstance(players, list) for player in players]
+        elif isinstance(squad, list):
+            entries = [(player.get('position', '') if isinstance(player, dict) else '', player) for player in squad]
+        else:
+            entries = []
+        rows = []
+        seen = set()
+        for slot, player in entries:
+            name = player.get('name') if isinstance(player, dict) else None
+            if name and name not in seen:
+                seen.add(name)
+                rows.append((SquadMembership.normalize_slot(slot), name))
+        return rows
+
+    def sync_memberships(self):
+        """
+        Rewrite this squad's SquadMembership rows from squad_data.
+        """
+        self.memberships.all().delete()
+        SquadMembership.objects.bulk_create([
+            SquadMembership(user_squad=self, user_id=self.user_id, week=self.week, player_name=name, slot=slot)
+            for slot, name in self.membership_rows()
+        ])
+
+
+class SquadMembership(models.Model):
+    """
+    Normalized (user, week, player, slot) rows mirroring UserSquad.squad_data.
+    Kept in sync on every UserSquad save so ownership queries are indexed SQL aggregates.
+    """
+    user_squad = models.ForeignKey(UserSquad, on_delete=models.CASCADE, related_name='memberships')
+    user = models.ForeignKey('auth.User', on_delete=models.CASCADE, related_name='squad_memberships')
+    week = models.IntegerField()
+    player_name = models.CharField(max_length=200)
+    slot = models.CharField(max_length=20)  # goalkeepers, defenders, midfielders, forwards
+
+    SLOTS = ('goalkeepers', 'defenders', 'midfielders', 'forwards')
+    # Position names used by flat squad lists, Player.position and the frontend
+    SLOT_ALIASES = {
+        'keeper': 'goalkeepers', 'goalkeeper': 'goalkeepers', 'gkp': 'goalkeepers', 'gk': 'goalkeepers',
+        'defender': 'defenders', 'def': 'defenders',
+        'midfielder': 'midfielders', 'mid': 'midfielders',
+        'attacker': 'forwards', 'forward': 'forwards', 'fwd': 'forwards',
+    }
+
+    class Meta:
+        db_table = 'squad_membership'
+        unique_together = ('user_squad', 'player_name')
+        indexes = [
+            models.Index(fields=['week', 'player_name']),
+            models.Index(fields=['user', 'week']),
+        ]
+        ordering = ['week', 'user', 'slot']
+
+    def __str__(self):
+        return f"{self.player_name} ({self.slot}) - user {self.user_id} GW{self.week}"
+
+    @classmethod
+    def normalize_slot(cls, value):
+        """The squad key ('goalkeepers', ...) for a squad key or position name, '' if unknown."""
+        value = str(value or '').strip().lower()
+        if value in cls.SLOTS:
+            return value
+        return cls.SLOT_ALIASES.get(value, '')
+
+
+class DatasetVersion(models.Model):
+    """
+    Single-row counter advanced on every write to player, projection, fixture
+    or Elo data, so cached results can be validated with one primary-key read.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'dataset_version'
+
+    def __str__(self):
+        return f"Dataset version {self.version}"
+
+
+class SquadRecommendation(models.Model):
+    """
+    Precomputed substitute recommendations and captain picks for a user's squad.
+    Results are valid while the squad hash and dataset version still match.
+    """
+    user = models.ForeignKey('auth.User', on_delete=models.CASCADE, related_name='squad_recommendations')
+    week = models.IntegerField(db_index=True)
+    squad_hash = models.CharField(max_length=64)
+    dataset_version = models.CharField(max_length=255)
+    package_budget = models.FloatField()
+    individual_budget = models.FloatField()
+    max_recommendations = models.IntegerField(default=4)
+    package_data = models.TextField(default='{}')  # Store JSON data as text
+    individual_data = models.TextField(default='{}')  # Store JSON data as text
+    captaincy_data = models.TextField(default='{}')  # Store JSON data as text
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'squad_recommendations'
+        unique_together = ('user', 'week')
+        ordering = ['user', 'week']
+
+    def __str__(self):
+        return f"{self.user.username} - GW{self.week} recommendations"
+
+    @property
+    def package(self):
+        return json.loads(self.package_data) if self.package_data else {}
+
+    @package.setter
+    def package(self, value):
+        self.package_data = json.dumps(value)
+
+    @property
+    def individual(self):
+        return json.loads(self.individual_data) if self.individual_data else {}
+
+    @individual.setter
+    def individual(self, value):
+        self.individual_data = json.dumps(value)
+
+    @property
+    def captaincy(self):
+        return json.loads(self.captaincy_data) if self.captaincy_data else {}
+
+    @captaincy.setter
+    def captaincy(self, value):
+        self.captaincy_data = json.dumps(value)
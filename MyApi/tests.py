@@ -1,3 +1,619 @@
-from django.test import TestCase
+import asyncio
+import importlib
+import json
+import tempfile
+import threading
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+import aiohttp
+import numpy as np
+import pandas as pd
+import pulp
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from MyApi.models import (
+    CurrentSquad, Player, PlayerFixture, PlayerMatch, SquadMembership, SquadRecommendation, SystemSettings, UserSquad,
+)
+from MyApi.utils import player_match_upsert
+from MyApi.utils.anytime_solver import greedy_lineup, relaxation_bound, solve_with_time_limit
+from MyApi.utils.backtester import SeasonReplay, run_backtest
+from MyApi.utils.batch_recommendations import get_stored_recommendation, squad_hash
+from MyApi.utils.dataset_version import bump_dataset_version, get_dataset_version
+from MyApi.utils.fpl_identity import build_fpl_id_index, link_fpl_ids
+from MyApi.utils.fpl_http_cache import CachingSession, fetch_json, get_ttl
+from MyApi.utils.full_squad_optimizer import prune_dominated_players, select_full_squads
+from MyApi.utils.generate_squads import SquadSelector
+from MyApi.utils.player_history_fetcher import fetch_player_summaries
+from MyApi.utils.player_match_upsert import upsert_player_matches
+from MyApi.utils.player_pool import get_player_pool
+from MyApi.utils.recommend_substitutes import (
+    CandidateIndex, find_cheaper_similar_players, prune_dominated_candidates, prune_substitute_pool,
+)
+from MyApi.utils.squad_store import get_squad, store_squad, store_squads
+from MyApi.utils.transfer_planner import lineup_points, plan_transfers
+
+
+class CurrentSquadCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('manager')
+        self.current_squad = CurrentSquad.objects.create(user=self.user)
+
+    def test_getter_memoizes_until_squad_data_changes(self):
+        self.current_squad.squad_data = json.dumps({'goalkeepers': [{'name': 'Keeper A'}]})
+        first = self.current_squad.squad
+        self.assertIs(self.current_squad.squad, first)
+
+        self.current_squad.squad_data = json.dumps({'goalkeepers': [{'name': 'Keeper B'}]})
+        self.assertEqual(self.current_squad.squad['goalkeepers'], [{'name': 'Keeper B'}])
+
+    def test_setter_stores_json_and_caches_value(self):
+        squad = {'goalkeepers': [{'name': 'Keeper A'}], 'defenders': [], 'midfielders': [], 'forwards': []}
+        self.current_squad.squad = squad
+        self.assertIs(self.current_squad.squad, squad)
+        self.assertEqual(json.loads(self.current_squad.squad_data), squad)
+
+    def test_add_and_remove_player_persist(self):
+        self.current_squad.squad = {'goalkeepers': [], 'defenders': [], 'midfielders': [], 'forwards': []}
+        self.current_squad.add_player('goalkeepers', 'Keeper A')
+        reloaded = CurrentSquad.objects.get(pk=self.current_squad.pk)
+        self.assertEqual([p['name'] for p in reloaded.squad['goalkeepers']], ['Keeper A'])
+
+        reloaded.remove_player('goalkeepers', 'Keeper A')
+        self.assertEqual(CurrentSquad.objects.get(pk=self.current_squad.pk).squad['goalkeepers'], [])
+
+    def test_refresh_squad_data_fills_player_details(self):
+        week = SystemSettings.get_settings().current_gameweek
+        Player.objects.create(name='Keeper A', position='Keeper', elo=1500, cost=5.0, week=week, team='Arsenal')
+        self.current_squad.squad = {'goalkeepers': [{'name': 'Keeper A'}], 'defenders': [], 'midfielders': [], 'forwards': []}
+        self.current_squad.refresh_squad_data()
+
+        keeper = CurrentSquad.objects.get(pk=self.current_squad.pk).squad['goalkeepers'][0]
+        self.assertEqual((keeper['elo'], keeper['cost'], keeper['team']), (1500.0, 5.0, 'Arsenal'))
+
+
+class DatasetVersionTests(TestCase):
+    def test_player_save_and_bump_advance_version(self):
+        before = get_dataset_version(1)
+        player = Player.objects.create(name='Keeper A', position='Keeper', elo=1500, cost=5.0, week=1)
+        after_save = get_dataset_version(1)
+        self.assertNotEqual(before, after_save)
+
+        Player.objects.filter(pk=player.pk).update(cost=5.5)
+        self.assertEqual(get_dataset_version(1), after_save)
+        bump_dataset_version()
+        self.assertNotEqual(get_dataset_version(1), after_save)
+
+    def test_version_read_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            get_dataset_version(1)
+
+    def test_player_pool_rebuilt_after_write(self):
+        Player.objects.create(name='Keeper A', position='Keeper', elo=1500, cost=5.0, week=1, team='Arsenal')
+        PlayerFixture.objects.create(player_name='Keeper A', team='Arsenal', gameweek=901, opponent='Chelsea',
+                                     projected_points=4.0)
+        pool = get_player_pool(901, week=1)
+        self.assertIs(get_player_pool(901, week=1), pool)
+
+        PlayerFixture.objects.create(player_name='Keeper A', team='Arsenal', gameweek=901, opponent='Spurs',
+                                     projected_points=3.0)
+        rebuilt = get_player_pool(901, week=1)
+        self.assertIsNot(rebuilt, pool)
+        self.assertEqual(rebuilt.points.tolist(), [7.0])
+
+
+class StoredRecommendationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('manager')
+        self.squad = {'goalkeepers': [{'name': 'Keeper A', 'cost': 5.0}], 'defenders': [], 'midfielders': [],
+                      'forwards': []}
+        week = SystemSettings.get_settings().current_gameweek
+        self.stored = SquadRecommendation.objects.create(
+            user=self.user, week=3, squad_hash=squad_hash(self.squad), dataset_version=get_dataset_version(week),
+            package_budget=0.0, individual_budget=0.0,
+        )
+
+    def test_lookup_uses_constant_queries(self):
+        with self.assertNumQueries(3):
+            self.assertEqual(get_stored_recommendation(self.user, 3, self.squad), self.stored)
+
+    def test_invalidated_by_squad_edit_and_data_write(self):
+        edited = dict(self.squad, defenders=[{'name': 'Defender A'}])
+        self.assertIsNone(get_stored_recommendation(self.user, 3, edited))
+
+        bump_dataset_version()
+        self.assertIsNone(get_stored_recommendation(self.user, 3, self.squad))
+
+
+def match_row(**overrides):
+    row = {
+        'player_name': 'Forward A', 'fpl_id': 10, 'season': '2024-2025', 'date': date(2024, 8, 17),
+        'competition': 'Premier League', 'round_info': 'Matchweek 1', 'opponent': 'Chelsea',
+        'result': 'W 2-0', 'minutes_played': 90, 'goals': 1, 'points': 8, 'elo_after_match': 1210.0,
+    }
+    row.update(overrides)
+    return row
+
+
+class PlayerMatchUpsertTests(TestCase):
+    def test_insert_update_and_unchanged(self):
+        self.assertEqual(upsert_player_matches([match_row()])['inserted'], 1)
+        self.assertEqual(upsert_player_matches([match_row()])['unchanged'], 1)
+
+        result = upsert_player_matches([match_row(goals=2, elo_after_match=1300.0)])
+        self.assertEqual(result['updated'], 1)
+        stored = PlayerMatch.objects.get()
+        self.assertEqual((stored.goals, stored.elo_after_match), (2, 1210.0))
+
+    def test_rejects_rows_missing_unique_fields(self):
+        result = upsert_player_matches([match_row(opponent=''), match_row()])
+        self.assertEqual((result['inserted'], result['rejected']), (1, 1))
+        self.assertIn('missing opponent', result['rejections'][0])
+
+    def test_never_unlinks_a_linked_match(self):
+        upsert_player_matches([match_row()])
+        upsert_player_matches([match_row(fpl_id=None, goals=3)])
+        stored = PlayerMatch.objects.get()
+        self.assertEqual((stored.fpl_id, stored.goals), (10, 3))
+
+    def test_concurrent_insert_is_updated_not_failed(self):
+        load_existing = player_match_upsert._load_existing
+
+        def load_then_race(rows, chunk_size):
+            loaded = load_existing(rows, chunk_size)
+            PlayerMatch.objects.create(**match_row(goals=0, elo_after_match=1100.0))
+            return loaded
+
+        with mock.patch.object(player_match_upsert, '_load_existing', load_then_race):
+            upsert_player_matches([match_row(goals=2)])
+
+        stored = PlayerMatch.objects.get()
+        self.assertEqual((stored.goals, stored.elo_after_match), (2, 1100.0))
+
+
+def knapsack():
+    values, weights = [5, 4, 3, 7], [4, 3, 2, 5]
+    picks = [pulp.LpVariable(f"pick_{i}", cat='Binary') for i in range(len(values))]
+    prob = pulp.LpProblem('knapsack', pulp.LpMaximize)
+    prob += pulp.lpSum(v * x for v, x in zip(values, picks))
+    prob += pulp.lpSum(w * x for w, x in zip(weights, picks)) <= 9
+    return prob, picks
+
+
+class AnytimeSolverTests(SimpleTestCase):
+    def test_small_problem_is_proven_optimal(self):
+        prob, _ = knapsack()
+        result = solve_with_time_limit(prob, 5000)
+        self.assertEqual((result['status'], result['objective'], result['optimality_gap']), ('optimal', 12, 0.0))
+        self.assertFalse(result['timed_out'])
+
+    def test_relaxation_bound_restores_problem(self):
+        prob, picks = knapsack()
+        solve_with_time_limit(prob, 5000)
+        values = [x.varValue for x in picks]
+
+        bound = relaxation_bound(prob, 5000)
+        self.assertGreaterEqual(bound, 12)
+        self.assertEqual([x.cat for x in picks], [pulp.LpInteger] * len(picks))
+        self.assertEqual([x.varValue for x in picks], values)
+        self.assertEqual(prob.sol_status, pulp.LpSolutionOptimal)
+
+    def test_bound_gets_only_the_remaining_budget(self):
+        prob, _ = knapsack()
+        with mock.patch.object(pulp.LpProblem, 'solve', autospec=True) as solve, \
+                mock.patch('MyApi.utils.anytime_solver.relaxation_bound', return_value=None) as bound:
+            def feasible(problem, solver):
+                problem.status, problem.sol_status = pulp.LpStatusNotSolved, pulp.LpSolutionIntegerFeasible
+            solve.side_effect = feasible
+            result = solve_with_time_limit(prob, 200)
+
+        self.assertEqual(result['status'], 'feasible')
+        self.assertLessEqual(bound.call_args[0][1], 200)
+
+    def test_greedy_lineup_respects_budget_and_club_limit(self):
+        squad_df = pd.DataFrame([
+            ('Keeper A', 'Keeper', 'Arsenal', 5.0, 6.0),
+            ('Keeper B', 'Keeper', 'Chelsea', 4.0, 3.0),
+            ('Defender A', 'Defender', 'Arsenal', 6.0, 7.0),
+            ('Defender B', 'Defender', 'Chelsea', 4.5, 4.0),
+            ('Defender C', 'Defender', 'Spurs', 4.0, 2.0),
+        ], columns=['Player', 'Position', 'Team', 'Cost', 'Points'])
+        counts = {'keeper': 1, 'defender': 2, 'midfielder': 0, 'attacker': 0}
+
+        selected = squad_df.loc[greedy_lineup(squad_df, 'Points', counts, 15.0, max_per_club=1), 'Player']
+        self.assertEqual(sorted(selected), ['Defender B', 'Defender C', 'Keeper A'])
+        self.assertEqual(greedy_lineup(squad_df, 'Points', counts, 10.0), [])
+
+
+@override_settings(
+    CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'squad_results': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'squad-store-tests'},
+    },
+    SQUAD_RESULTS_PER_USER=3,
+)
+class SquadStoreTests(SimpleTestCase):
+    def test_least_recently_used_squad_is_evicted(self):
+        store_squads('user:1', {1: 'one', 2: 'two', 3: 'three'})
+        self.assertEqual(get_squad('user:1', 1), 'one')
+        store_squad('user:1', 4, 'four')
+
+        self.assertIsNone(get_squad('user:1', 3))
+        self.assertEqual([get_squad('user:1', n) for n in (1, 2, 4)], ['one', 'two', 'four'])
+        self.assertIsNone(get_squad('user:2', 1))
+
+    def test_concurrent_stores_keep_index_consistent(self):
+        threads = [threading.Thread(target=store_squad, args=('user:1', n, n)) for n in range(1, 9)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stored = [n for n in range(1, 9) if get_squad('user:1', n) is not None]
+        self.assertEqual(len(stored), 3)
+
+
+class FakeResponse:
+    def __init__(self, status, body, headers=None):
+        self.status, self.body, self.headers = status, body, headers or {}
+        self.request_info, self.history = None, ()
+
+    async def text(self):
+        return self.body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """Replays (status, body, headers) replies in order and records request headers."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append(headers or {})
+        return FakeResponse(*self.replies.pop(0))
+
+
+class FPLHttpCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_override = override_settings(FPL_HTTP_CACHE_DIR=directory.name, FPL_HTTP_CACHE_MODE='normal')
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def fetch(self, session, url):
+        return asyncio.run(fetch_json(CachingSession(session), url))
+
+    def test_player_summaries_are_always_revalidated(self):
+        url = 'https://fantasy.premierleague.com/api/element-summary/1/'
+        self.assertEqual(get_ttl(url), 0)
+        session = FakeSession([(200, '{"history": []}', {'ETag': '"v1"'}), (304, '', {})])
+
+        self.assertEqual(self.fetch(session, url), {'history': []})
+        self.assertEqual(self.fetch(session, url), {'history': []})
+        self.assertEqual(session.requests[1].get('If-None-Match'), '"v1"')
+
+    def test_error_replies_raise_and_are_not_cached(self):
+        url = 'https://fantasy.premierleague.com/api/fixtures/'
+        session = FakeSession([(404, '{"detail": "Not found."}', {}), (200, '[]', {})])
+
+        with self.assertRaises(aiohttp.ClientResponseError):
+            self.fetch(session, url)
+        self.assertEqual(self.fetch(session, url), [])
+        self.assertEqual(len(session.requests), 2)
+
+
+class FPLRetryTests(SimpleTestCase):
+    def run_session(self, replies, retries, url='https://fantasy.premierleague.com/api/fixtures/'):
+        raw = FakeSession(replies)
+        session = CachingSession(raw, mode='off', retries=retries, backoff=0)
+        return raw, session, asyncio.run(fetch_json(session, url))
+
+    def test_server_errors_and_rate_limit_pages_are_retried(self):
+        raw, session, data = self.run_session([(503, '', {}), (200, '<html>slow down</html>', {}), (200, '[]', {})], 2)
+        self.assertEqual(data, [])
+        self.assertEqual((len(raw.requests), session.stats['retries']), (3, 2))
+
+    def test_player_summaries_use_the_session_retry_policy_only(self):
+        raw = FakeSession([(500, '', {}), (500, '', {}), (200, '{"history": []}', {})])
+        fpl = mock.Mock(session=CachingSession(raw, mode='off', retries=1, backoff=0))
+        players = [mock.Mock(id=1), mock.Mock(id=2)]
+
+        async def run():
+            queue = asyncio.Queue()
+            summary = await fetch_player_summaries(fpl, players, queue, concurrency=1)
+            items = []
+            while (item := queue.get_nowait()) is not None:
+                items.append(item)
+            return summary, items
+
+        summary, items = asyncio.run(run())
+        self.assertEqual(len(raw.requests), 3)
+        self.assertEqual((summary['requests'], summary['retries'], summary['failures']), (2, 1, 1))
+        self.assertIsInstance(items[0][2], aiohttp.ClientResponseError)
+        self.assertEqual(items[1][1], {'history': []})
+
+
+SQUAD_GROUPS = {'goalkeepers': 'Keeper', 'defenders': 'Defender', 'midfielders': 'Midfielder', 'forwards': 'Attacker'}
+SQUAD_COUNTS = {'Keeper': 2, 'Defender': 5, 'Midfielder': 5, 'Attacker': 3}
+
+
+def create_league(week, gameweeks, players_per_position=8, teams=10):
+    """Players spread over `teams` clubs with points rising with their number, and fixtures for `gameweeks`."""
+    for offset, position in enumerate(SQUAD_COUNTS):
+        for n in range(players_per_position):
+            name = f"{position} {n}"
+            team = f"Club {(n + 3 * offset) % teams}"
+            Player.objects.create(name=name, position=position, elo=1500, cost=4.0 + n * 0.5, week=week, team=team)
+            for gw in gameweeks:
+                PlayerFixture.objects.create(player_name=name, team=team, gameweek=gw, opponent='Opponent',
+                                             projected_points=1.0 + n)
+
+
+class TransferPlannerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('manager')
+        self.week = SystemSettings.get_settings().current_gameweek
+        create_league(self.week, [self.week, self.week + 1])
+
+    def save_squad(self, squad):
+        user_squad = UserSquad(user=self.user, week=self.week)
+        user_squad.squad = squad
+        user_squad.save()
+
+    def cheapest_squad(self):
+        return {
+            group: [{'name': f"{position} {n}", 'cost': 4.0 + n * 0.5} for n in range(SQUAD_COUNTS[position])]
+            for group, position in SQUAD_GROUPS.items()
+        }
+
+    def test_plan_picks_valid_xi_captain_and_club_limit(self):
+        self.save_squad(self.cheapest_squad())
+        result = plan_transfers(self.user, self.week, horizon=2, budget_constraint=85.0, time_limit_ms=20000)
+        self.assertTrue(result['success'], result.get('error'))
+
+        positions = dict(Player.objects.values_list('name', 'position'))
+        teams = dict(Player.objects.values_list('name', 'team'))
+        for week in result['plan']:
+            xi = week['starting_xi']
+            self.assertEqual(len(week['squad']), 15)
+            self.assertEqual(len(xi), 11)
+            self.assertTrue(set(xi) <= set(week['squad']))
+            self.assertEqual(sum(positions[name] == 'Keeper' for name in xi), 1)
+            self.assertGreaterEqual(sum(positions[name] == 'Defender' for name in xi), 3)
+            self.assertIn(week['captain'], xi)
+            club_counts = [sum(teams[name] == club for name in week['squad']) for club in set(teams.values())]
+            self.assertLessEqual(max(club_counts), 3)
+        self.assertGreaterEqual(result['total_projected_points'], result['no_transfer_points'])
+
+    def test_invalid_squad_is_reported(self):
+        squad = self.cheapest_squad()
+        squad['forwards'][0] = {'name': 'Defender 5', 'cost': 6.5}
+        squad['defenders'][1] = {'name': 'Defender 0', 'cost': 4.0}
+        self.save_squad(squad)
+
+        result = plan_transfers(self.user, self.week, horizon=2)
+        self.assertFalse(result['success'])
+        self.assertEqual(len(result['problems']), 2, result['problems'])
+        self.assertIn('Defender 5 is saved under forwards but is a Defender', result['problems'])
+
+    def test_lineup_points_counts_best_xi_and_captain(self):
+        players = {f"{position} {n}": {'position': position} for position, count in SQUAD_COUNTS.items()
+                   for n in range(count)}
+        week_points = {name: 10.0 if name.startswith('Keeper') else 1.0 for name in players}
+        week_points['Attacker 0'] = 5.0
+        # One keeper starts (and captains); ten outfield players score 1 except the 5-point forward
+        self.assertEqual(lineup_points(players, players, week_points), 10.0 + 5.0 + 9 * 1.0 + 10.0)
+
+
+class SquadMembershipSlotTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('manager')
+
+    def slots(self, user_squad):
+        return dict(user_squad.memberships.values_list('player_name', 'slot'))
+
+    def test_grouped_and_flat_squads_use_squad_keys(self):
+        grouped = UserSquad(user=self.user, week=1)
+        grouped.squad = {'goalkeepers': [{'name': 'Keeper A'}], 'forwards': [{'name': 'Forward A'}]}
+        grouped.save()
+        flat = UserSquad(user=self.user, week=2)
+        flat.squad = [{'name': 'Keeper A', 'position': 'Keeper'}, {'name': 'Forward A', 'position': 'FWD'},
+                      {'name': 'Mystery', 'position': 'Coach'}]
+        flat.save()
+
+        self.assertEqual(self.slots(grouped), {'Keeper A': 'goalkeepers', 'Forward A': 'forwards'})
+        self.assertEqual(self.slots(flat), {'Keeper A': 'goalkeepers', 'Forward A': 'forwards', 'Mystery': ''})
+
+    def test_migration_normalizes_stored_position_slots(self):
+        user_squad = UserSquad.objects.create(user=self.user, week=1)
+        SquadMembership.objects.bulk_create([
+            SquadMembership(user_squad=user_squad, user=self.user, week=1, player_name='Keeper A', slot='Keeper'),
+            SquadMembership(user_squad=user_squad, user=self.user, week=1, player_name='Forward A', slot='forwards'),
+        ])
+        migration = importlib.import_module('MyApi.migrations.0019_normalize_squadmembership_slot')
+        migration.normalize_slots(apps, None)
+
+        self.assertEqual(self.slots(user_squad), {'Keeper A': 'goalkeepers', 'Forward A': 'forwards'})
+
+
+class BacktesterTests(TestCase):
+    def setUp(self):
+        settings = SystemSettings.get_settings()
+        settings.current_season = '2024/25'
+        settings.save()
+        for name in ('Forward A', 'Forward B'):
+            Player.objects.create(name=name, position='Attacker', elo=0, cost=6.0, week=1, team='Club A')
+        for gw in range(1, 5):
+            day = date(2024, 8, 10) + timedelta(days=7 * (gw - 1))
+            players = ['Forward A'] if gw == 2 else ['Forward A', 'Forward B']  # Forward B misses gameweek 2
+            for name in players:
+                PlayerMatch.objects.create(player_name=name, season='2024-2025', date=day, competition='Premier League',
+                                           round_info=f"Gameweek {gw}", opponent=f"Opponent {gw}", result='W 1-0',
+                                           points=2, elo_after_match=0)
+
+    def test_projection_uses_club_fixtures_not_appearances(self):
+        replay = SeasonReplay('2024-2025')
+        self.assertEqual(replay.team_fixtures['Club A'][0].tolist(), [1, 2, 3, 4])
+
+        elo = np.full(replay.n_players, 1300.0)
+        projected = replay.projected_points(2, elo, games_to_consider=2)
+        a, b = replay.index_by_name['Forward A'], replay.index_by_name['Forward B']
+        self.assertGreater(projected[a], 0)
+        self.assertEqual(projected[a], projected[b])
+
+    def test_earlier_season_is_rejected(self):
+        with self.assertRaisesMessage(ValueError, 'only stored for the current season'):
+            run_backtest(season='2023-2024')
+
+
+def random_pool(rng, size, teams):
+    costs = np.round(rng.uniform(4, 13, size) * 2) / 2
+    return pd.DataFrame({
+        'Player': [f"Player {i}" for i in range(size)],
+        'Position': rng.choice(list(SQUAD_COUNTS), size, p=[0.1, 0.33, 0.37, 0.2]),
+        'Cost': costs,
+        'Score': np.round(costs * rng.uniform(0.5, 1.5, size), 1),
+        'Team': [f"Club {t}" for t in rng.integers(teams, size=size)],
+    })
+
+
+class FullSquadPruningTests(SimpleTestCase):
+    counts = {'keeper': 1, 'defender': 3, 'midfielder': 4, 'attacker': 3}
+
+    def test_pruning_keeps_the_best_squad(self):
+        rng = np.random.default_rng(7)
+        for size, teams in ((120, 5), (200, 20)):
+            pool = random_pool(rng, size, teams)
+            self.assertLess(len(prune_dominated_players(pool, 'Score')), size)
+            objectives = []
+            for prune in (False, True):
+                stats = []
+                select_full_squads(pool, 'Score', self.counts, budget=83.0, time_limit_ms=30000,
+                                   solve_stats=stats, prune=prune)
+                self.assertEqual(stats[0]['status'], 'optimal')
+                objectives.append(round(stats[0]['objective'], 6))
+            self.assertEqual(objectives[0], objectives[1])
+
+    def test_dominated_player_kept_when_club_limit_may_block_swaps(self):
+        keepers = pd.DataFrame({
+            'Player': ['Keeper A', 'Keeper B', 'Keeper C', 'Keeper D'],
+            'Position': ['Keeper'] * 4,
+            'Cost': [4.0, 4.0, 4.5, 5.0],
+            'Score': [5.0, 5.0, 4.0, 3.0],
+            'Team': ['Club A', 'Club B', 'Club A', 'Club C'],
+        })
+        # Keeper C has one dominator per club; Keeper D has two from other clubs (6 needed)
+        self.assertEqual(prune_dominated_players(keepers, 'Score')['Player'].tolist(), keepers['Player'].tolist())
+
+        same_club = keepers.assign(Team='Club A')
+        # Two same-club dominators suffice for a position holding two players
+        self.assertEqual(prune_dominated_players(same_club, 'Score')['Player'].tolist(), ['Keeper A', 'Keeper B'])
+
+
+class SquadSelectorFullSquadTests(TestCase):
+    def test_full_squads_use_every_player_of_the_week(self):
+        week = SystemSettings.get_settings().current_gameweek
+        for offset, position in enumerate(SQUAD_COUNTS):
+            for n in range(45):
+                Player.objects.create(name=f"{position} {n}", position=position, elo=1400 + n, cost=4.0,
+                                      week=week, team=f"Club {(n + offset) % 20}")
+        selector = SquadSelector()
+        self.assertEqual(len(selector.get_all_players()), 180)
+
+        squads = selector.select_top_n_full_squads(time_limit_ms=10000)
+        self.assertEqual(squads[0]['Position'].value_counts().to_dict(), SQUAD_COUNTS)
+        self.assertIn('Keeper 44', squads[0]['Player'].tolist())
+
+
+def candidate(name, cost, points, position='Midfielder'):
+    return {'name': name, 'cost': cost, 'projected_points': points, 'position': position}
+
+
+class SubstituteCandidateTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        self.candidates = [
+            candidate(f"Player {i}", float(cost), float(points))
+            for i, (cost, points) in enumerate(zip(np.round(rng.uniform(4, 12, 80) * 2) / 2,
+                                                   np.round(rng.uniform(0, 15, 80), 1)))
+        ]
+
+    def test_pruning_keeps_candidates_with_fewer_than_slots_dominators(self):
+        for slots in (1, 2, 5):
+            kept = {p['name'] for p in prune_dominated_candidates(self.candidates, slots)}
+            for player in self.candidates:
+                dominators = sum(
+                    1 for other in self.candidates if other is not player
+                    and (other['cost'], -other['projected_points'], other['name'])
+                    < (player['cost'], -player['projected_points'], player['name'])
+                    and other['projected_points'] >= player['projected_points']
+                )
+                self.assertEqual(player['name'] in kept, dominators < slots, (slots, player))
+
+    def test_unscored_candidates_are_kept(self):
+        unscored = candidate('Unscored', None, 3.0)
+        self.assertIn(unscored, prune_dominated_candidates(self.candidates + [unscored], 1))
+
+    def test_pool_keeps_only_candidates_beating_the_weakest_squad_player(self):
+        squad = {'midfielders': [candidate('Current A', 6.0, 5.0), candidate('Current B', 8.0, 9.0)]}
+        pruned, stats = prune_substitute_pool(squad, self.candidates)
+        self.assertTrue(all(p['projected_points'] > 5.0 for p in pruned))
+        self.assertLessEqual(stats['substitution_variables_after'], stats['substitution_variables_before'])
+
+    def test_candidate_index_matches_scans(self):
+        index = CandidateIndex(self.candidates)
+        for max_cost in (3.5, 4.0, 6.5, 9.0, 12.0):
+            affordable = [p for p in self.candidates if p['cost'] <= max_cost]
+            best = index.best_under_cost(max_cost)
+            if not affordable:
+                self.assertIsNone(best)
+            else:
+                self.assertEqual(best['projected_points'], max(p['projected_points'] for p in affordable))
+        for low, high in ((2.0, 3.0), (7.5, 7.5), (14.0, 20.0)):
+            found = index.points_between(low, high)
+            expected = [p for p in self.candidates if low <= p['projected_points'] <= high]
+            self.assertCountEqual([p['name'] for p in found], [p['name'] for p in expected])
+            self.assertEqual([p['projected_points'] for p in found],
+                             sorted((p['projected_points'] for p in found), reverse=True))
+
+    def test_cheaper_similar_players_match_scan(self):
+        current = candidate('Current', 10.0, 8.0)
+        found = find_cheaper_similar_players(current, self.candidates)
+        expected = [p for p in self.candidates if 0 < 8.0 - p['projected_points'] <= 1.0 and 10.0 - p['cost'] >= 1.0]
+        self.assertCountEqual([r['cheaper_player']['name'] for r in found], [p['name'] for p in expected])
+
+
+class FPLIdentityTests(TestCase):
+    elements = [
+        {'id': 1, 'first_name': 'Martin', 'second_name': 'Ødegaard'},
+        {'id': 2, 'first_name': 'Danny', 'second_name': 'Ward'},
+        {'id': 3, 'first_name': 'Danny', 'second_name': 'Ward'},
+    ]
+
+    def test_index_drops_names_shared_by_several_players(self):
+        self.assertEqual(build_fpl_id_index(self.elements), {'martin odegaard': 1})
+
+    def test_link_sets_ids_on_unlinked_rows_only(self):
+        Player.objects.create(name='Martin Odegaard', position='Midfielder', elo=1500, cost=8.5, week=1)
+        Player.objects.create(name='Danny Ward', position='Keeper', elo=1400, cost=4.0, week=1)
+        PlayerFixture.objects.create(player_name='martin_odegaard', team='Arsenal', gameweek=1, opponent='Chelsea')
+        PlayerFixture.objects.create(player_name='Martin Odegaard', fpl_id=99, team='Arsenal', gameweek=2,
+                                     opponent='Spurs')
+        version = get_dataset_version(1)
+
+        linked = link_fpl_ids(self.elements)
+
+        self.assertEqual((linked['players'], linked['player_fixtures']), (1, 1))
+        self.assertEqual(dict(Player.objects.values_list('name', 'fpl_id')), {'Martin Odegaard': 1, 'Danny Ward': None})
+        self.assertEqual(sorted(PlayerFixture.objects.values_list('fpl_id', flat=True)), [1, 99])
+        self.assertNotEqual(get_dataset_version(1), version)
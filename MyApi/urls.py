@@ -26,9 +26,14 @@ urlpatterns = [
     path('all_projected_points/', views.get_all_projected_points, name='get_all_projected_points'),
     path('generate_squads_points/', views.generate_squads_points, name='generate_squads_points'),
     path('squad_points/<int:squad_number>/', views.get_squad_points, name='get_squad_points'),
+    path('budget_frontier/', views.budget_frontier, name='budget_frontier'),
     # Removed old optimized methods - now using only the player-by-player approach
     path('system_info/', views.system_info, name='system_info'),
     path('update_current_squad/', views.update_current_squad, name='update_current_squad'),
     path('recommend_individual_substitutes/', views.recommend_individual_substitutes_api, name='recommend_individual_substitutes_api'),
     path('recommend_substitutes/', views.recommend_substitutes, name='recommend_substitutes'),
+    path('plan_transfers/', views.plan_transfers, name='plan_transfers'),
+    path('squad_leaderboard/', views.squad_leaderboard, name='squad_leaderboard'),
+    path('squad_ownership/', views.squad_ownership, name='squad_ownership'),
+    path('captaincy/', views.captaincy, name='captaincy'),
 ]
\ No newline at end of file
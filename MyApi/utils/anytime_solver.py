@@ -0,0 +1,193 @@
+"""
+Time-limited MILP solving for request-path optimizations.
+
+CBC is given a wall-clock budget and returns the best feasible solution found
+so far. When the solve stops early the optimality gap is estimated against
+the LP relaxation bound, solved within whatever is left of the same budget
+(the gap is reported as None when nothing is left). Callers fall back to a greedy solution when nothing
+feasible is found in time.
+"""
+
+import time
+import pulp
+from django.conf import settings
+
+
+DEFAULT_TIME_LIMIT_MS = 500
+
+# Least remaining budget worth spending on the relaxation bound
+MIN_BOUND_TIME_MS = 10
+
+# Placeholder some callers use for players with no team; never club-limited
+UNKNOWN_TEAM = 'Unknown'
+
+
+def get_time_limit_ms(requested=None):
+    """
+    Resolve the solve budget for a request.
+
+    Args:
+        requested: Per-request budget in milliseconds (may be None or a string)
+
+    Returns:
+        int: Time limit in milliseconds
+    """
+    default = getattr(settings, 'SQUAD_SOLVER_TIME_LIMIT_MS', DEFAULT_TIME_LIMIT_MS)
+    if requested in (None, ''):
+        return int(default)
+    try:
+        return max(int(float(requested)), 1)
+    except (TypeError, ValueError):
+        return int(default)
+
+
+def relaxation_bound(prob, time_limit_ms=None):
+    """
+    Solve the LP relaxation of `prob` and return its objective as a bound, or
+    None when it is not solved to optimality (e.g. within `time_limit_ms`).
+    Variable categories and values and the problem status are restored afterwards.
+    """
+    variables = prob.variables()
+    saved = [(var, var.cat, var.varValue) for var in variables]
+    saved_status = (prob.status, prob.sol_status)
+    time_limit = time_limit_ms / 1000.0 if time_limit_ms is not None else None
+    try:
+        for var in variables:
+            var.cat = pulp.LpContinuous
+        prob.solve(pulp.PULP_CBC_CMD(msg=0, timeLimit=time_limit))
+        if prob.status != pulp.LpStatusOptimal:
+            return None
+        return pulp.value(prob.objective)
+    finally:
+        for var, cat, value in saved:
+            var.cat = cat
+            var.varValue = value
+        prob.status, prob.sol_status = saved_status
+
+
+def solve_with_time_limit(prob, time_limit_ms=None):
+    """
+    Solve a MILP within a time budget, keeping the best feasible solution.
+
+    Args:
+        prob (LpProblem): Problem to solve (variable values are set on return)
+        time_limit_ms (int, optional): Budget in milliseconds, defaults to settings
+
+    Returns:
+        dict: {
+            'status': 'optimal' | 'feasible' | 'infeasible' | 'not_solved',
+            'objective': float or None,
+            'optimality_gap': float or None (relative, 0.0 when proven optimal),
+            'solve_time': float (seconds, MILP solve only),
+            'timed_out': bool
+        }
+    """
+    time_limit_ms = get_time_limit_ms(time_limit_ms)
+    start = time.perf_counter()
+    prob.solve(pulp.PULP_CBC_CMD(msg=0, timeLimit=time_limit_ms / 1000.0))
+    solve_time = time.perf_counter() - start
+
+    if prob.sol_status == pulp.LpSolutionOptimal:
+        status = 'optimal'
+    elif prob.sol_status == pulp.LpSolutionIntegerFeasible:
+        status = 'feasible'
+    elif prob.status == pulp.LpStatusInfeasible:
+        status = 'infeasible'
+    else:
+        status = 'not_solved'
+
+    objective = pulp.value(prob.objective) if status in ('optimal', 'feasible') else None
+    gap = 0.0 if status == 'optimal' else None
+    remaining_ms = time_limit_ms - (time.perf_counter() - start) * 1000
+    if status == 'feasible' and remaining_ms >= MIN_BOUND_TIME_MS:
+        bound = relaxation_bound(prob, remaining_ms)
+        if bound is not None and abs(bound) > 1e-9:
+            gap = round(max(bound - objective, 0.0) / abs(bound), 4)
+
+    return {
+        'status': status,
+        'objective': objective,
+        'optimality_gap': gap,
+        'solve_time': round(solve_time, 4),
+        'timed_out': status != 'optimal' and solve_time * 1000 >= time_limit_ms * 0.95,
+    }
+
+
+def greedy_lineup(squad_df, score_column, counts, budget, exclude=None, max_per_club=None):
+    """
+    Greedy fallback lineup: fill each position with the best-scoring player
+    that still leaves enough budget for the cheapest way to fill the rest.
+
+    Args:
+        squad_df (DataFrame): Candidate pool with 'Player', 'Position', 'Cost' and score columns
+        score_column (str): Column to maximise
+        counts (dict): Position counts keyed 'keeper', 'defender', 'midfielder', 'attacker'
+        budget (float): Maximum total cost
+        exclude (set, optional): Player names that may not be selected
+        max_per_club (int, optional): Maximum players from the same 'Team' (blank teams are not limited)
+
+    Returns:
+        list: Row indexes of the selected players, or [] if no feasible lineup exists
+    """
+    exclude = exclude or set()
+    required = {
+        'Keeper': counts['keeper'],
+        'Defender': counts['defender'],
+        'Midfielder': counts['midfielder'],
+        'Attacker': counts['attacker'],
+    }
+    by_position = {position: [] for position in required}
+    for idx, row in squad_df.iterrows():
+        if row['Player'] not in exclude and row['Position'] in by_position:
+            by_position[row['Position']].append((float(row[score_column]), float(row['Cost']), idx))
+
+    slots = []
+    for position, needed in required.items():
+        if len(by_position[position]) < needed:
+            return []
+        by_position[position].sort(key=lambda x: x[1])
+        slots.extend([position] * needed)
+
+    position_of = {idx: position for position, players in by_position.items() for _, _, idx in players}
+    teams = squad_df['Team'] if max_per_club is not None and 'Team' in squad_df.columns else None
+    club_counts = {}
+
+    def club_of(idx):
+        team = teams[idx] if teams is not None else None
+        return team if isinstance(team, str) and team and team != UNKNOWN_TEAM else None
+
+    def cheapest_fill(taken):
+        # Minimum cost of the still-open slots using the cheapest untaken players
+        total = 0.0
+        for position, needed in required.items():
+            open_slots = needed - sum(1 for _, _, idx in selected if position_of[idx] == position)
+            cheapest = [cost for _, cost, idx in by_position[position] if idx not in taken][:open_slots]
+            total += sum(cheapest)
+        return total
+
+    selected = []
+    taken = set()
+    spent = 0.0
+    for position in slots:
+        candidates = sorted(by_position[position], key=lambda x: x[0], reverse=True)
+        choice = None
+        for score, cost, idx in candidates:
+            if idx in taken:
+                continue
+            club = club_of(idx)
+            if club is not None and club_counts.get(club, 0) >= max_per_club:
+                continue
+            taken.add(idx)
+            selected.append((score, cost, idx))
+            if spent + cost + cheapest_fill(taken) <= budget:
+                choice = (score, cost, idx)
+                break
+            taken.discard(idx)
+            selected.pop()
+        if choice is None:
+            return []
+        spent += choice[1]
+        club = club_of(choice[2])
+        if club is not None:
+            club_counts[club] = club_counts.get(club, 0) + 1
+    return [idx for _, _, idx in selected]
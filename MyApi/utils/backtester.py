@@ -0,0 +1,518 @@
+"""
+Season backtesting of squad selection strategies.
+
+A season is replayed week by week from PlayerMatch: before each gameweek the
+Elo ratings are rebuilt from every match played earlier, a selector picks a
+lineup from that state, and the lineup is scored with the points actually
+scored in the gameweek.
+
+The match history is loaded once into arrays. Elo state is advanced
+incrementally from one gameweek to the next (only the matches in between are
+applied, vectorized across players) and every weekly snapshot is cached
+in-process, so further strategies, budgets or formations on the same season
+reuse the replay instead of recomputing it.
+
+Projections follow projected_points_calculator and SquadSelectorPoints: each
+of the next `games_to_consider` fixtures of a player's club (the season's
+fixture list is public in advance) is projected from the Elo before the
+gameweek and scaled by fixture difficulty. The fixture list is not stored,
+so each club's is rebuilt from all of the season's matches of its players;
+a player's projection therefore does not depend on whether that player
+actually played later. Historical FPL difficulty is not stored either, so it
+is derived from the fantasy points each opponent conceded earlier in the
+season.
+
+Positions, costs and clubs come from Player rows, which exist for the
+current season only (keyed by week, with no season), so only the current
+season can be replayed.
+"""
+
+import threading
+import time
+from bisect import bisect_right
+import numpy as np
+import pandas as pd
+import pulp
+from django.db.models import Count, Max
+
+from MyApi.models import Player, PlayerMatch
+from MyApi.utils.anytime_solver import greedy_lineup, solve_with_time_limit
+from MyApi.utils.full_squad_optimizer import select_full_squads
+from MyApi.utils.player_match_upsert import parse_gameweek
+from MyApi.utils.projected_points_calculator import apply_opposition_multiplier, get_league_rating
+from MyApi.utils.squad_scoring import season_key
+
+
+INITIAL_ELO = 1200.0
+ELO_K = 20
+DEFAULT_BACKTEST_TIME_LIMIT_MS = 2000
+DEFAULT_GAMES_TO_CONSIDER = 3
+NEUTRAL_DIFFICULTY = 3
+
+STRATEGIES = {
+    'elo': 'Elo',
+    'points': 'ProjectedPoints',
+}
+
+FORMATIONS = {
+    '3-4-3': {'keeper': 1, 'defender': 3, 'midfielder': 4, 'attacker': 3},
+    '3-5-2': {'keeper': 1, 'defender': 3, 'midfielder': 5, 'attacker': 2},
+    '4-4-2': {'keeper': 1, 'defender': 4, 'midfielder': 4, 'attacker': 2},
+    '4-3-3': {'keeper': 1, 'defender': 4, 'midfielder': 3, 'attacker': 3},
+}
+
+# Candidate pool sizes per position for starting lineups, as in SquadSelector
+POOL_SIZES = {'Keeper': 10, 'Defender': 40, 'Midfielder': 40, 'Attacker': 40}
+
+_replay_cache = {}
+_replay_lock = threading.Lock()
+
+
+def elo_update(elo, points, league_rating, k=ELO_K):
+    """
+    Vectorized calculate_elo_change for arrays of ratings, points and league ratings.
+    """
+    with np.errstate(divide='ignore', over='ignore'):
+        expected = np.round(k / (1 + 10 ** (league_rating / elo)), 2)
+    return np.round(elo + k * (points - expected), 3)
+
+
+def expected_points(elo, league_rating=1500, k=ELO_K):
+    """Vectorized calculate_expected_points (Premier League rating by default)."""
+    with np.errstate(divide='ignore', over='ignore'):
+        return np.round(k / (1 + 10 ** (league_rating / elo)), 2)
+
+
+def _occurrences(sorted_keys):
+    """Position of each element within its run of equal keys in a sorted array."""
+    group_start = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    sizes = np.diff(np.r_[group_start, len(sorted_keys)])
+    return np.arange(len(sorted_keys)) - np.repeat(group_start, sizes)
+
+
+def _history_version():
+    """Version token for the match history and player rows used by the replay."""
+    matches = PlayerMatch.objects.aggregate(count=Count('id'), latest=Max('updated_at'))
+    players = Player.objects.aggregate(count=Count('id'), latest=Max('updated_at'))
+    parts = [matches['count'], matches['latest'], players['count'], players['latest']]
+    return ':'.join(str(part.timestamp() if hasattr(part, 'timestamp') else part) for part in parts)
+
+
+class SeasonReplay:
+    """
+    Match history and player attributes for one season, with Elo snapshots
+    built incrementally per gameweek.
+    """
+
+    def __init__(self, season):
+        self.season = season
+        self.index_by_name = {}
+        self.index_by_opponent = {}
+        self._load_matches()
+        self._load_players()
+        self._load_team_fixtures()
+        self._snapshots = {}
+        self._lock = threading.Lock()
+
+    def _player_index(self, name):
+        return self.index_by_name.setdefault(name, len(self.index_by_name))
+
+    def _load_matches(self):
+        rows = PlayerMatch.objects.order_by('date', 'id').values_list(
+            'player_name', 'date', 'competition', 'points', 'season', 'round_info', 'opponent'
+        )
+        players, dates, ratings, points, gameweeks, opponents = [], [], [], [], [], []
+        rating_cache = {}
+        for name, date, competition, match_points, season, round_info, opponent in rows:
+            players.append(self._player_index(name))
+            opponents.append(self.index_by_opponent.setdefault(opponent, len(self.index_by_opponent)))
+            dates.append(date.toordinal())
+            if competition not in rating_cache:
+                rating_cache[competition] = get_league_rating(competition)
+            ratings.append(rating_cache[competition])
+            points.append(match_points or 0)
+            gameweek = parse_gameweek(round_info) if season == self.season else None
+            gameweeks.append(gameweek if gameweek is not None else -1)
+
+        self.match_players = np.asarray(players, dtype=np.int64)
+        self.match_dates = np.asarray(dates, dtype=np.int64)
+        self.match_ratings = np.asarray(ratings, dtype=np.float64)
+        self.match_points = np.asarray(points, dtype=np.float64)
+        self.match_gameweeks = np.asarray(gameweeks, dtype=np.int64)
+        self.match_opponents = np.asarray(opponents, dtype=np.int64)
+
+        # A gameweek starts on the date of its first match; state is built from matches before it
+        in_season = self.match_gameweeks >= 0
+        self.gameweeks = sorted(int(g) for g in np.unique(self.match_gameweeks[in_season]))
+        self.gameweek_start = {
+            g: int(self.match_dates[self.match_gameweeks == g].min()) for g in self.gameweeks
+        }
+
+        # Actual points per player and gameweek in one pass (double gameweeks summed)
+        n_weeks = (max(self.gameweeks) + 1) if self.gameweeks else 1
+        self.actual = np.zeros((len(self.index_by_name), n_weeks), dtype=np.float64)
+        np.add.at(self.actual, (self.match_players[in_season], self.match_gameweeks[in_season]),
+                  self.match_points[in_season])
+
+    def _load_players(self):
+        # Player rows describe the current season only; earlier seasons have no attributes
+        self.has_player_rows = self.season == season_key()
+        rows = []
+        if self.has_player_rows:
+            rows = list(Player.objects.order_by('week', 'id').values_list('name', 'week', 'position', 'cost', 'team'))
+        self.player_rows_player = np.asarray([self._player_index(r[0]) for r in rows], dtype=np.int64)
+        self.player_rows_week = np.asarray([r[1] for r in rows], dtype=np.int64)
+        self.player_rows_position = np.asarray([r[2] for r in rows], dtype=object)
+        self.player_rows_cost = np.asarray([r[3] or 0.0 for r in rows], dtype=np.float64)
+        self.player_rows_team = np.asarray([r[4] or None for r in rows], dtype=object)
+        # Names first seen in Player rows have no matches; widen the points matrix for them
+        n_players = len(self.index_by_name)
+        if self.actual.shape[0] < n_players:
+            self.actual = np.vstack([self.actual, np.zeros((n_players - self.actual.shape[0], self.actual.shape[1]))])
+
+    def _load_team_fixtures(self):
+        """
+        Each club's season fixtures as arrays (gameweeks, opponents, ratings)
+        sorted by gameweek and date, from the season's matches. A match belongs
+        to the player's club in the latest Player row at or before its gameweek
+        (or the first later row).
+        """
+        clubs_by_player = {}
+        for player, week, team in zip(self.player_rows_player, self.player_rows_week, self.player_rows_team):
+            if team:
+                weeks, teams = clubs_by_player.setdefault(int(player), ([], []))
+                weeks.append(int(week))
+                teams.append(team)
+
+        fixtures = {}
+        for m in np.flatnonzero(self.match_gameweeks >= 0):
+            rows = clubs_by_player.get(int(self.match_players[m]))
+            if rows is None:
+                continue
+            weeks, teams = rows
+            team = teams[max(bisect_right(weeks, int(self.match_gameweeks[m])) - 1, 0)]
+            key = (int(self.match_gameweeks[m]), int(self.match_dates[m]), int(self.match_opponents[m]))
+            fixtures.setdefault(team, {})[key] = self.match_ratings[m]
+
+        self.team_fixtures = {}
+        for team, team_fixtures in fixtures.items():
+            keys = sorted(team_fixtures)
+            self.team_fixtures[team] = (
+                np.asarray([k[0] for k in keys], dtype=np.int64),
+                np.asarray([k[2] for k in keys], dtype=np.int64),
+                np.asarray([team_fixtures[k] for k in keys], dtype=np.float64),
+            )
+
+    @property
+    def n_players(self):
+        return len(self.index_by_name)
+
+    def player_names(self):
+        return sorted(self.index_by_name, key=self.index_by_name.get)
+
+    def _apply_matches(self, elo, played, start, stop):
+        """Apply matches[start:stop] to the Elo state, one match per player at a time."""
+        if stop <= start:
+            return
+        players = self.match_players[start:stop]
+        # Occurrence number of each match within its player's matches (order preserved)
+        order = np.argsort(players, kind='stable')
+        occurrence = np.empty(len(order), dtype=np.int64)
+        occurrence[order] = _occurrences(players[order])
+
+        # Each step updates every player's next match at once
+        for step in range(int(occurrence.max()) + 1):
+            selected = start + np.flatnonzero(occurrence == step)
+            step_players = self.match_players[selected]
+            elo[step_players] = elo_update(elo[step_players], self.match_points[selected], self.match_ratings[selected])
+        played[players] = True
+
+    def _stop(self, gameweek):
+        """Number of matches played before a gameweek starts."""
+        return int(np.searchsorted(self.match_dates, self.gameweek_start[gameweek], side='left'))
+
+    def elo_state(self, gameweek):
+        """
+        Elo ratings before a gameweek, built from the closest cached earlier snapshot.
+
+        Returns:
+            tuple: (elo, has_history) arrays indexed by player
+        """
+        with self._lock:
+            if gameweek in self._snapshots:
+                return self._snapshots[gameweek][1:]
+            stop = self._stop(gameweek)
+            earlier = [g for g in self._snapshots if self._snapshots[g][0] <= stop]
+            if earlier:
+                base = max(earlier, key=lambda g: self._snapshots[g][0])
+                start, elo, played = self._snapshots[base]
+                elo, played = elo.copy(), played.copy()
+            else:
+                start = 0
+                elo = np.full(self.n_players, INITIAL_ELO, dtype=np.float64)
+                played = np.zeros(self.n_players, dtype=bool)
+            self._apply_matches(elo, played, start, stop)
+            self._snapshots[gameweek] = (stop, elo, played)
+            return elo, played
+
+    def fixture_difficulty(self, gameweek):
+        """
+        FPL-style difficulty (2 easiest to 5 hardest) per opponent before a
+        gameweek, ranked by the fantasy points it conceded per appearance in
+        the season's earlier matches. Opponents not faced yet are neutral.
+
+        Returns:
+            ndarray: Difficulty indexed by opponent
+        """
+        stop = self._stop(gameweek)
+        in_season = self.match_gameweeks[:stop] >= 0
+        opponents = self.match_opponents[:stop][in_season]
+        n = len(self.index_by_opponent)
+        difficulty = np.full(n, float(NEUTRAL_DIFFICULTY))
+        appearances = np.bincount(opponents, minlength=n)
+        faced = np.flatnonzero(appearances)
+        if len(faced) > 1:
+            conceded = np.bincount(opponents, weights=self.match_points[:stop][in_season], minlength=n)
+            conceded = conceded[faced] / appearances[faced]
+            # 0 for the opponent conceding least (hardest), 1 for the one conceding most
+            rank = np.argsort(np.argsort(conceded, kind='stable'), kind='stable') / (len(faced) - 1)
+            difficulty[faced] = np.round(5 - 3 * rank)
+        return difficulty
+
+    def projected_points(self, gameweek, elo, games_to_consider=DEFAULT_GAMES_TO_CONSIDER, teams=None):
+        """
+        Projected points per player summed over the next `games_to_consider`
+        fixtures of their club (as of the gameweek) from the gameweek on, as
+        projected_points_calculator projects each fixture: expected points
+        from the Elo before the gameweek and the competition rating, scaled by
+        fixture difficulty. Players without a known club project 0.
+
+        Args:
+            teams (ndarray, optional): Club per player, from player_attributes(gameweek)
+
+        Returns:
+            ndarray: Projected points indexed by player
+        """
+        if teams is None:
+            teams = self.player_attributes(gameweek)[3]
+        projected = np.zeros(self.n_players, dtype=np.float64)
+        difficulty = self.fixture_difficulty(gameweek)
+        known = np.asarray([team is not None for team in teams], dtype=bool)
+        for team in set(teams[known]):
+            if team not in self.team_fixtures:
+                continue
+            gameweeks, opponents, ratings = self.team_fixtures[team]
+            first = int(np.searchsorted(gameweeks, gameweek, side='left'))
+            upcoming = slice(first, first + games_to_consider)
+            players = np.flatnonzero(known & (teams == team))
+            points = apply_opposition_multiplier(
+                expected_points(elo[players][:, None], ratings[upcoming][None, :]),
+                difficulty[opponents[upcoming]][None, :],
+            )
+            projected[players] = points.sum(axis=1)
+        return projected
+
+    def player_attributes(self, gameweek):
+        """
+        Position, cost and team per player from the latest Player row at or
+        before the gameweek. Players with no such row are unavailable
+        (has_row False), since later rows would leak future prices and roles.
+
+        Returns:
+            tuple: (has_row, positions, costs, teams) arrays indexed by player
+        """
+        n = self.n_players
+        has_row = np.zeros(n, dtype=bool)
+        positions = np.full(n, None, dtype=object)
+        costs = np.zeros(n, dtype=np.float64)
+        teams = np.full(n, None, dtype=object)
+
+        k = int(np.searchsorted(self.player_rows_week, gameweek, side='right'))
+        if k:
+            reversed_players = self.player_rows_player[:k][::-1]
+            _, last = np.unique(reversed_players, return_index=True)
+            row_indexes = k - 1 - last
+            players = self.player_rows_player[row_indexes]
+            has_row[players] = True
+            positions[players] = self.player_rows_position[row_indexes]
+            costs[players] = self.player_rows_cost[row_indexes]
+            teams[players] = self.player_rows_team[row_indexes]
+        return has_row, positions, costs, teams
+
+
+def get_season_replay(season=None):
+    """
+    Cached SeasonReplay for a season, rebuilt when PlayerMatch or Player rows change.
+
+    Args:
+        season (str, optional): Season, defaults to the settings season
+
+    Returns:
+        SeasonReplay
+    """
+    season = season_key(season)
+    version = _history_version()
+    with _replay_lock:
+        cached = _replay_cache.get(season)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+    replay = SeasonReplay(season)
+    with _replay_lock:
+        _replay_cache[season] = (version, replay)
+    return replay
+
+
+def candidate_pool(replay, gameweek, games_to_consider=DEFAULT_GAMES_TO_CONSIDER):
+    """
+    Candidate DataFrame for a gameweek: players with a Player row at or before
+    it and at least one earlier match, with their Elo and projected points
+    over the next `games_to_consider` fixtures at that point.
+    """
+    elo, has_history = replay.elo_state(gameweek)
+    has_row, positions, costs, teams = replay.player_attributes(gameweek)
+    eligible = np.flatnonzero(has_row & has_history)
+    names = replay.player_names()
+    projected = replay.projected_points(gameweek, elo, games_to_consider, teams)
+    return pd.DataFrame({
+        'Player': [names[i] for i in eligible],
+        'Position': positions[eligible],
+        'Elo': elo[eligible],
+        'ProjectedPoints': projected[eligible],
+        'Cost': costs[eligible],
+        'Team': teams[eligible],
+        'Index': eligible,
+    })
+
+
+def select_lineup(squad_df, score_column, counts, budget, time_limit_ms=DEFAULT_BACKTEST_TIME_LIMIT_MS):
+    """
+    Best starting lineup by score_column within the budget (the single-squad
+    model of SquadSelector.select_top_n_squads), with the greedy fallback.
+
+    Returns:
+        tuple: (row indexes, solve status)
+    """
+    squad_df = squad_df.reset_index(drop=True)
+    choices = [pulp.LpVariable(f"player_{i}", cat=pulp.LpBinary) for i in range(len(squad_df))]
+    scores = squad_df[score_column].astype(float).tolist()
+    costs = squad_df['Cost'].astype(float).tolist()
+    positions = squad_df['Position'].tolist()
+
+    prob = pulp.LpProblem("FPL_Backtest_Selection", pulp.LpMaximize)
+    prob += pulp.LpAffineExpression(list(zip(choices, scores)))
+    prob += pulp.LpAffineExpression(list(zip(choices, costs))) <= budget, "budget"
+    for position, key in (('Keeper', 'keeper'), ('Defender', 'defender'),
+                          ('Midfielder', 'midfielder'), ('Attacker', 'attacker')):
+        prob += pulp.LpAffineExpression(
+            [(var, 1) for var, player_position in zip(choices, positions) if player_position == position]
+        ) == counts[key], f"count_{position}"
+
+    stats = solve_with_time_limit(prob, time_limit_ms)
+    if stats['status'] in ('optimal', 'feasible'):
+        selected = [i for i, var in enumerate(choices) if var.varValue is not None and var.varValue > 0.5]
+        if selected:
+            return selected, stats['status']
+    return greedy_lineup(squad_df, score_column, counts, budget), 'greedy'
+
+
+def _select(pool, score_column, counts, budget, full_squad, time_limit_ms):
+    """Indexes (into the replay) of the scoring players picked for a gameweek."""
+    if pool.empty:
+        return np.zeros(0, dtype=np.int64), 'no_players'
+    if full_squad:
+        # The whole pool: select_full_squads prunes dominated players instead of capping positions
+        stats = []
+        squads = select_full_squads(pool, score_column, counts, budget=budget, time_limit_ms=time_limit_ms,
+                                    solve_stats=stats)
+        if not squads:
+            return np.zeros(0, dtype=np.int64), 'infeasible'
+        starters = squads[0][squads[0]['Starter']]
+        return starters['Index'].to_numpy(dtype=np.int64), stats[-1]['status'] if stats else 'optimal'
+    shortlist = pd.concat(
+        [pool[pool['Position'] == position].nlargest(size, score_column) for position, size in POOL_SIZES.items()],
+        ignore_index=True,
+    )
+    selected, status = select_lineup(shortlist, score_column, counts, budget, time_limit_ms)
+    return shortlist.loc[selected, 'Index'].to_numpy(dtype=np.int64), status
+
+
+def run_backtest(season=None, strategies=('elo', 'points'), formation='3-4-3', budget=None,
+                 full_squad=False, start_gameweek=None, end_gameweek=None,
+                 time_limit_ms=DEFAULT_BACKTEST_TIME_LIMIT_MS, games_to_consider=DEFAULT_GAMES_TO_CONSIDER):
+    """
+    Replay a season and score each strategy's weekly picks against actual points.
+
+    Args:
+        season (str, optional): Season to replay, defaults to the settings season
+        strategies (iterable): Keys of STRATEGIES to compare
+        formation (str): Starting formation
+        budget (float, optional): Lineup budget, defaults to 82.5 (100.0 with full_squad)
+        full_squad (bool): Pick 15-player squads and score the starting XI
+        start_gameweek (int, optional): First gameweek to replay
+        end_gameweek (int, optional): Last gameweek to replay
+        time_limit_ms (int): Solve budget per selection
+        games_to_consider (int): Upcoming fixtures summed into the 'points' projection
+
+    Returns:
+        dict: {'season', 'gameweeks', 'strategies': {name: {'total_points', 'average_points', 'weeks'}}, 'elapsed'}
+
+    Raises:
+        ValueError: For unknown strategies, or a season other than the current one
+    """
+    start = time.perf_counter()
+    unknown = [s for s in strategies if s not in STRATEGIES]
+    if unknown:
+        raise ValueError(f"Unknown strategies: {', '.join(unknown)}")
+    counts = FORMATIONS.get(formation, FORMATIONS['3-4-3'])
+    if budget is None:
+        budget = 100.0 if full_squad else 82.5
+
+    replay = get_season_replay(season)
+    if not replay.has_player_rows:
+        raise ValueError(
+            f"Cannot replay season {replay.season}: positions, costs and clubs are only stored "
+            f"for the current season ({season_key()})"
+        )
+    gameweeks = [
+        g for g in replay.gameweeks
+        if (start_gameweek is None or g >= start_gameweek) and (end_gameweek is None or g <= end_gameweek)
+    ]
+    names = replay.player_names()
+
+    # Selection matrix per strategy (gameweeks x players); scored in one product at the end
+    selections = {s: np.zeros((len(gameweeks), replay.n_players), dtype=bool) for s in strategies}
+    statuses = {s: [] for s in strategies}
+    for row, gameweek in enumerate(gameweeks):
+        pool = candidate_pool(replay, gameweek, games_to_consider)
+        for strategy in strategies:
+            picked, status = _select(pool, STRATEGIES[strategy], counts, budget, full_squad, time_limit_ms)
+            selections[strategy][row, picked] = True
+            statuses[strategy].append(status)
+
+    actual = replay.actual[:, gameweeks].T if gameweeks else np.zeros((0, replay.n_players))
+    results = {}
+    for strategy in strategies:
+        weekly = (selections[strategy] * actual).sum(axis=1)
+        results[strategy] = {
+            'total_points': float(weekly.sum()),
+            'average_points': round(float(weekly.mean()), 2) if len(weekly) else 0.0,
+            'weeks': [
+                {
+                    'gameweek': gameweek,
+                    'points': float(weekly[row]),
+                    'status': statuses[strategy][row],
+                    'players': [names[i] for i in np.flatnonzero(selections[strategy][row])],
+                }
+                for row, gameweek in enumerate(gameweeks)
+            ],
+        }
+    return {
+        'season': replay.season,
+        'formation': formation,
+        'budget': budget,
+        'full_squad': full_squad,
+        'games_to_consider': games_to_consider,
+        'gameweeks': gameweeks,
+        'strategies': results,
+        'elapsed': round(time.perf_counter() - start, 2),
+    }
@@ -0,0 +1,162 @@
+"""
+Batch precomputation of substitute recommendations.
+
+After the projection refresh, package and individual recommendations and
+captain picks are computed for every saved UserSquad of a gameweek and stored
+in SquadRecommendation. All squads share one loaded player pool and are solved
+across a thread pool (CBC runs as a subprocess, so threads solve in parallel).
+The API serves a stored result while the squad and dataset are unchanged.
+"""
+
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.db import connection, transaction
+
+from MyApi.models import PlayerFixture, SquadRecommendation, SystemSettings, UserSquad
+from MyApi.utils.captaincy import captains_for_all_squads
+from MyApi.utils.dataset_version import get_dataset_version
+from MyApi.utils.player_pool import get_player_pool
+from MyApi.utils.recommend_substitutes import recommend_individual_substitutes, recommend_substitutes
+
+
+DEFAULT_PACKAGE_BUDGET = 100.0
+DEFAULT_INDIVIDUAL_BUDGET = 82.5
+DEFAULT_BATCH_TIME_LIMIT_MS = 5000
+DEFAULT_CAPTAIN_SIMULATIONS = 200
+
+
+def squad_hash(squad_data):
+    """
+    Stable hash of the squad's players (name, cost, projected points per position).
+    """
+    canonical = {}
+    for position in ['goalkeepers', 'defenders', 'midfielders', 'forwards']:
+        players = [p for p in (squad_data or {}).get(position, []) if isinstance(p, dict)]
+        canonical[position] = sorted(
+            (p.get('name', ''), p.get('cost'), p.get('projected_points')) for p in players
+        )
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def default_recommendation_gameweek():
+    """First gameweek with stored fixtures, else the one after the current gameweek."""
+    first = PlayerFixture.objects.order_by('gameweek').values_list('gameweek', flat=True).first()
+    return first if first is not None else SystemSettings.get_settings().current_gameweek + 1
+
+
+def _compute_for_squad(user_squad, pool, package_budget, individual_budget, max_recommendations, time_limit_ms):
+    try:
+        squad_data = user_squad.squad
+        package = recommend_substitutes(
+            user_squad.user, max_recommendations, package_budget, squad_data, user_squad.week,
+            time_limit_ms=time_limit_ms, player_pool=pool
+        )
+        individual = recommend_individual_substitutes(
+            user_squad.user, budget_constraint=individual_budget, squad_data=squad_data,
+            gameweek=user_squad.week, player_pool=pool
+        )
+        return user_squad, squad_hash(squad_data), package, individual
+    finally:
+        # Worker threads open their own connections; release them when done
+        connection.close()
+
+
+def precompute_recommendations(gameweek=None, workers=4, package_budget=DEFAULT_PACKAGE_BUDGET,
+                               individual_budget=DEFAULT_INDIVIDUAL_BUDGET, max_recommendations=4,
+                               time_limit_ms=DEFAULT_BATCH_TIME_LIMIT_MS,
+                               captain_simulations=DEFAULT_CAPTAIN_SIMULATIONS):
+    """
+    Compute and store recommendations for every UserSquad of a gameweek.
+
+    Args:
+        gameweek (int, optional): Squad week / projection gameweek, defaults to the next fixture gameweek
+        workers (int): Number of squads solved in parallel
+        package_budget (float): Budget for package recommendations
+        individual_budget (float): Budget for individual recommendations
+        max_recommendations (int): Maximum substitutions per package
+        time_limit_ms (int): Solve budget per squad
+        captain_simulations (int): Simulated samples for captain picks (0 uses projections only)
+
+    Returns:
+        dict: Summary with counts and timing
+    """
+    start = time.perf_counter()
+    if gameweek is None:
+        gameweek = default_recommendation_gameweek()
+    week = SystemSettings.get_settings().current_gameweek
+    version = get_dataset_version(week)
+    pool = get_player_pool(gameweek, week)
+    user_squads = list(UserSquad.objects.filter(week=gameweek).select_related('user'))
+
+    results = []
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, int(workers))) as executor:
+        futures = [
+            executor.submit(_compute_for_squad, user_squad, pool, package_budget, individual_budget,
+                            max_recommendations, time_limit_ms)
+            for user_squad in user_squads
+        ]
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"[ERROR] Precomputing recommendations: {e}")
+                failed += 1
+
+    # Captain picks for every squad in one vectorized pass
+    captain_start = time.perf_counter()
+    captains = captains_for_all_squads(gameweek, simulations=captain_simulations)
+    captain_time = time.perf_counter() - captain_start
+
+    # Single writer keeps sqlite happy and the batch atomic
+    with transaction.atomic():
+        SquadRecommendation.objects.filter(week=gameweek).delete()
+        rows = []
+        for user_squad, hash_value, package, individual in results:
+            row = SquadRecommendation(
+                user=user_squad.user,
+                week=gameweek,
+                squad_hash=hash_value,
+                dataset_version=version,
+                package_budget=package_budget,
+                individual_budget=individual_budget,
+                max_recommendations=max_recommendations,
+            )
+            row.package = package
+            row.individual = individual
+            captaincy = captains.get(user_squad.user_id)
+            # Record the simulation count so requests only reuse a pick computed the same way
+            row.captaincy = dict(captaincy, simulations=captain_simulations) if captaincy else {}
+            rows.append(row)
+        SquadRecommendation.objects.bulk_create(rows)
+
+    return {
+        'success': failed == 0,
+        'gameweek': gameweek,
+        'squads': len(user_squads),
+        'stored': len(results),
+        'failed': failed,
+        'players_in_pool': len(pool),
+        'captain_time': round(captain_time, 3),
+        'elapsed': round(time.perf_counter() - start, 2),
+    }
+
+
+def get_stored_recommendation(user, week, squad_data):
+    """
+    Stored recommendations for a user's squad, or None if the squad was edited
+    or the projections were refreshed since they were computed.
+
+    Costs three primary-key/indexed reads (recommendation, settings, dataset
+    version counter), so it is cheap enough for every recommendation request.
+    """
+    if not getattr(user, 'is_authenticated', False) or week is None:
+        return None
+    stored = SquadRecommendation.objects.filter(user=user, week=week).first()
+    if stored is None or stored.squad_hash != squad_hash(squad_data):
+        return None
+    if stored.dataset_version != get_dataset_version(SystemSettings.get_settings().current_gameweek):
+        return None
+    return stored
@@ -0,0 +1,184 @@
+"""
+Points-vs-cost Pareto frontier for squad selection.
+
+The lineup model is built once and re-solved for each budget in ascending
+order. Only the budget right-hand side changes between solves, and each solve
+is warm-started from the previous optimum, which stays feasible as the budget
+grows. Budgets above the cost of the budget-free optimum need no solve at all.
+Results are cached per dataset version.
+"""
+
+import math
+import time
+import pulp
+from django.core.cache import cache
+
+from MyApi.utils.dataset_version import get_dataset_version
+
+
+FRONTIER_CACHE_TIMEOUT = 60 * 60 * 6
+
+# Each budget is one solve; prices move in 0.1 steps, so finer steps add nothing
+MIN_BUDGET_STEP = 0.1
+MAX_BUDGET_STEPS = 201
+
+POSITION_COUNT_KEYS = {
+    'Keeper': 'keeper',
+    'Defender': 'defender',
+    'Midfielder': 'midfielder',
+    'Attacker': 'attacker',
+}
+
+
+def build_lineup_problem(squad_df, score_column, counts, budget):
+    """
+    Build the starting XI selection problem with a named, mutable budget constraint.
+
+    Returns:
+        tuple: (prob, choices)
+    """
+    scores = squad_df[score_column].astype(float).tolist()
+    costs = squad_df['Cost'].astype(float).tolist()
+    positions = squad_df['Position'].tolist()
+
+    choices = [pulp.LpVariable(f"player_{i}", cat=pulp.LpBinary) for i in range(len(squad_df))]
+    by_position = {position: [] for position in POSITION_COUNT_KEYS}
+    for i, position in enumerate(positions):
+        if position in by_position:
+            by_position[position].append(choices[i])
+
+    prob = pulp.LpProblem("FPL_Budget_Frontier", pulp.LpMaximize)
+    prob += pulp.LpAffineExpression(list(zip(choices, scores)))
+    prob += pulp.LpAffineExpression(list(zip(choices, costs))) <= budget, "budget"
+    for position, variables in by_position.items():
+        prob += pulp.LpAffineExpression([(var, 1) for var in variables]) == counts[POSITION_COUNT_KEYS[position]], f"count_{position}"
+    return prob, choices
+
+
+def budget_steps(min_budget, max_budget, step):
+    """
+    Inclusive list of budgets from min_budget to max_budget.
+
+    Raises:
+        ValueError: If the range or step is invalid, or the range needs more than MAX_BUDGET_STEPS budgets
+    """
+    if not all(math.isfinite(value) for value in (min_budget, max_budget, step)):
+        raise ValueError('Budgets and step must be finite numbers')
+    if step < MIN_BUDGET_STEP:
+        raise ValueError(f'step must be at least {MIN_BUDGET_STEP}')
+    if max_budget < min_budget:
+        raise ValueError('max_budget must not be below min_budget')
+    steps = int(round((max_budget - min_budget) / step))
+    if steps + 1 > MAX_BUDGET_STEPS:
+        raise ValueError(f'Budget range needs {steps + 1} budgets; at most {MAX_BUDGET_STEPS} are allowed')
+    return [round(min_budget + i * step, 2) for i in range(steps + 1)]
+
+
+def compute_budget_frontier(squad_df, score_column, counts, min_budget=75.0, max_budget=100.0, step=0.5):
+    """
+    Solve the lineup problem for every budget in the range.
+
+    Args:
+        squad_df (DataFrame): Candidate pool with 'Player', 'Position', 'Cost' and score columns
+        score_column (str): Column to maximise
+        counts (dict): Position counts keyed 'keeper', 'defender', 'midfielder', 'attacker'
+        min_budget (float): Lowest budget
+        max_budget (float): Highest budget
+        step (float): Budget increment (see budget_steps for the limits)
+
+    Returns:
+        dict: {
+            'points': list of {budget, total_score, total_cost, players, on_frontier, solve_time, warm_started},
+            'total_solve_time': float,
+            'solves': int
+        }
+    """
+    squad_df = squad_df.reset_index(drop=True)
+    budgets = budget_steps(min_budget, max_budget, step)
+    players = squad_df['Player'].tolist()
+    costs = squad_df['Cost'].astype(float).tolist()
+    scores = squad_df[score_column].astype(float).tolist()
+
+    prob, choices = build_lineup_problem(squad_df, score_column, counts, budgets[0])
+    budget_constraint = prob.constraints['budget']
+
+    def solve(budget, warm_start):
+        budget_constraint.constant = -budget
+        start = time.perf_counter()
+        prob.solve(pulp.PULP_CBC_CMD(msg=0, warmStart=warm_start))
+        elapsed = time.perf_counter() - start
+        if prob.status != pulp.LpStatusOptimal:
+            return None, elapsed
+        return [i for i, var in enumerate(choices) if var.varValue is not None and var.varValue > 0.5], elapsed
+
+    # The budget-free optimum answers every budget at or above its cost without a solve
+    unconstrained, total_solve_time = solve(sum(costs), False)
+    solves = 1
+    unconstrained_cost = sum(costs[i] for i in unconstrained) if unconstrained else None
+
+    points = []
+    best_score = None
+    warm_start = False
+    for budget in budgets:
+        if unconstrained is not None and unconstrained_cost <= budget + 1e-9:
+            selected, solve_time, warm_started = unconstrained, 0.0, False
+        else:
+            # The previous (smaller-budget) optimum is feasible here and seeds the solve
+            selected, solve_time = solve(budget, warm_start)
+            warm_started = warm_start
+            solves += 1
+            total_solve_time += solve_time
+            if selected is None:
+                warm_start = False
+                points.append({'budget': budget, 'feasible': False})
+                continue
+            warm_start = True
+
+        total_cost = round(sum(costs[i] for i in selected), 1)
+        total_score = round(sum(scores[i] for i in selected), 2)
+        on_frontier = best_score is None or total_score > best_score + 1e-9
+        if on_frontier:
+            best_score = total_score
+        points.append({
+            'budget': budget,
+            'feasible': True,
+            'total_score': total_score,
+            'total_cost': total_cost,
+            'players': [players[i] for i in selected],
+            'on_frontier': on_frontier,
+            'solve_time': round(solve_time, 4),
+            'warm_started': warm_started,
+        })
+
+    return {
+        'points': points,
+        'total_solve_time': round(total_solve_time, 4),
+        'solves': solves,
+    }
+
+
+def get_budget_frontier(selector, score_column, min_budget=75.0, max_budget=100.0, step=0.5):
+    """
+    Cached frontier for a selector's candidate pool.
+
+    Args:
+        selector: SquadSelector or SquadSelectorPoints instance
+        score_column (str): 'Elo' or 'ProjectedPoints'
+
+    Returns:
+        dict: Frontier result with 'cached' and 'dataset_version' added
+    """
+    version = get_dataset_version(selector.current_week)
+    cache_key = ':'.join(str(part) for part in (
+        'budget_frontier', score_column, selector.formation,
+        getattr(selector, 'games_to_consider', ''), min_budget, max_budget, step, version
+    ))
+    result = cache.get(cache_key)
+    if result is not None:
+        return dict(result, cached=True)
+
+    squad_df = selector.get_candidate_pool()
+    result = compute_budget_frontier(squad_df, score_column, selector.position_counts, min_budget, max_budget, step)
+    result['dataset_version'] = version
+    cache.set(cache_key, result, FRONTIER_CACHE_TIMEOUT)
+    return dict(result, cached=False)
@@ -0,0 +1,235 @@
+"""
+Captain and vice-captain selection.
+
+The captain's points count twice; if the captain does not play, the
+vice-captain's do instead. For a pair (c, v) the extra points are therefore
+X_c when c plays and X_v otherwise. Per-player inputs are:
+
+- mu: projected points for the gameweek (PlayerFixture, double gameweeks summed)
+- q: probability of not playing, from the share of recent PlayerMatch rows
+  with zero minutes
+- optionally, simulated samples bootstrapped from recent PlayerMatch points
+  and scaled to mu
+
+Without simulations the best pair maximises mu_c + q_c * mu_v, where v is
+the best other player. With simulations, every ordered pair among each
+squad's three highest projections is scored on the samples. Both modes work
+on all squads at once from the SquadMembership ownership matrix.
+"""
+
+import numpy as np
+from django.db.models import Sum
+
+from MyApi.models import PlayerFixture, PlayerMatch
+from MyApi.utils.squad_scoring import build_ownership_matrix
+
+
+HISTORY_MATCHES = 10
+SIMULATION_CHUNK = 2000
+
+
+def load_player_inputs(player_names, gameweek, history=HISTORY_MATCHES):
+    """
+    Projection, not-playing probability and recent history for each player.
+
+    Returns:
+        dict: {'mu': array, 'q': array, 'history': list of (points array, played array) or None}
+    """
+    projected = dict(
+        PlayerFixture.objects.filter(gameweek=gameweek, player_name__in=player_names)
+        .values_list('player_name').annotate(points=Sum('projected_points'))
+    )
+    recent = {}
+    rows = (
+        PlayerMatch.objects.filter(player_name__in=player_names)
+        .order_by('player_name', '-date')
+        .values_list('player_name', 'points', 'minutes_played')
+    )
+    for name, points, minutes in rows:
+        matches = recent.setdefault(name, [])
+        if len(matches) < history:
+            matches.append((points, minutes))
+
+    mu = np.array([projected.get(name) or 0.0 for name in player_names], dtype=np.float64)
+    q = np.zeros(len(player_names), dtype=np.float64)
+    histories = []
+    for i, name in enumerate(player_names):
+        matches = recent.get(name)
+        if not matches:
+            histories.append(None)
+            continue
+        points = np.array([m[0] for m in matches], dtype=np.float64)
+        played = np.array([m[1] > 0 for m in matches])
+        q[i] = 1.0 - played.mean()
+        histories.append((points, played))
+    return {'mu': mu, 'q': q, 'history': histories}
+
+
+def simulate_points(mu, histories, n_samples, seed=0):
+    """
+    Bootstrap point samples from each player's history, scaled so their mean is mu.
+    Players without history always play and score mu.
+
+    Returns:
+        tuple: (samples, played) arrays of shape (players, n_samples)
+    """
+    rng = np.random.default_rng(seed)
+    samples = np.repeat(mu[:, None], n_samples, axis=1)
+    played = np.ones((len(mu), n_samples), dtype=bool)
+    for i, history in enumerate(histories):
+        if history is None:
+            continue
+        points, did_play = history
+        draws = rng.integers(0, len(points), size=n_samples)
+        mean_points = points.mean()
+        if mean_points > 0:
+            samples[i] = mu[i] * points[draws] / mean_points
+        else:
+            play_rate = did_play.mean()
+            samples[i] = np.where(did_play[draws], mu[i] / play_rate, 0.0) if play_rate > 0 else 0.0
+        played[i] = did_play[draws]
+    return samples, played
+
+
+def _group_by_row(rows, cols, mu):
+    """Sort entries by row, then projection descending; return order and group starts."""
+    order = np.lexsort((-mu[cols], rows))
+    sorted_rows = rows[order]
+    starts = np.flatnonzero(np.r_[True, sorted_rows[1:] != sorted_rows[:-1]])
+    sizes = np.diff(np.r_[starts, len(order)])
+    return order, starts, sizes
+
+
+def pick_captains(rows, cols, mu, q):
+    """
+    Best (captain, vice) per squad from projections and not-playing probabilities.
+
+    Returns:
+        tuple: (squad_rows, captain_cols, vice_cols, expected_bonus); vice is -1 for one-player squads
+    """
+    if not len(rows):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, np.zeros(0)
+    order, starts, sizes = _group_by_row(rows, cols, mu)
+    entry_cols = cols[order]
+    entry_mu = mu[entry_cols]
+    group = np.repeat(np.arange(len(starts)), sizes)
+
+    best = entry_mu[starts]
+    second = np.where(sizes > 1, entry_mu[np.minimum(starts + 1, len(order) - 1)], 0.0)
+    is_best = np.arange(len(order)) == starts[group]
+    other_best = np.where(is_best, second[group], best[group])
+    value = entry_mu + q[entry_cols] * other_best
+
+    # First entry per squad after sorting by value descending is the captain
+    by_value = np.lexsort((-value, group))
+    captain_entry = by_value[starts]
+    captain_is_best = captain_entry == starts
+    vice_entry = np.where(captain_is_best, starts + 1, starts)
+    vice_cols = np.where(sizes > 1, entry_cols[np.minimum(vice_entry, len(order) - 1)], -1)
+    return rows[order][starts], entry_cols[captain_entry], vice_cols, value[captain_entry]
+
+
+def pick_captains_simulated(rows, cols, mu, samples, played, candidates=3):
+    """
+    Best (captain, vice) per squad by mean simulated captain bonus, trying every
+    ordered pair among each squad's `candidates` highest projections.
+
+    Returns:
+        tuple: (squad_rows, captain_cols, vice_cols, expected_bonus)
+    """
+    if not len(rows):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, np.zeros(0)
+    order, starts, sizes = _group_by_row(rows, cols, mu)
+    entry_cols = cols[order]
+    pairs = [(a, b) for a in range(candidates) for b in range(candidates) if a != b]
+
+    captain_cols = np.empty(len(starts), dtype=np.int64)
+    vice_cols = np.full(len(starts), -1, dtype=np.int64)
+    bonus = np.empty(len(starts))
+    for chunk in range(0, len(starts), SIMULATION_CHUNK):
+        chunk_starts = starts[chunk:chunk + SIMULATION_CHUNK]
+        chunk_sizes = sizes[chunk:chunk + SIMULATION_CHUNK]
+        offset_c = np.array([a for a, _ in pairs])
+        offset_v = np.array([b for _, b in pairs])
+        valid = (offset_c[None, :] < chunk_sizes[:, None]) & (offset_v[None, :] < chunk_sizes[:, None])
+        c_idx = entry_cols[np.minimum(chunk_starts[:, None] + offset_c[None, :], len(order) - 1)]
+        v_idx = entry_cols[np.minimum(chunk_starts[:, None] + offset_v[None, :], len(order) - 1)]
+        pair_bonus = np.where(played[c_idx], samples[c_idx], np.where(played[v_idx], samples[v_idx], 0.0)).mean(axis=-1)
+        pair_bonus = np.where(valid, pair_bonus, -np.inf)
+        best_pair = pair_bonus.argmax(axis=1)
+        picked = np.arange(len(chunk_starts))
+        single = chunk_sizes == 1
+        captain_cols[chunk:chunk + len(chunk_starts)] = np.where(single, entry_cols[chunk_starts], c_idx[picked, best_pair])
+        vice_cols[chunk:chunk + len(chunk_starts)] = np.where(single, -1, v_idx[picked, best_pair])
+        chunk_bonus = pair_bonus[picked, best_pair]
+        single_bonus = np.where(played[entry_cols[chunk_starts]], samples[entry_cols[chunk_starts]], 0.0).mean(axis=-1)
+        bonus[chunk:chunk + len(chunk_starts)] = np.where(single, single_bonus, chunk_bonus)
+    return rows[order][starts], captain_cols, vice_cols, bonus
+
+
+def _choose(rows, cols, player_names, gameweek, simulations, seed):
+    inputs = load_player_inputs(player_names, gameweek)
+    if simulations:
+        samples, played = simulate_points(inputs['mu'], inputs['history'], simulations, seed)
+        picks = pick_captains_simulated(rows, cols, inputs['mu'], samples, played)
+    else:
+        picks = pick_captains(rows, cols, inputs['mu'], inputs['q'])
+    return picks, inputs
+
+
+def _describe(player_names, inputs, captain, vice, bonus):
+    def player(i):
+        if i < 0:
+            return None
+        return {
+            'name': player_names[i],
+            'projected_points': round(float(inputs['mu'][i]), 2),
+            'not_playing_probability': round(float(inputs['q'][i]), 2),
+        }
+    return {'captain': player(captain), 'vice_captain': player(vice), 'expected_captain_bonus': round(float(bonus), 2)}
+
+
+def captain_for_squad(squad_data, gameweek, simulations=0, seed=0):
+    """
+    Captain and vice-captain for one squad dict.
+
+    Args:
+        squad_data (dict): Grouped squad ('goalkeepers', 'defenders', ...)
+        gameweek (int): Gameweek whose projections are used
+        simulations (int): Number of simulated samples (0 uses projections only)
+
+    Returns:
+        dict: {'captain', 'vice_captain', 'expected_captain_bonus'}
+    """
+    names = []
+    for group in ['goalkeepers', 'defenders', 'midfielders', 'forwards']:
+        for player in squad_data.get(group, []):
+            name = player.get('name') if isinstance(player, dict) else None
+            if name and name not in names:
+                names.append(name)
+    if not names:
+        return {'captain': None, 'vice_captain': None, 'expected_captain_bonus': 0.0}
+    rows = np.zeros(len(names), dtype=np.int64)
+    cols = np.arange(len(names), dtype=np.int64)
+    (_, captains, vices, bonus), inputs = _choose(rows, cols, names, gameweek, simulations, seed)
+    return _describe(names, inputs, captains[0], vices[0], bonus[0])
+
+
+def captains_for_all_squads(week, gameweek=None, simulations=0, seed=0):
+    """
+    Captain and vice-captain for every squad saved for a week, in one vectorized pass.
+
+    Returns:
+        dict: {user_id: {'captain', 'vice_captain', 'expected_captain_bonus'}}
+    """
+    gameweek = week if gameweek is None else gameweek
+    user_ids, player_names, rows, cols = build_ownership_matrix(week)
+    if not len(rows):
+        return {}
+    (squad_rows, captains, vices, bonus), inputs = _choose(rows, cols, player_names, gameweek, simulations, seed)
+    return {
+        user_ids[row]: _describe(player_names, inputs, captain, vice, value)
+        for row, captain, vice, value in zip(squad_rows, captains, vices, bonus)
+    }
@@ -0,0 +1,52 @@
+"""
+Dataset version tokens for caching derived results.
+
+The version is a counter in the single DatasetVersion row, advanced whenever
+player rows, projections, fixtures or Elo calculations are written, so a
+cached result is validated with one primary-key read instead of scanning
+those tables. Row saves advance it through post_save signals (admin, import
+commands, update_or_create); bulk writers (bulk_create, bulk_update,
+queryset update/delete) call bump_dataset_version themselves.
+"""
+
+from django.db.models import F
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+
+def get_dataset_version(week):
+    """
+    Build a version token for the player and projection data of a week.
+
+    Args:
+        week (int): Game week whose Player rows are used
+
+    Returns:
+        str: Token combining the week and the dataset version counter
+    """
+    from MyApi.models import DatasetVersion
+
+    version = DatasetVersion.objects.filter(pk=1).values_list('version', flat=True).first()
+    return f"{week}:{version or 0}"
+
+
+def bump_dataset_version():
+    """Advance the dataset version after a write (rolled back with its transaction)."""
+    from MyApi.models import DatasetVersion
+
+    if not DatasetVersion.objects.filter(pk=1).update(version=F('version') + 1, updated_at=timezone.now()):
+        DatasetVersion.objects.get_or_create(pk=1, defaults={'version': 1})
+
+
+def _row_saved(sender, raw=False, **kwargs):
+    # Fixture loading (raw) writes rows as-is and should not touch the counter
+    if not raw:
+        bump_dataset_version()
+
+
+def connect_signals():
+    """Advance the version whenever a versioned model row is saved."""
+    from MyApi.models import EloCalculation, Player, PlayerFixture, ProjectedPoints
+
+    for model in (Player, ProjectedPoints, PlayerFixture, EloCalculation):
+        post_save.connect(_row_saved, sender=model, dispatch_uid=f'dataset_version_{model.__name__}')
@@ -149,7 +149,7 @@ async def calculate_elo_for_single_player(player_name: str) -> Optional[Dict[str
                             # fallback to previous cost if available
                             existing_player = Player.objects.filter(name=player_name).order_by('-week').first()
                             player.cost = existing_player.cost if existing_player else 0.0
-                        player.save(update_fields=['elo', 'cost', 'week'])
+                        player.save(update_fields=['elo', 'cost', 'week', 'updated_at'])
                     else:
                         print(f"[WARN] No Player record found for {player_name}, skipping update.")
             await sync_to_async(update_player)()
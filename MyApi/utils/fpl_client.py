@@ -0,0 +1,160 @@
+"""
+Shared FPL API client for refresh runs.
+
+One FPLClient holds a pooled aiohttp session (connection limit, keep-alive,
+timeouts) behind the response cache, with retries on network errors,
+rate limiting and server errors. The bootstrap-static data is downloaded
+once per client and kept as a snapshot; players, teams and gameweeks for
+every step of the run come from that snapshot.
+
+    async with fpl_client() as client:
+        fpl = await client.fpl()
+
+The outermost `fpl_client()` opens the client and ends the run; nested
+calls (e.g. the cost, position, fixture and import steps run one after
+another by `refresh_fpl_data`) reuse it instead of opening their own.
+"""
+
+import asyncio
+import contextvars
+import time
+from contextlib import asynccontextmanager
+
+import aiohttp
+from django.conf import settings
+
+from MyApi.utils.fpl_http_cache import (
+    BOOTSTRAP_URL,
+    DEFAULT_API_BASE_URL,
+    CachingSession,
+    fetch_json,
+    fpl_from_bootstrap,
+)
+
+
+FIXTURES_URL = DEFAULT_API_BASE_URL + 'fixtures/'
+EVENT_LIVE_URL = DEFAULT_API_BASE_URL + 'event/{}/live/'
+
+DEFAULT_POOL_SIZE = 20
+DEFAULT_KEEPALIVE_TIMEOUT = 30
+DEFAULT_REQUEST_TIMEOUT = 30
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.5
+
+_current_client = contextvars.ContextVar('fpl_client', default=None)
+
+
+class BootstrapSnapshot:
+    """bootstrap-static data downloaded once for a run."""
+
+    def __init__(self, data):
+        self.data = data
+        self.fetched_at = time.time()
+
+    @property
+    def players(self):
+        return self.data.get('elements', [])
+
+    @property
+    def teams(self):
+        return self.data.get('teams', [])
+
+    @property
+    def gameweeks(self):
+        return self.data.get('events', [])
+
+    @property
+    def current_gameweek(self):
+        return next((event['id'] for event in self.gameweeks if event.get('is_current')), None)
+
+
+class FPLClient:
+    """Pooled, cached FPL API session with a per-run bootstrap snapshot."""
+
+    def __init__(self, pool_size=None, request_timeout=None, retries=None, backoff=DEFAULT_BACKOFF, cache_mode=None):
+        self.pool_size = pool_size or getattr(settings, 'FPL_HTTP_POOL_SIZE', DEFAULT_POOL_SIZE)
+        self.request_timeout = request_timeout or getattr(settings, 'FPL_HTTP_TIMEOUT', DEFAULT_REQUEST_TIMEOUT)
+        self.retries = DEFAULT_RETRIES if retries is None else retries
+        self.backoff = backoff
+        self.cache_mode = cache_mode
+        self.session = None
+        self._raw_session = None
+        self._snapshot = None
+        self._fpl = None
+        self._fixtures = None
+        self._lock = asyncio.Lock()
+
+    async def open(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            limit_per_host=self.pool_size,
+            keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=300,
+        )
+        self._raw_session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+        )
+        self.session = CachingSession(self._raw_session, mode=self.cache_mode, retries=self.retries, backoff=self.backoff)
+        return self
+
+    async def close(self):
+        if self._raw_session is not None:
+            await self._raw_session.close()
+            self._raw_session = None
+            self.session = None
+
+    async def get_json(self, url):
+        """GET a URL through the pooled, cached session."""
+        return await fetch_json(self.session, url)
+
+    async def bootstrap(self):
+        """The run's BootstrapSnapshot, downloaded on first use."""
+        async with self._lock:
+            if self._snapshot is None:
+                self._snapshot = BootstrapSnapshot(await self.get_json(BOOTSTRAP_URL))
+            return self._snapshot
+
+    async def fpl(self):
+        """FPL library client sharing the session and built from the snapshot."""
+        snapshot = await self.bootstrap()
+        if self._fpl is None:
+            self._fpl = fpl_from_bootstrap(self.session, snapshot.data)
+        return self._fpl
+
+    async def fixtures(self):
+        """All season fixtures, downloaded once per run."""
+        if self._fixtures is None:
+            self._fixtures = await self.get_json(FIXTURES_URL)
+        return self._fixtures
+
+    async def event_live(self, gameweek):
+        """Live stats for every player in a gameweek (one request, not kept per run)."""
+        return await self.get_json(EVENT_LIVE_URL.format(gameweek))
+
+
+def current_client():
+    """FPLClient of the active run, or None."""
+    return _current_client.get()
+
+
+@asynccontextmanager
+async def fpl_client(**options):
+    """
+    FPLClient for the current run. Reuses the active client when called
+    inside another fpl_client() block; otherwise opens one and closes it on exit.
+
+    Args:
+        **options: FPLClient options for a newly opened client
+    """
+    active = _current_client.get()
+    if active is not None:
+        yield active
+        return
+    client = await FPLClient(**options).open()
+    token = _current_client.set(client)
+    try:
+        yield client
+    finally:
+        _current_client.reset(token)
+        await client.close()
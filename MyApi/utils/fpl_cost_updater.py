@@ -8,52 +8,110 @@ Key features:
 - Fetches real-time player costs from FPL API
 - Updates database costs without affecting Elo ratings
 - Handles individual player lookups and bulk updates
+- Downloads the FPL player list once per run into a normalized name -> cost index
 - Proper error handling and progress tracking
 """
 
 import time
-import aiohttp
+import unicodedata
 from typing import Dict, List, Any, Optional
 from asgiref.sync import sync_to_async
 
 
-async def get_player_cost_from_fpl(player_name: str) -> Optional[float]:
+# Letters that Unicode decomposition does not reduce to ASCII
+_NAME_TRANSLATION = str.maketrans({'ø': 'o', 'æ': 'ae', 'œ': 'oe', 'ß': 'ss', 'đ': 'd', 'ł': 'l', 'ı': 'i', 'þ': 'th'})
+
+
+def normalize_player_name(name: str) -> str:
+    """
+    Normalize a player name for matching: accents removed, lower case,
+    underscores treated as spaces and whitespace collapsed
+    """
+    decomposed = unicodedata.normalize('NFKD', name or '')
+    without_accents = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(without_accents.replace('_', ' ').lower().translate(_NAME_TRANSLATION).split())
+
+
+async def get_fpl_cost_index() -> Dict[str, float]:
+    """
+    Download the FPL player list once and index costs by normalized full name
+
+    Returns:
+        Dict[str, float]: Normalized name -> cost in millions (e.g., 9.0 for £9.0m)
+    """
+    from MyApi.utils.fpl_client import fpl_client
+
+    async with fpl_client() as client:
+        players = (await client.bootstrap()).players
+
+    index = {}
+    for player in players:
+        full_name = f"{player['first_name']} {player['second_name']}"
+        # FPL API returns cost in tenths (e.g., 90 for £9.0m)
+        index.setdefault(normalize_player_name(full_name), round(player['now_cost'] / 10, 1))
+    return index
+
+
+async def get_fpl_costs_by_id() -> Dict[int, float]:
+    """
+    FPL costs indexed by element id, from the same player list as get_fpl_cost_index
+
+    Returns:
+        Dict[int, float]: FPL element id -> cost in millions
+    """
+    from MyApi.utils.fpl_client import fpl_client
+
+    async with fpl_client() as client:
+        players = (await client.bootstrap()).players
+    return {player['id']: round(player['now_cost'] / 10, 1) for player in players}
+
+
+async def get_player_cost_from_fpl(player_name: str, cost_index: Optional[Dict[str, float]] = None) -> Optional[float]:
     """
     Get player cost from FPL API
     
     Args:
         player_name (str): Player name to search for
+        cost_index (dict, optional): Index from get_fpl_cost_index, downloaded if not given
         
     Returns:
         Optional[float]: Player cost in millions (e.g., 9.0 for £9.0m) or None if not found
     """
     try:
-        from fpl import FPL
-        
-        async with aiohttp.ClientSession() as session:
-            fpl = FPL(session)
-            players = await fpl.get_players()
-            
-            for player in players:
-                full_name = f"{player.first_name} {player.second_name}"
-                if full_name.lower() == player_name.lower():
-                    # FPL API returns cost in tenths (e.g., 90 for £9.0m)
-                    cost = round(player.now_cost / 10, 1)
-                    return cost
-            
-            return None
+        if cost_index is None:
+            cost_index = await get_fpl_cost_index()
+        return cost_index.get(normalize_player_name(player_name))
     except Exception as e:
         print(f"Error getting FPL cost for {player_name}: {e}")
         return None
 
 
-async def update_player_cost(player_name: str, current_week: int = None) -> Dict[str, Any]:
+def _cost_update(player_name: str, old_cost: float, fpl_cost: float) -> Dict[str, Any]:
+    """Result dict for one player's cost comparison"""
+    cost_change = fpl_cost - old_cost
+    result = {
+        'success': True,
+        'player_name': player_name,
+        'old_cost': old_cost,
+        'new_cost': fpl_cost,
+        'cost_change': cost_change,
+        # Update if there's a significant difference
+        'updated': abs(cost_change) > 0.05,  # Only update if difference > £0.05m
+    }
+    if not result['updated']:
+        result['message'] = 'No significant cost change'
+    return result
+
+
+async def update_player_cost(player_name: str, current_week: int = None,
+                             cost_index: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
     """
     Update cost for a single player from FPL API
     
     Args:
         player_name (str): Name of the player to update
         current_week (int, optional): Game week to update cost for
+        cost_index (dict, optional): Index from get_fpl_cost_index, downloaded if not given
     
     Returns:
         Dict[str, Any]: Update result with status and details
@@ -80,7 +138,7 @@ async def update_player_cost(player_name: str, current_week: int = None) -> Dict
             }
         
         # Get FPL cost
-        fpl_cost = await get_player_cost_from_fpl(player_name)
+        fpl_cost = await get_player_cost_from_fpl(player_name, cost_index)
         
         if fpl_cost is None:
             return {
@@ -89,32 +147,11 @@ async def update_player_cost(player_name: str, current_week: int = None) -> Dict
                 'player_name': player_name
             }
         
-        # Update if there's a significant difference
-        old_cost = player_obj.cost
-        cost_change = fpl_cost - old_cost
-        
-        if abs(cost_change) > 0.05:  # Only update if difference > £0.05m
+        result = _cost_update(player_name, player_obj.cost, fpl_cost)
+        if result['updated']:
             player_obj.cost = fpl_cost
             await sync_to_async(player_obj.save)()
-            
-            return {
-                'success': True,
-                'player_name': player_name,
-                'old_cost': old_cost,
-                'new_cost': fpl_cost,
-                'cost_change': cost_change,
-                'updated': True
-            }
-        else:
-            return {
-                'success': True,
-                'player_name': player_name,
-                'old_cost': old_cost,
-                'new_cost': fpl_cost,
-                'cost_change': cost_change,
-                'updated': False,
-                'message': 'No significant cost change'
-            }
+        return result
             
     except Exception as e:
         return {
@@ -124,9 +161,58 @@ async def update_player_cost(player_name: str, current_week: int = None) -> Dict
         }
 
 
+def _apply_cost_updates(current_week: int, cost_index: Dict[str, float],
+                        costs_by_id: Optional[Dict[int, float]] = None) -> Dict[str, Any]:
+    """
+    Compare every Player row of a week with the FPL costs and save changes with one bulk_update.
+    Rows linked to an FPL element are looked up by id, others by normalized name.
+    """
+    from django.db import transaction
+    from django.utils import timezone
+    from MyApi.models import Player
+
+    players = list(Player.objects.filter(week=current_week))
+    by_name = {}
+    for player in players:
+        by_name.setdefault(player.name, []).append(player)
+
+    results = []
+    changed = []
+    now = timezone.now()
+    for player_name, rows in by_name.items():
+        fpl_id = rows[0].fpl_id
+        if fpl_id is not None and costs_by_id is not None:
+            fpl_cost = costs_by_id.get(fpl_id)
+        else:
+            fpl_cost = cost_index.get(normalize_player_name(player_name))
+        if fpl_cost is None:
+            results.append({
+                'success': False,
+                'error': f'Could not fetch FPL cost for {player_name}',
+                'player_name': player_name
+            })
+            continue
+        result = _cost_update(player_name, rows[0].cost, fpl_cost)
+        if result['updated']:
+            for row in rows:
+                row.cost = fpl_cost
+                row.updated_at = now
+                changed.append(row)
+        results.append(result)
+
+    with transaction.atomic():
+        Player.objects.bulk_update(changed, ['cost', 'updated_at'], batch_size=500)
+        if changed:
+            bump_dataset_version()
+    return {'results': results, 'rows_updated': len(changed)}
+
+
 async def update_all_player_costs_from_fpl(current_week: int = None, show_progress: bool = True) -> Dict[str, Any]:
     """
     Update all player costs from FPL API without affecting Elo ratings
+
+    The FPL player list is downloaded once and the week's Player rows are
+    updated with a single bulk_update.
     
     Args:
         current_week (int, optional): Game week to update costs for
@@ -141,7 +227,7 @@ async def update_all_player_costs_from_fpl(current_week: int = None, show_progre
     start_time = time.time()
     
     # Import models here to avoid circular imports
-    from MyApi.models import Player, SystemSettings
+    from MyApi.models import SystemSettings
     
     try:
         # Get current week from system settings if not provided
@@ -149,33 +235,37 @@ async def update_all_player_costs_from_fpl(current_week: int = None, show_progre
             settings = await sync_to_async(SystemSettings.get_settings)()
             current_week = settings.current_gameweek
         
-        # Get all unique players for the current week
-        unique_players = await sync_to_async(list)(
-            Player.objects.filter(week=current_week).values_list('name', flat=True).distinct()
-        )
-        
-        total_players = len(unique_players)
+        if show_progress:
+            print(f"📅 Week: {current_week}")
+
+        # One download for the whole run
+        from MyApi.utils.fpl_client import fpl_client
+        async with fpl_client():
+            cost_index = await get_fpl_cost_index()
+            costs_by_id = await get_fpl_costs_by_id()
+        if show_progress:
+            print(f"📥 Loaded {len(costs_by_id)} FPL player costs")
+
+        outcome = await sync_to_async(_apply_cost_updates)(current_week, cost_index, costs_by_id)
+        results = outcome['results']
+        total_players = len(results)
         
         if show_progress:
             print(f"👥 Total players to update costs for: {total_players}")
-            print(f"📅 Week: {current_week}")
         
         successful_updates = 0
         failed_updates = 0
         cost_changes = []
         players_updated = 0
         
-        # Process each player individually
-        for i, player_name in enumerate(unique_players, 1):
-            result = await update_player_cost(player_name, current_week)
-            
+        for result in results:
             if result['success']:
                 successful_updates += 1
                 
                 if result.get('updated', False):
                     players_updated += 1
                     cost_changes.append({
-                        'player': player_name,
+                        'player': result['player_name'],
                         'old_cost': result['old_cost'],
                         'new_cost': result['new_cost'],
                         'change': result['cost_change']
@@ -183,15 +273,11 @@ async def update_all_player_costs_from_fpl(current_week: int = None, show_progre
                     
                     # Show progress for significant changes
                     if show_progress and abs(result['cost_change']) > 0.5:
-                        print(f"💰 {player_name}: £{result['old_cost']:.1f}m → £{result['new_cost']:.1f}m")
+                        print(f"💰 {result['player_name']}: £{result['old_cost']:.1f}m → £{result['new_cost']:.1f}m")
             else:
                 failed_updates += 1
                 if show_progress and failed_updates <= 5:  # Show first few failures
                     print(f"❌ {result.get('error', 'Unknown error')}")
-            
-            # Show progress every 100 players
-            if show_progress and (i % 100 == 0 or i == total_players):
-                print(f"🔄 Progress: {i}/{total_players} players processed")
         
         # Summary
         end_time = time.time()
@@ -243,41 +329,21 @@ async def check_player_costs_vs_fpl(player_names: List[str], current_week: int =
     if current_week is None:
         settings = await sync_to_async(SystemSettings.get_settings)()
         current_week = settings.current_gameweek
+
+    # One download and one query for all players
+    try:
+        cost_index = await get_fpl_cost_index()
+    except Exception as e:
+        print(f"Error getting FPL costs: {e}")
+        cost_index = {}
+    db_costs = dict(await sync_to_async(list)(
+        Player.objects.filter(name__in=player_names, week=current_week).values_list('name', 'cost')
+    ))
     
     results = []
     
     for player_name in player_names:
-        try:
-            # Get database cost
-            player = await sync_to_async(Player.objects.get)(
-                name=player_name, week=current_week
-            )
-            db_cost = player.cost
-            
-            # Get FPL cost
-            fpl_cost = await get_player_cost_from_fpl(player_name)
-            
-            if fpl_cost is not None:
-                difference = fpl_cost - db_cost
-                results.append({
-                    'player_name': player_name,
-                    'db_cost': db_cost,
-                    'fpl_cost': fpl_cost,
-                    'difference': difference,
-                    'match': abs(difference) < 0.1,
-                    'status': 'success'
-                })
-            else:
-                results.append({
-                    'player_name': player_name,
-                    'db_cost': db_cost,
-                    'fpl_cost': None,
-                    'difference': None,
-                    'match': False,
-                    'status': 'fpl_not_found'
-                })
-                
-        except Player.DoesNotExist:
+        if player_name not in db_costs:
             results.append({
                 'player_name': player_name,
                 'db_cost': None,
@@ -286,15 +352,32 @@ async def check_player_costs_vs_fpl(player_names: List[str], current_week: int =
                 'match': False,
                 'status': 'player_not_found'
             })
-        except Exception as e:
+            continue
+
+        # Get database cost
+        db_cost = db_costs[player_name]
+
+        # Get FPL cost
+        fpl_cost = cost_index.get(normalize_player_name(player_name))
+
+        if fpl_cost is not None:
+            difference = fpl_cost - db_cost
+            results.append({
+                'player_name': player_name,
+                'db_cost': db_cost,
+                'fpl_cost': fpl_cost,
+                'difference': difference,
+                'match': abs(difference) < 0.1,
+                'status': 'success'
+            })
+        else:
             results.append({
                 'player_name': player_name,
-                'db_cost': None,
+                'db_cost': db_cost,
                 'fpl_cost': None,
                 'difference': None,
                 'match': False,
-                'status': 'error',
-                'error': str(e)
+                'status': 'fpl_not_found'
             })
     
     return {
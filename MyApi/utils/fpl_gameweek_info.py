@@ -6,7 +6,6 @@ Provides simple functions to get current gameweek data for display purposes.
 """
 
 import asyncio
-import aiohttp
 from typing import Dict, Any, Optional
 from asgiref.sync import sync_to_async
 
@@ -26,10 +25,10 @@ async def get_current_gameweek_info() -> Dict[str, Any]:
             - error: str (if failed)
     """
     try:
-        from fpl import FPL
+        from MyApi.utils.fpl_client import fpl_client
         
-        async with aiohttp.ClientSession() as session:
-            fpl = FPL(session)
+        async with fpl_client() as client:
+            fpl = await client.fpl()
             
             # Get all gameweeks
             gameweeks = await fpl.get_gameweeks()
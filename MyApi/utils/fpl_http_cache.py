@@ -0,0 +1,349 @@
+"""
+On-disk cache for FPL API responses.
+
+Responses are stored per URL under settings.FPL_HTTP_CACHE_DIR together with
+their ETag and Last-Modified headers. A cached response is served while it is
+younger than its endpoint's TTL; after that the request is revalidated with
+If-None-Match / If-Modified-Since and a 304 reply renews the stored copy
+instead of downloading it again. Player summaries (live match data) have a
+zero TTL, so they are always revalidated. Only successful (2xx) JSON replies
+are stored.
+
+CachingSession holds the only retry policy for FPL requests: network errors,
+timeouts, rate limiting (429), server errors and non-JSON success replies
+(the rate-limit page the API sometimes serves with a 200) are retried with
+exponential backoff. Callers make one attempt each.
+
+Modes (settings.FPL_HTTP_CACHE_MODE):
+- 'normal': serve fresh entries, revalidate stale ones, record new responses
+- 'replay': serve recorded responses only and never touch the network
+- 'off': pass every request straight through
+
+Requests for the public API are sent to settings.FPL_API_BASE_URL, so a
+local stand-in server (see fpl_standin) can replace it. A base URL other than
+the public API is only used when settings.FPL_API_ALLOW_CUSTOM_BASE_URL is
+set, since the importers write whatever it serves to the database.
+
+CachingSession wraps an aiohttp session and can be handed to FPL(...) or
+used directly; create_fpl builds an FPL client whose bootstrap data also
+comes through the cache (the library's own constructor downloads it with a
+blocking urlopen).
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+from urllib.parse import urlparse
+
+import aiohttp
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+DEFAULT_CACHE_MODE = 'normal'
+CACHE_MODES = ('normal', 'replay', 'off')
+
+# Seconds a response is served without revalidation, by first path segment after /api/
+# (0 revalidates every request, which costs a 304 when nothing changed)
+DEFAULT_TTLS = {
+    'bootstrap-static': 15 * 60,
+    'fixtures': 30 * 60,
+    'element-summary': 0,
+    'event': 60,
+    'default': 5 * 60,
+}
+
+DEFAULT_API_BASE_URL = 'https://fantasy.premierleague.com/api/'
+BOOTSTRAP_URL = DEFAULT_API_BASE_URL + 'bootstrap-static/'
+
+
+class FPLCacheMiss(LookupError):
+    """Raised in replay mode when a URL has no recorded response."""
+
+
+def api_url(url):
+    """
+    Point a public FPL API URL at settings.FPL_API_BASE_URL.
+
+    Raises:
+        ImproperlyConfigured: If the base URL is not the public API and
+            settings.FPL_API_ALLOW_CUSTOM_BASE_URL is not set
+    """
+    base = getattr(settings, 'FPL_API_BASE_URL', DEFAULT_API_BASE_URL) or DEFAULT_API_BASE_URL
+    if base != DEFAULT_API_BASE_URL and url.startswith(DEFAULT_API_BASE_URL):
+        if not getattr(settings, 'FPL_API_ALLOW_CUSTOM_BASE_URL', False):
+            raise ImproperlyConfigured(
+                f"FPL_API_BASE_URL is {base}, not the public FPL API; set FPL_API_ALLOW_CUSTOM_BASE_URL=1 "
+                f"to import from it into the configured database"
+            )
+        return base.rstrip('/') + '/' + url[len(DEFAULT_API_BASE_URL):]
+    return url
+
+
+def endpoint_key(url):
+    """First path segment after /api/ ('bootstrap-static', 'element-summary', ...)."""
+    path = urlparse(url).path
+    if '/api/' in path:
+        path = path.split('/api/', 1)[1]
+    return path.strip('/').split('/', 1)[0] or 'default'
+
+
+def get_ttl(url):
+    """TTL in seconds for a URL, from settings.FPL_HTTP_CACHE_TTLS over the defaults."""
+    ttls = dict(DEFAULT_TTLS)
+    ttls.update(getattr(settings, 'FPL_HTTP_CACHE_TTLS', {}))
+    return ttls.get(endpoint_key(url), ttls['default'])
+
+
+class FPLResponseCache:
+    """URL-keyed JSON files holding a response body, its validators and when it was fetched."""
+
+    def __init__(self, directory=None):
+        self.directory = str(directory or getattr(settings, 'FPL_HTTP_CACHE_DIR'))
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, url):
+        return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest() + '.json')
+
+    def get(self, url):
+        try:
+            with open(self.path(url), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, url, body, etag=None, last_modified=None):
+        entry = {
+            'url': url,
+            'fetched_at': time.time(),
+            'etag': etag,
+            'last_modified': last_modified,
+            'body': body,
+        }
+        # Write to a temporary file and rename so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self.path(url))
+        return entry
+
+    def touch(self, url, entry):
+        """Mark a revalidated entry as fresh again."""
+        return self.set(url, entry['body'], entry.get('etag'), entry.get('last_modified'))
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                os.remove(os.path.join(self.directory, name))
+
+
+class CachedResponse:
+    """Minimal aiohttp-like response for a cached or freshly read body."""
+
+    def __init__(self, url, status, body, headers=None, from_cache=False, request_info=None, history=()):
+        self.url = url
+        self.status = status
+        self.headers = headers or {}
+        self.from_cache = from_cache
+        self.request_info = request_info
+        self.history = history
+        self._body = body
+
+    async def text(self):
+        return self._body
+
+    async def read(self):
+        return self._body.encode('utf-8')
+
+    async def json(self, **kwargs):
+        try:
+            return json.loads(self._body)
+        except ValueError:
+            raise aiohttp.ContentTypeError(
+                self.request_info, self.history, status=self.status, message='Response is not JSON'
+            )
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(self.request_info, self.history, status=self.status)
+
+    def release(self):
+        pass
+
+
+class _RequestContext:
+    """Supports both `async with session.get(...)` and `await session.get(...)`."""
+
+    def __init__(self, coro):
+        self._coro = coro
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    async def __aenter__(self):
+        return await self._coro
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+def _is_json(body):
+    try:
+        json.loads(body)
+    except ValueError:
+        return False
+    return True
+
+
+class CachingSession:
+    """
+    aiohttp session wrapper that serves GET requests from the response cache.
+    Other attributes are delegated to the wrapped session.
+    """
+
+    def __init__(self, session=None, cache=None, mode=None, retries=0, backoff=0.5):
+        self._session = session
+        self._owns_session = session is None
+        self.cache = cache or FPLResponseCache()
+        self.mode = mode or getattr(settings, 'FPL_HTTP_CACHE_MODE', DEFAULT_CACHE_MODE)
+        if self.mode not in CACHE_MODES:
+            raise ValueError(f"Unknown FPL cache mode '{self.mode}'")
+        self.retries = retries
+        self.backoff = backoff
+        self.stats = {'hits': 0, 'revalidated': 0, 'downloads': 0, 'retries': 0}
+
+    async def __aenter__(self):
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def get(self, url, **kwargs):
+        return _RequestContext(self._get(api_url(str(url)), kwargs))
+
+    async def _get(self, url, kwargs):
+        if self.mode == 'off':
+            return await self._download(url, kwargs)
+
+        entry = self.cache.get(url)
+        if self.mode == 'replay':
+            if entry is None:
+                raise FPLCacheMiss(f"No recorded response for {url}")
+            self.stats['hits'] += 1
+            return CachedResponse(url, 200, entry['body'], from_cache=True)
+
+        if entry is not None and time.time() - entry['fetched_at'] < get_ttl(url):
+            self.stats['hits'] += 1
+            return CachedResponse(url, 200, entry['body'], from_cache=True)
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return await self._download(url, dict(kwargs, headers=headers), entry)
+
+    async def _download(self, url, kwargs, entry=None):
+        attempt = 0
+        while True:
+            try:
+                async with self._session.get(url, **kwargs) as response:
+                    body = await response.text()
+                    status = response.status
+                    response_headers = dict(response.headers)
+                    etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+                    request_info, history = response.request_info, response.history
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt >= self.retries:
+                    raise
+            else:
+                success = 200 <= status < 300
+                is_json = success and _is_json(body)
+                # Rate limiting, server errors and non-JSON rate-limit pages are retried too
+                if not (status == 429 or status >= 500 or success and not is_json) or attempt >= self.retries:
+                    break
+            self.stats['retries'] += 1
+            await asyncio.sleep(self.backoff * (2 ** attempt))
+            attempt += 1
+
+        if status == 304 and entry is not None:
+            self.stats['revalidated'] += 1
+            self.cache.touch(url, entry)
+            return CachedResponse(url, 200, entry['body'], response_headers, from_cache=True)
+
+        self.stats['downloads'] += 1
+        # Rate-limit or error pages are never cached
+        if is_json and self.mode == 'normal':
+            self.cache.set(url, body, etag, last_modified)
+        return CachedResponse(url, status, body, response_headers, request_info=request_info, history=history)
+
+
+async def fetch_json(session, url):
+    """
+    GET a URL through a (caching) session and decode the JSON body.
+
+    Raises:
+        aiohttp.ClientResponseError: If the reply is not successful (2xx)
+    """
+    async with session.get(url) as response:
+        if not 200 <= response.status < 300:
+            raise aiohttp.ClientResponseError(
+                response.request_info, response.history, status=response.status,
+                message=f"Unexpected status {response.status} for {url}",
+            )
+        return await response.json()
+
+
+async def create_fpl(session):
+    """
+    FPL client whose bootstrap-static data is read through `session`
+    instead of the library's uncached urlopen.
+
+    Args:
+        session: CachingSession (or plain aiohttp session)
+
+    Returns:
+        FPL
+    """
+    static = await fetch_json(session, BOOTSTRAP_URL)
+    return fpl_from_bootstrap(session, static)
+
+
+def fpl_from_bootstrap(session, static):
+    """
+    FPL client built from already downloaded bootstrap-static data.
+
+    Args:
+        session: Session used for the client's further requests
+        static (dict): bootstrap-static JSON
+
+    Returns:
+        FPL
+    """
+    from fpl import FPL
+
+    fpl = FPL.__new__(FPL)
+    fpl.session = session
+    # Same attribute layout as FPL.__init__
+    for key, value in static.items():
+        try:
+            value = {item['id']: item for item in value}
+        except (KeyError, TypeError):
+            pass
+        setattr(fpl, key, value)
+    fpl.current_gameweek = next((event['id'] for event in static.get('events', []) if event['is_current']), 0)
+    return fpl
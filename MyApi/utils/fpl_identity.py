@@ -0,0 +1,103 @@
+"""
+FPL element ids on player-keyed tables.
+
+Player, PlayerMatch, PlayerFixture and ProjectedPoints store the FPL element
+id in `fpl_id`. The FPL importers set it on the rows they write, and
+lookups use it before falling back to the player name. link_fpl_ids fills
+it in for rows written before, or by code without FPL data (CSV imports),
+by matching normalized names against the FPL player list. A name shared by
+several FPL players is left unlinked rather than guessed.
+"""
+
+from typing import Dict, List, Any
+from asgiref.sync import sync_to_async
+
+
+def fpl_full_name(element: Dict[str, Any]) -> str:
+    """'First Second' name of an FPL player (element) dict."""
+    return f"{element['first_name']} {element['second_name']}"
+
+
+def build_fpl_id_index(elements: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Index FPL element ids by normalized full name
+
+    Args:
+        elements (List[Dict]): FPL player (element) dicts
+
+    Returns:
+        Dict[str, int]: Normalized name -> element id, without names shared by several players
+    """
+    from MyApi.utils.fpl_cost_updater import normalize_player_name
+
+    index = {}
+    ambiguous = set()
+    for element in elements:
+        key = normalize_player_name(fpl_full_name(element))
+        if index.setdefault(key, element['id']) != element['id']:
+            ambiguous.add(key)
+    for key in ambiguous:
+        del index[key]
+    return index
+
+
+def _player_keyed_models():
+    from MyApi.models import Player, PlayerFixture, PlayerMatch, ProjectedPoints
+
+    return ((Player, 'name'), (PlayerMatch, 'player_name'), (PlayerFixture, 'player_name'), (ProjectedPoints, 'player_name'))
+
+
+def link_fpl_ids(elements: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Set fpl_id on unlinked rows of every player-keyed table whose name matches an FPL player
+
+    Args:
+        elements (List[Dict]): FPL player (element) dicts
+
+    Returns:
+        Dict[str, int]: Rows linked per table
+    """
+    from django.db import transaction
+    from django.utils import timezone
+    from MyApi.utils.dataset_version import bump_dataset_version
+    from MyApi.utils.fpl_cost_updater import normalize_player_name
+
+    index = build_fpl_id_index(elements)
+    now = timezone.now()
+    linked = {}
+    with transaction.atomic():
+        for model, name_field in _player_keyed_models():
+            count = 0
+            unlinked = model.objects.filter(fpl_id__isnull=True)
+            # order_by() clears the model ordering so DISTINCT applies to names only
+            for name in unlinked.order_by().values_list(name_field, flat=True).distinct():
+                fpl_id = index.get(normalize_player_name(name))
+                if fpl_id is None:
+                    continue
+                values = {'fpl_id': fpl_id}
+                if any(field.name == 'updated_at' for field in model._meta.fields):
+                    values['updated_at'] = now
+                count += unlinked.filter(**{name_field: name}).update(**values)
+            linked[model._meta.db_table] = count
+        if any(linked.values()):
+            bump_dataset_version()
+    return linked
+
+
+async def link_fpl_ids_from_fpl() -> Dict[str, Any]:
+    """
+    Link unlinked rows using the run's FPL bootstrap snapshot
+
+    Returns:
+        Dict[str, Any]: {'success': True, 'linked': {table: rows}} or {'success': False, 'error': ...}
+    """
+    from MyApi.utils.fpl_client import fpl_client
+
+    try:
+        async with fpl_client() as client:
+            snapshot = await client.bootstrap()
+    except Exception as e:
+        return {'success': False, 'error': f"FPL API error: {str(e)}"}
+
+    linked = await sync_to_async(link_fpl_ids)(snapshot.players)
+    return {'success': True, 'linked': linked}
@@ -0,0 +1,140 @@
+"""
+FPL Position Update Utility
+
+Updates player positions and teams for a week from the FPL bootstrap data.
+Players are matched in memory by FPL element id, or by normalized name for
+rows not yet linked (which are linked on the way), and changes are saved
+with one bulk_update.
+"""
+
+from typing import Dict, List, Any
+from asgiref.sync import sync_to_async
+
+
+POSITION_MAP = {
+    1: 'Keeper',      # Goalkeeper
+    2: 'Defender',    # Defender
+    3: 'Midfielder',  # Midfielder
+    4: 'Attacker',    # Forward
+}
+
+
+def apply_position_updates(players: List[Dict[str, Any]], teams: List[Dict[str, Any]], current_week: int) -> Dict[str, Any]:
+    """
+    Match FPL players to the week's Player rows and save position and team changes.
+
+    Args:
+        players (List[Dict]): FPL player (element) dicts
+        teams (List[Dict]): FPL team dicts
+        current_week (int): Week whose Player rows are updated
+
+    Returns:
+        Dict[str, Any]: Counts, position/team changes, newly linked rows and errors
+    """
+    from django.db import transaction
+    from django.utils import timezone
+    from MyApi.models import Player
+    from MyApi.utils.dataset_version import bump_dataset_version
+    from MyApi.utils.fpl_cost_updater import normalize_player_name
+    from MyApi.utils.fpl_identity import build_fpl_id_index, fpl_full_name
+
+    team_map = {team['id']: team['name'] for team in teams}
+    id_index = build_fpl_id_index(players)
+
+    # Index the week's players by FPL id, and unlinked ones by normalized name (covers 'First_Last' and 'First Last')
+    players_by_id = {}
+    players_by_name = {}
+    for player_obj in Player.objects.filter(week=current_week):
+        if player_obj.fpl_id is not None:
+            players_by_id.setdefault(player_obj.fpl_id, []).append(player_obj)
+        else:
+            players_by_name.setdefault(normalize_player_name(player_obj.name), []).append(player_obj)
+
+    updated_count = 0
+    team_updated_count = 0
+    linked_count = 0
+    errors = []
+    position_changes = []
+    team_changes = []
+    changed = {}
+    now = timezone.now()
+
+    for fpl_player in players:
+        player_name = fpl_full_name(fpl_player)
+        try:
+            fpl_position = POSITION_MAP.get(fpl_player['element_type'], 'Midfielder')
+            fpl_team = team_map.get(fpl_player['team'], 'Unknown')
+
+            matched = list(players_by_id.get(fpl_player['id'], []))
+            name_key = normalize_player_name(player_name)
+            # Names shared by several FPL players are not linked
+            if id_index.get(name_key) == fpl_player['id']:
+                for player_obj in players_by_name.get(name_key, []):
+                    player_obj.fpl_id = fpl_player['id']
+                    changed[player_obj.pk] = player_obj
+                    linked_count += 1
+                    matched.append(player_obj)
+
+            for player_obj in matched:
+                if player_obj.position != fpl_position:
+                    position_changes.append({
+                        'name': player_obj.name,
+                        'old_position': player_obj.position,
+                        'new_position': fpl_position
+                    })
+                    player_obj.position = fpl_position
+                    changed[player_obj.pk] = player_obj
+                    updated_count += 1
+
+                if player_obj.team != fpl_team:
+                    team_changes.append({
+                        'name': player_obj.name,
+                        'old_team': player_obj.team,
+                        'new_team': fpl_team
+                    })
+                    player_obj.team = fpl_team
+                    changed[player_obj.pk] = player_obj
+                    team_updated_count += 1
+
+        except Exception as e:
+            errors.append(f"Error updating {player_name}: {str(e)}")
+            continue
+
+    for player_obj in changed.values():
+        player_obj.updated_at = now
+    with transaction.atomic():
+        Player.objects.bulk_update(list(changed.values()), ['position', 'team', 'fpl_id', 'updated_at'], batch_size=500)
+        if changed:
+            bump_dataset_version()
+
+    return {
+        'success': True,
+        'updated_count': updated_count,
+        'team_updated_count': team_updated_count,
+        'linked_count': linked_count,
+        'position_changes': position_changes,
+        'team_changes': team_changes[:20],  # Limit to first 20
+        'errors': errors[:10]  # Limit errors to first 10
+    }
+
+
+async def update_player_positions_from_fpl(current_week: int) -> Dict[str, Any]:
+    """
+    Update the week's player positions and teams from the run's FPL bootstrap snapshot.
+
+    Args:
+        current_week (int): Week whose Player rows are updated
+
+    Returns:
+        Dict[str, Any]: apply_position_updates result, or {'success': False, 'error': ...}
+            when the FPL data cannot be fetched
+    """
+    from MyApi.utils.fpl_client import fpl_client
+
+    try:
+        async with fpl_client() as client:
+            snapshot = await client.bootstrap()
+    except Exception as e:
+        return {'success': False, 'error': f"FPL API error: {str(e)}"}
+
+    return await sync_to_async(apply_position_updates)(snapshot.players, snapshot.teams, current_week)
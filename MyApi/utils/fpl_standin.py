@@ -0,0 +1,362 @@
+"""
+Local stand-in for the FPL API.
+
+Serves bootstrap-static, fixtures, element-summary and event live payloads
+so the importers and updaters can run offline, e.g. to measure import
+throughput and concurrency behaviour with `manage.py fpl_standin --benchmark`,
+which rolls its database changes back. Importing from a stand-in any other
+way writes its synthetic data to the configured database, so it also needs
+FPL_API_ALLOW_CUSTOM_BASE_URL.
+
+Payloads come from a SyntheticSeason generated from a seed, or from the
+responses recorded in the FPL HTTP cache directory (RecordedPayloads).
+Latency, jitter and injected errors are drawn per (path, attempt), so a run
+sees the same delays and failures whatever order its requests arrive in.
+"""
+
+import asyncio
+import collections
+import json
+import os
+import random
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlparse
+
+from aiohttp import web
+
+from MyApi.utils.fpl_http_cache import FPLResponseCache, endpoint_key
+
+
+DEFAULT_STANDIN_PORT = 8100
+
+# Element types in squad proportions: 2 keepers, 5 defenders, 5 midfielders, 3 forwards
+ELEMENT_TYPE_CYCLE = (1, 1, 2, 2, 2, 2, 2, 3, 3, 3, 3, 3, 4, 4, 4)
+GOAL_POINTS = {1: 10, 2: 6, 3: 5, 4: 4}
+CLEAN_SHEET_POINTS = {1: 4, 2: 4, 3: 1, 4: 0}
+
+
+def _api_path(url):
+    """Path and query after /api/, e.g. 'element-summary/5/' or 'fixtures/?event=3'."""
+    parsed = urlparse(url)
+    path = parsed.path.split('/api/', 1)[-1].lstrip('/')
+    return f"{path}?{parsed.query}" if parsed.query else path
+
+
+class SyntheticSeason:
+    """Deterministic FPL payloads for a generated season (double round robin)."""
+
+    def __init__(self, players=700, teams=20, current_gameweek=8, seed=0, season_start='2025-08-15'):
+        if teams < 2 or teams % 2:
+            raise ValueError('teams must be an even number of at least 2')
+        self.player_count = players
+        self.team_count = teams
+        self.gameweek_count = 2 * (teams - 1)
+        self.current_gameweek = max(1, min(current_gameweek, self.gameweek_count))
+        self.seed = seed
+        self.season_start = datetime.fromisoformat(season_start).replace(hour=10, tzinfo=timezone.utc)
+        self.fixtures = self._build_fixtures()
+        self.elements = self._build_elements()
+        self._team_fixtures = collections.defaultdict(list)
+        for fixture in self.fixtures:
+            self._team_fixtures[fixture['team_h']].append(fixture)
+            self._team_fixtures[fixture['team_a']].append(fixture)
+        self._bodies = {}
+
+    def _rng(self, *key):
+        return random.Random(':'.join(str(part) for part in (self.seed,) + key))
+
+    @staticmethod
+    def _iso(moment):
+        return moment.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    def _deadline(self, gameweek):
+        return self.season_start + timedelta(days=7 * (gameweek - 1))
+
+    def _build_fixtures(self):
+        # Circle method: team 1 stays put, the others rotate; the second half swaps home and away
+        teams = list(range(1, self.team_count + 1))
+        rounds = []
+        for _ in range(self.team_count - 1):
+            rounds.append([(teams[i], teams[-1 - i]) for i in range(self.team_count // 2)])
+            teams = [teams[0], teams[-1]] + teams[1:-1]
+        rounds += [[(away, home) for home, away in pairs] for pairs in rounds]
+
+        fixtures = []
+        for gameweek, pairs in enumerate(rounds, start=1):
+            for index, (home, away) in enumerate(pairs):
+                fixture_id = len(fixtures) + 1
+                rng = self._rng('fixture', fixture_id)
+                started = gameweek <= self.current_gameweek
+                # The current gameweek is half played
+                finished = gameweek < self.current_gameweek or (started and index < len(pairs) // 2)
+                fixtures.append({
+                    'id': fixture_id,
+                    'code': 100000 + fixture_id,
+                    'event': gameweek,
+                    'team_h': home,
+                    'team_a': away,
+                    'kickoff_time': self._iso(self._deadline(gameweek) + timedelta(days=1, hours=2 * (index % 5))),
+                    'started': started,
+                    'finished': finished,
+                    'finished_provisional': finished,
+                    'minutes': 90 if finished else (45 if started else 0),
+                    'team_h_score': rng.choice((0, 0, 1, 1, 1, 2, 2, 3)) if started else None,
+                    'team_a_score': rng.choice((0, 0, 1, 1, 2, 2, 3)) if started else None,
+                    'team_h_difficulty': rng.randint(2, 5),
+                    'team_a_difficulty': rng.randint(2, 5),
+                })
+        return fixtures
+
+    def _build_elements(self):
+        elements = []
+        for player_id in range(1, self.player_count + 1):
+            rng = self._rng('element', player_id)
+            element_type = ELEMENT_TYPE_CYCLE[(player_id - 1) % len(ELEMENT_TYPE_CYCLE)]
+            elements.append({
+                'id': player_id,
+                'code': 200000 + player_id,
+                'first_name': 'Player',
+                'second_name': str(player_id),
+                'web_name': f"Player{player_id}",
+                'team': (player_id - 1) % self.team_count + 1,
+                'element_type': element_type,
+                'now_cost': rng.randint(40, 130) // 5 * 5,
+                'status': 'a',
+                'selected_by_percent': f"{rng.uniform(0, 40):.1f}",
+            })
+        return elements
+
+    def _match_stats(self, element, fixture):
+        """One player's stats and points for a started fixture."""
+        rng = self._rng('stats', element['id'], fixture['id'])
+        element_type = element['element_type']
+        was_home = fixture['team_h'] == element['team']
+        conceded = fixture['team_a_score'] if was_home else fixture['team_h_score']
+
+        minutes = rng.choice((0, 0, 0, rng.randint(1, 59), 90, 90, 90, 90))
+        if not fixture['finished']:
+            minutes = min(minutes, fixture['minutes'])
+        played = minutes > 0
+        stats = {
+            'minutes': minutes,
+            'goals_scored': rng.choice((0,) * (12 - 2 * element_type) + (1,)) if played and element_type > 1 else 0,
+            'assists': rng.choice((0, 0, 0, 0, 0, 0, 1)) if played else 0,
+            'clean_sheets': 1 if minutes >= 60 and conceded == 0 else 0,
+            'goals_conceded': conceded if played else 0,
+            'own_goals': 0,
+            'penalties_saved': 0,
+            'penalties_missed': 0,
+            'yellow_cards': 1 if played and rng.random() < 0.1 else 0,
+            'red_cards': 1 if played and rng.random() < 0.01 else 0,
+            'saves': rng.randint(0, 6) if played and element_type == 1 else 0,
+            'bonus': rng.choice((0,) * 12 + (1, 2, 3)) if played and fixture['finished'] else 0,
+        }
+        stats['bps'] = 3 * minutes // 30 + 10 * stats['goals_scored'] + 9 * stats['assists']
+
+        points = {
+            'minutes': (1 if played else 0) + (1 if minutes >= 60 else 0),
+            'goals_scored': stats['goals_scored'] * GOAL_POINTS[element_type],
+            'assists': stats['assists'] * 3,
+            'clean_sheets': stats['clean_sheets'] * CLEAN_SHEET_POINTS[element_type],
+            'goals_conceded': -(stats['goals_conceded'] // 2) if element_type <= 2 else 0,
+            'saves': stats['saves'] // 3,
+            'yellow_cards': -stats['yellow_cards'],
+            'red_cards': -3 * stats['red_cards'],
+            'bonus': stats['bonus'],
+        }
+        stats['total_points'] = sum(points.values())
+        return stats, points
+
+    def bootstrap(self):
+        events = []
+        for gameweek in range(1, self.gameweek_count + 1):
+            rng = self._rng('event', gameweek)
+            events.append({
+                'id': gameweek,
+                'name': f"Gameweek {gameweek}",
+                'deadline_time': self._iso(self._deadline(gameweek)),
+                'finished': gameweek < self.current_gameweek,
+                'data_checked': gameweek < self.current_gameweek,
+                'is_previous': gameweek == self.current_gameweek - 1,
+                'is_current': gameweek == self.current_gameweek,
+                'is_next': gameweek == self.current_gameweek + 1,
+                'average_entry_score': rng.randint(40, 70) if gameweek <= self.current_gameweek else 0,
+                'highest_score': rng.randint(100, 150) if gameweek <= self.current_gameweek else None,
+            })
+        teams = [
+            {'id': team_id, 'code': team_id, 'name': f"Team {team_id}", 'short_name': f"T{team_id:02d}", 'strength': 3}
+            for team_id in range(1, self.team_count + 1)
+        ]
+        element_types = [
+            {'id': 1, 'singular_name': 'Goalkeeper', 'singular_name_short': 'GKP', 'plural_name': 'Goalkeepers'},
+            {'id': 2, 'singular_name': 'Defender', 'singular_name_short': 'DEF', 'plural_name': 'Defenders'},
+            {'id': 3, 'singular_name': 'Midfielder', 'singular_name_short': 'MID', 'plural_name': 'Midfielders'},
+            {'id': 4, 'singular_name': 'Forward', 'singular_name_short': 'FWD', 'plural_name': 'Forwards'},
+        ]
+        return {'events': events, 'teams': teams, 'elements': self.elements, 'element_types': element_types}
+
+    def element_summary(self, player_id):
+        if not 1 <= player_id <= self.player_count:
+            return None
+        element = self.elements[player_id - 1]
+        history = []
+        upcoming = []
+        for fixture in sorted(self._team_fixtures[element['team']], key=lambda f: (f['kickoff_time'], f['id'])):
+            was_home = fixture['team_h'] == element['team']
+            if not fixture['started']:
+                upcoming.append({
+                    'id': fixture['id'],
+                    'event': fixture['event'],
+                    'team_h': fixture['team_h'],
+                    'team_a': fixture['team_a'],
+                    'kickoff_time': fixture['kickoff_time'],
+                    'is_home': was_home,
+                    'difficulty': fixture['team_h_difficulty'] if was_home else fixture['team_a_difficulty'],
+                })
+                continue
+            stats, _ = self._match_stats(element, fixture)
+            history.append(dict(
+                stats,
+                element=player_id,
+                fixture=fixture['id'],
+                opponent_team=fixture['team_a'] if was_home else fixture['team_h'],
+                was_home=was_home,
+                kickoff_time=fixture['kickoff_time'],
+                team_h_score=fixture['team_h_score'],
+                team_a_score=fixture['team_a_score'],
+                round=fixture['event'],
+                value=element['now_cost'],
+            ))
+        return {'fixtures': upcoming, 'history': history, 'history_past': []}
+
+    def event_live(self, gameweek):
+        if not 1 <= gameweek <= self.gameweek_count:
+            return None
+        elements = []
+        for element in self.elements:
+            totals = collections.Counter()
+            explain = []
+            for fixture in self._team_fixtures[element['team']]:
+                if fixture['event'] != gameweek or not fixture['started']:
+                    continue
+                stats, points = self._match_stats(element, fixture)
+                totals.update(stats)
+                explain.append({
+                    'fixture': fixture['id'],
+                    'stats': [
+                        {'identifier': identifier, 'points': value, 'value': stats[identifier]}
+                        for identifier, value in points.items() if stats[identifier]
+                    ],
+                })
+            elements.append({'id': element['id'], 'stats': dict(totals), 'explain': explain})
+        return {'elements': elements}
+
+    def payload(self, path):
+        """JSON body for an API path (see _api_path), or None if there is none."""
+        if path not in self._bodies:
+            self._bodies[path] = self._render(path)
+        return self._bodies[path]
+
+    def _render(self, path):
+        parsed = urlparse(path)
+        parts = [part for part in parsed.path.split('/') if part]
+        body = None
+        if parts == ['bootstrap-static']:
+            body = self.bootstrap()
+        elif parts == ['fixtures']:
+            event = parse_qs(parsed.query).get('event')
+            body = [f for f in self.fixtures if not event or str(f['event']) == event[0]]
+        elif len(parts) == 2 and parts[0] == 'element-summary' and parts[1].isdigit():
+            body = self.element_summary(int(parts[1]))
+        elif len(parts) == 3 and parts[0] == 'event' and parts[1].isdigit() and parts[2] == 'live':
+            body = self.event_live(int(parts[1]))
+        return None if body is None else json.dumps(body)
+
+
+class RecordedPayloads:
+    """Responses recorded in the FPL HTTP cache directory, served by API path."""
+
+    def __init__(self, directory=None):
+        cache = FPLResponseCache(directory)
+        self.bodies = {}
+        for name in sorted(os.listdir(cache.directory)):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(cache.directory, name), encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                continue
+            self.bodies[_api_path(entry['url'])] = entry['body']
+
+    def payload(self, path):
+        return self.bodies.get(path)
+
+
+def create_app(source, latency_ms=0, jitter_ms=0, error_rate=0.0, error_status=503, seed=0):
+    """
+    aiohttp application serving `source` payloads under /api/.
+
+    Args:
+        source: SyntheticSeason or RecordedPayloads
+        latency_ms (float): Delay added to every response
+        jitter_ms (float): Extra random delay of up to this many milliseconds
+        error_rate (float): Share of requests answered with `error_status`
+        error_status (int): Status of injected errors (e.g. 503 or 429)
+        seed (int): Seed for the latency and error draws
+
+    Returns:
+        web.Application: app['stats'] counts requests per endpoint and injected errors
+    """
+    stats = collections.Counter()
+    attempts = collections.Counter()
+
+    async def handle(request):
+        path = request.path_qs.split('/api/', 1)[-1]
+        stats[endpoint_key(request.path)] += 1
+        attempts[path] += 1
+        rng = random.Random(f"{seed}:{path}:{attempts[path]}")
+
+        delay = latency_ms + (rng.uniform(0, jitter_ms) if jitter_ms else 0)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        if error_rate and rng.random() < error_rate:
+            stats['injected_errors'] += 1
+            return web.Response(status=error_status, text='Injected error', content_type='text/plain')
+
+        body = source.payload(path)
+        if body is None:
+            stats['not_found'] += 1
+            return web.Response(status=404, text='Not found', content_type='text/plain')
+        return web.Response(text=body, content_type='application/json')
+
+    app = web.Application()
+    app['stats'] = stats
+    app.router.add_get('/api/{path:.*}', handle)
+    return app
+
+
+@asynccontextmanager
+async def running_standin(source=None, host='127.0.0.1', port=0, **options):
+    """
+    Run a stand-in server on the current event loop.
+
+    Args:
+        source: Payload source, defaults to SyntheticSeason()
+        host (str): Interface to bind
+        port (int): Port to bind, 0 for a free one
+        **options: create_app options (latency, errors, seed)
+
+    Yields:
+        tuple: (base URL for settings.FPL_API_BASE_URL, request stats)
+    """
+    app = create_app(source or SyntheticSeason(), **options)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host, port).start()
+        bound_port = runner.addresses[0][1]
+        yield f"http://{host}:{bound_port}/api/", app['stats']
+    finally:
+        await runner.cleanup()
@@ -0,0 +1,248 @@
+"""
+Full 15-player squad optimizer.
+
+Selects a complete FPL squad (2 GK, 5 DEF, 5 MID, 3 FWD) from a candidate pool,
+picking a starting XI in the requested formation and weighting the bench.
+At most `max_per_club` players may come from the same `Player.team`; players
+with no team (blank, or the 'Unknown' placeholder) are not club-limited.
+
+The model is built from index arrays grouped in a single pass over the pool,
+so constraint construction stays linear in the number of candidates. The
+pool is not capped per position; instead players that cannot be in the best
+squad are pruned by dominance first (see prune_dominated_players).
+"""
+
+import time
+import numpy as np
+import pulp
+from MyApi.utils.anytime_solver import UNKNOWN_TEAM, get_time_limit_ms, greedy_lineup, solve_with_time_limit
+
+
+FULL_SQUAD_COUNTS = {'Keeper': 2, 'Defender': 5, 'Midfielder': 5, 'Attacker': 3}
+
+STARTING_COUNT_KEYS = {
+    'Keeper': 'keeper',
+    'Defender': 'defender',
+    'Midfielder': 'midfielder',
+    'Attacker': 'attacker',
+}
+
+
+def _club(team):
+    # Blank teams may arrive as None or NaN from the DataFrame
+    return team if isinstance(team, str) and team and team != UNKNOWN_TEAM else None
+
+
+def prune_dominated_players(squad_df, score_column, max_per_club=3):
+    """
+    Drop players that cannot be needed in the best squad.
+
+    Player j dominates i when they share a position, j costs no more and
+    scores at least as much (ties broken by cost, score, then row order).
+    Given any optimal squad holding i, swapping i for an unpicked dominator
+    that keeps the club limit loses nothing (same role, no more cost, no
+    less score). Such a dominator is guaranteed when i has either
+    - min(max_per_club, position squad count) dominators from its own club
+      (at most one fewer can be picked), or
+    - dominators from at least position squad count + (14 // max_per_club)
+      distinct other clubs, a team-less dominator counting as its own club
+      (at most that many minus one are picked or from full clubs).
+    Repeating the swap ends in an optimal squad without pruned players, so
+    the best squad is unchanged; later top_n alternatives are picked from the
+    pruned pool. Players with a missing cost or score are kept.
+
+    Args:
+        squad_df (DataFrame): Candidate pool with 'Position', 'Cost', score and optional 'Team' columns
+        score_column (str): Column to maximise
+        max_per_club (int): Maximum players selected from the same team
+
+    Returns:
+        DataFrame: The remaining rows (original index kept)
+    """
+    squad_size = sum(FULL_SQUAD_COUNTS.values())
+    full_clubs = (squad_size - 1) // max(max_per_club, 1)
+    costs = squad_df['Cost'].astype(float).to_numpy()
+    scores = squad_df[score_column].astype(float).to_numpy()
+    positions = squad_df['Position'].to_numpy()
+    teams = squad_df['Team'].tolist() if 'Team' in squad_df.columns else [None] * len(squad_df)
+    clubs = [_club(team) for team in teams]
+
+    keep = np.ones(len(squad_df), dtype=bool)
+    for position, squad_count in FULL_SQUAD_COUNTS.items():
+        members = np.flatnonzero((positions == position) & ~np.isnan(costs) & ~np.isnan(scores))
+        if len(members) <= squad_count:
+            continue
+        # Rank by (cost, -score, row): a dominator always ranks earlier
+        members = members[np.lexsort((members, -scores[members], costs[members]))]
+        member_costs, member_scores = costs[members], scores[members]
+        same_club_needed = min(max_per_club, squad_count)
+        other_clubs_needed = squad_count + full_clubs
+        for rank in range(same_club_needed, len(members)):
+            i = members[rank]
+            earlier = np.flatnonzero((member_costs[:rank] <= costs[i]) & (member_scores[:rank] >= scores[i]))
+            if len(earlier) < same_club_needed:
+                continue
+            club = clubs[i]
+            same_club = 0
+            other_clubs = set()
+            for j in members[earlier]:
+                if club is not None and clubs[j] == club:
+                    same_club += 1
+                else:
+                    other_clubs.add(clubs[j] if clubs[j] is not None else ('no club', j))
+                if same_club >= same_club_needed or len(other_clubs) >= other_clubs_needed:
+                    keep[i] = False
+                    break
+    return squad_df[keep]
+
+
+def build_full_squad_problem(squad_df, score_column, starting_counts, budget=100.0,
+                             bench_weight=0.1, max_per_club=3):
+    """
+    Build the 15-player squad selection problem.
+
+    Args:
+        squad_df (DataFrame): Candidate pool with 'Player', 'Position', 'Cost', 'Team' and score columns
+        score_column (str): Column to maximise (e.g. 'Elo' or 'ProjectedPoints')
+        starting_counts (dict): Starting XI counts keyed 'keeper', 'defender', 'midfielder', 'attacker'
+        budget (float): Maximum total cost of all 15 players
+        bench_weight (float): Fraction of a bench player's score counted in the objective
+        max_per_club (int): Maximum players selected from the same team
+
+    Returns:
+        tuple: (prob, pick_vars, start_vars)
+    """
+    scores = squad_df[score_column].astype(float).tolist()
+    costs = squad_df['Cost'].astype(float).tolist()
+    positions = squad_df['Position'].tolist()
+    teams = squad_df['Team'].tolist() if 'Team' in squad_df.columns else [None] * len(squad_df)
+
+    pick_vars = [pulp.LpVariable(f"pick_{i}", cat=pulp.LpBinary) for i in range(len(squad_df))]
+    start_vars = [pulp.LpVariable(f"start_{i}", cat=pulp.LpBinary) for i in range(len(squad_df))]
+
+    # Group candidate indexes by position and club in one pass
+    by_position = {position: [] for position in FULL_SQUAD_COUNTS}
+    by_team = {}
+    for i, (position, team) in enumerate(zip(positions, teams)):
+        if position in by_position:
+            by_position[position].append(i)
+        if _club(team) is not None:
+            by_team.setdefault(team, []).append(i)
+
+    prob = pulp.LpProblem("FPL_Full_Squad_Selection", pulp.LpMaximize)
+
+    # Starters score in full, bench players score bench_weight of their value
+    objective = []
+    for i, score in enumerate(scores):
+        objective.append((start_vars[i], score * (1.0 - bench_weight)))
+        objective.append((pick_vars[i], score * bench_weight))
+    prob += pulp.LpAffineExpression(objective)
+
+    prob += pulp.LpAffineExpression(list(zip(pick_vars, costs))) <= budget, "budget"
+
+    for i in range(len(squad_df)):
+        prob += start_vars[i] - pick_vars[i] <= 0, f"start_in_squad_{i}"
+
+    for position, squad_count in FULL_SQUAD_COUNTS.items():
+        indexes = by_position[position]
+        prob += pulp.LpAffineExpression([(pick_vars[i], 1) for i in indexes]) == squad_count, f"squad_{position}"
+        starting_count = starting_counts[STARTING_COUNT_KEYS[position]]
+        prob += pulp.LpAffineExpression([(start_vars[i], 1) for i in indexes]) == starting_count, f"start_{position}"
+
+    for club_index, indexes in enumerate(by_team.values()):
+        if len(indexes) > max_per_club:
+            prob += pulp.LpAffineExpression([(pick_vars[i], 1) for i in indexes]) <= max_per_club, f"club_{club_index}"
+
+    return prob, pick_vars, start_vars
+
+
+def select_full_squads(squad_df, score_column, starting_counts, budget=100.0, top_n=1,
+                       bench_weight=0.1, max_per_club=3, time_limit_ms=None, solve_stats=None, prune=True):
+    """
+    Select the top N distinct 15-player squads from a candidate pool.
+
+    Pass the whole player pool: dominated players are pruned first
+    (prune_dominated_players), which keeps the best squad optimal, so no
+    per-position cap is needed.
+
+    Each additional squad is forced to differ from every previous one by at least
+    one player, so alternatives stay close to the optimum instead of excluding
+    every previously selected player.
+
+    The solves share one time budget (`time_limit_ms`, defaulting to the
+    configured solver limit) and keep the best squad found so far; per-solve
+    statistics are appended to `solve_stats`. When no squad is found in time a
+    greedy squad is returned instead.
+
+    Returns:
+        list: DataFrames of selected players with an added boolean 'Starter' column
+    """
+    if squad_df.empty:
+        return []
+    if prune:
+        squad_df = prune_dominated_players(squad_df, score_column, max_per_club)
+    squad_df = squad_df.reset_index(drop=True)
+
+    prob, pick_vars, start_vars = build_full_squad_problem(
+        squad_df, score_column, starting_counts, budget, bench_weight, max_per_club
+    )
+    squad_size = sum(FULL_SQUAD_COUNTS.values())
+    deadline = time.perf_counter() + get_time_limit_ms(time_limit_ms) / 1000.0
+
+    squads = []
+    timed_out = False
+    for squad_idx in range(top_n):
+        remaining_ms = (deadline - time.perf_counter()) * 1000
+        if remaining_ms < 1:
+            timed_out = True
+            break
+        stats = solve_with_time_limit(prob, remaining_ms)
+        if solve_stats is not None:
+            solve_stats.append(stats)
+        if stats['status'] not in ('optimal', 'feasible'):
+            timed_out = stats['status'] == 'not_solved'
+            break
+
+        selected = [i for i, var in enumerate(pick_vars) if var.varValue is not None and var.varValue > 0.5]
+        if len(selected) != squad_size:
+            break
+        result = squad_df.iloc[selected].copy()
+        result['Starter'] = [start_vars[i].varValue is not None and start_vars[i].varValue > 0.5 for i in selected]
+        squads.append(result)
+
+        # Exclude this exact squad from the next solve
+        prob += pulp.LpAffineExpression([(pick_vars[i], 1) for i in selected]) <= squad_size - 1, f"distinct_{squad_idx}"
+
+    if not squads and timed_out:
+        squad = greedy_full_squad(squad_df, score_column, starting_counts, budget, max_per_club)
+        if squad is not None:
+            squads.append(squad)
+            if solve_stats is not None:
+                solve_stats.append({
+                    'status': 'greedy',
+                    'objective': float(squad[score_column].sum()),
+                    'optimality_gap': None,
+                    'solve_time': 0.0,
+                    'timed_out': True,
+                })
+    return squads
+
+
+def greedy_full_squad(squad_df, score_column, starting_counts, budget=100.0, max_per_club=3):
+    """
+    Greedy fallback squad: pick the 15 with greedy_lineup, then start the
+    best-scoring players of each position.
+
+    Returns:
+        DataFrame or None: Selected players with a boolean 'Starter' column, or None if no squad fits
+    """
+    squad_counts = {STARTING_COUNT_KEYS[position]: count for position, count in FULL_SQUAD_COUNTS.items()}
+    selected = greedy_lineup(squad_df, score_column, squad_counts, budget, max_per_club=max_per_club)
+    if not selected:
+        return None
+    result = squad_df.loc[selected].copy()
+    result['Starter'] = False
+    for position, key in STARTING_COUNT_KEYS.items():
+        starters = result[result['Position'] == position].nlargest(starting_counts[key], score_column).index
+        result.loc[starters, 'Starter'] = True
+    return result
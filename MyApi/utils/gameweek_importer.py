@@ -10,202 +10,370 @@ Key features:
 - Prevents duplicate data with safe deduplication
 - Calculates fantasy points from FPL statistics
 - Updates only missing gameweek data
+- Fetches player histories concurrently and writes them in batches
+- 'live' mode reads every player's stats from one event live request plus the fixtures list
 """
 
 import asyncio
-import aiohttp
+import time
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from asgiref.sync import sync_to_async
+from django.conf import settings as django_settings
 
+from MyApi.utils.player_history_fetcher import (
+    DEFAULT_WRITE_BATCH_SIZE,
+    FetchStats,
+    consume_in_batches,
+    fetch_player_summaries,
+    get_fetch_concurrency,
+)
 
-async def get_current_gameweek_data() -> Dict[str, Any]:
+
+# 'history': one element-summary request per player; 'live': one event live request for all players
+IMPORT_MODES = ('history', 'live')
+DEFAULT_IMPORT_MODE = 'history'
+
+
+def get_import_mode(requested: Optional[str] = None) -> str:
+    """
+    Resolve the gameweek import mode
+
+    Args:
+        requested (str, optional): Per-call mode, defaults to settings.FPL_GAMEWEEK_IMPORT_MODE
+
+    Returns:
+        str: 'history' or 'live'
+    """
+    mode = requested or getattr(django_settings, 'FPL_GAMEWEEK_IMPORT_MODE', DEFAULT_IMPORT_MODE)
+    if mode not in IMPORT_MODES:
+        raise ValueError(f"Unknown gameweek import mode '{mode}'")
+    return mode
+
+
+def build_match_data(player, gw_entry, gw_id, team_map) -> Dict[str, Any]:
+    """
+    Convert a player's FPL history entry into PlayerMatch field values
+
+    Args:
+        player: FPL player object
+        gw_entry (dict): Entry from the player's summary history
+        gw_id (int): Gameweek number
+        team_map (dict): FPL team id -> short name
+
+    Returns:
+        Dict[str, Any]: PlayerMatch field values
+    """
+    player_name = f"{player.first_name} {player.second_name}"
+
+    # Extract match data
+    match_date = None
+    if gw_entry.get('kickoff_time'):
+        match_date = datetime.fromisoformat(
+            gw_entry['kickoff_time'].replace("Z", "")
+        ).date()
+
+    # Get opponent team
+    opponent_team_id = gw_entry.get('opponent_team')
+    opponent = team_map.get(opponent_team_id, f"Team {opponent_team_id}") if opponent_team_id else "Unknown"
+
+    # Calculate result
+    was_home = gw_entry.get('was_home', False)
+    team_h_score = gw_entry.get('team_h_score', 0)
+    team_a_score = gw_entry.get('team_a_score', 0)
+
+    if was_home:
+        result = f"{'W' if team_h_score > team_a_score else 'L' if team_h_score < team_a_score else 'D'} {team_h_score}-{team_a_score}"
+    else:
+        result = f"{'W' if team_a_score > team_h_score else 'L' if team_a_score < team_h_score else 'D'} {team_a_score}-{team_h_score}"
+
+    # Calculate fantasy points (simplified FPL scoring)
+    minutes = gw_entry.get('minutes', 0)
+    goals = gw_entry.get('goals_scored', 0)
+    assists = gw_entry.get('assists', 0)
+    clean_sheets = gw_entry.get('clean_sheets', 0)
+    goals_conceded = gw_entry.get('goals_conceded', 0)
+    saves = gw_entry.get('saves', 0)
+    yellow_cards = gw_entry.get('yellow_cards', 0)
+    red_cards = gw_entry.get('red_cards', 0)
+    bonus = gw_entry.get('bonus', 0)
+
+    # Basic FPL points calculation
+    points = 0
+    if minutes > 0:
+        points += 1  # Playing
+    if minutes >= 60:
+        points += 1  # 60+ minutes
+
+    points += goals * 4  # Goals (simplified - varies by position)
+    points += assists * 3  # Assists
+    points += clean_sheets * 4  # Clean sheets (simplified)
+    points += saves // 3  # Every 3 saves = 1 point
+    points -= yellow_cards  # Yellow card
+    points -= red_cards * 3  # Red card
+    points += bonus  # Bonus points
+
+    return {
+        'player_name': player_name,
+        'fpl_id': player.id,
+        'season': f"{datetime.now().year}-{datetime.now().year + 1}",
+        'date': match_date,
+        'competition': 'Premier League',
+        'round_info': f"Gameweek {gw_id}",
+        'opponent': opponent,
+        'result': result,
+        'position': player.position if hasattr(player, 'position') else '',
+        'minutes_played': minutes,
+        'goals': goals,
+        'assists': assists,
+        'points': points,
+        'saves': saves,
+        'goals_conceded': goals_conceded,
+        'clean_sheet': clean_sheets > 0,
+        'elo_before_match': 1200.0,  # Will be calculated later
+        'elo_after_match': 1200.0,   # Will be calculated later
+    }
+
+
+def build_live_entries(live_elements, fixtures, gw_id, player_teams) -> Dict[int, Dict[str, Any]]:
+    """
+    Build history-style gameweek entries for every player from the event live payload
+
+    Each player is given their team's first started fixture of the gameweek,
+    the same match the history import takes. Players whose team has no
+    started fixture are left out.
+
+    Args:
+        live_elements (list): 'elements' of the event live payload
+        fixtures (list): FPL fixtures (may cover the whole season)
+        gw_id (int): Gameweek number
+        player_teams (dict): FPL player id -> FPL team id
+
+    Returns:
+        Dict[int, Dict[str, Any]]: FPL player id -> entry with the fields build_match_data reads
+    """
+    # The gameweek's started fixtures per team, earliest first
+    team_fixtures = {}
+    started = [f for f in fixtures if f.get('event') == gw_id and (f.get('started') or f.get('finished'))]
+    for fixture in sorted(started, key=lambda f: (f.get('kickoff_time') or '', f['id'])):
+        team_fixtures.setdefault(fixture['team_h'], []).append(fixture)
+        team_fixtures.setdefault(fixture['team_a'], []).append(fixture)
+
+    entries = {}
+    for element in live_elements:
+        team_id = player_teams.get(element['id'])
+        team_games = team_fixtures.get(team_id)
+        if not team_games:
+            continue
+        fixture = team_games[0]
+
+        stats = element.get('stats', {})
+        if len(team_games) > 1:
+            # Double gameweek: 'stats' are totals, so take the first fixture's
+            # values from the points breakdown (stats worth no points are absent)
+            stats = {
+                item['identifier']: item['value']
+                for explain in element.get('explain', []) if explain.get('fixture') == fixture['id']
+                for item in explain.get('stats', [])
+            }
+
+        was_home = fixture['team_h'] == team_id
+        entries[element['id']] = dict(
+            stats,
+            kickoff_time=fixture.get('kickoff_time'),
+            opponent_team=fixture['team_a'] if was_home else fixture['team_h'],
+            was_home=was_home,
+            team_h_score=fixture.get('team_h_score') or 0,
+            team_a_score=fixture.get('team_a_score') or 0,
+        )
+    return entries
+
+
+async def fetch_live_gameweek(client, gw_id: int) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Fetch the event live payload and the fixtures list concurrently
+
+    Args:
+        client: FPLClient of the run
+        gw_id (int): Gameweek number
+
+    Returns:
+        Tuple: (live payload, fixtures, FetchStats summary)
+    """
+    stats = FetchStats()
+
+    async def timed(coro):
+        request_start = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            stats.timings.append(time.perf_counter() - request_start)
+
+    live, fixtures = await asyncio.gather(timed(client.event_live(gw_id)), timed(client.fixtures()))
+    return live, fixtures, stats.summary()
+
+
+def write_match_batch(rows: List[Tuple[int, Dict[str, Any]]]) -> Dict[int, Dict[str, int]]:
+    """
+    Bulk upsert a batch of PlayerMatch rows in one transaction
+
+    Args:
+        rows: (gameweek, match_data) pairs
+
+    Returns:
+        Dict[int, Dict[str, int]]: Counts of new, updated, skipped and rejected (errors) matches per gameweek
+    """
+    from MyApi.utils.player_match_upsert import upsert_player_matches
+
+    result = upsert_player_matches([match_data for _, match_data in rows])
+    for reason in result['rejections']:
+        print(f"❌ Rejected match: {reason}")
+    return {
+        gw_id: {'new': c['inserted'], 'updated': c['updated'], 'skipped': c['unchanged'], 'errors': c['rejected']}
+        for gw_id, c in result['by_gameweek'].items()
+    }
+
+
+async def get_current_gameweek_data(concurrency: Optional[int] = None,
+                                    batch_size: int = DEFAULT_WRITE_BATCH_SIZE,
+                                    mode: Optional[str] = None) -> Dict[str, Any]:
     """
     Fetch current gameweek data from FPL API and import into database
-    
+
+    In 'history' mode player summaries are fetched concurrently (at most
+    `concurrency` requests in flight) and written in batches while the
+    remaining requests run. In 'live' mode all players' stats come from the
+    event live payload and the fixtures list, two requests in total.
+
+    Args:
+        concurrency (int, optional): Concurrent requests, defaults to settings.FPL_FETCH_CONCURRENCY
+        batch_size (int): Matches written per transaction
+        mode (str, optional): 'history' or 'live', defaults to settings.FPL_GAMEWEEK_IMPORT_MODE
+
     Returns:
         Dict[str, Any]: Import summary with success status and details
     """
     try:
-        from fpl import FPL
-        from MyApi.models import PlayerMatch, SystemSettings, Player
-        
-        print("🚀 Starting Current Gameweek Data Import")
+        from MyApi.utils.fpl_client import fpl_client
+        from MyApi.models import SystemSettings
+
+        mode = get_import_mode(mode)
+        print(f"🚀 Starting Current Gameweek Data Import ({mode} mode)")
         start_time = datetime.now()
-        
-        async with aiohttp.ClientSession() as session:
-            fpl = FPL(session)
-            
+
+        async with fpl_client() as client:
+            fpl = await client.fpl()
+
             # Get current gameweek
             gameweeks = await fpl.get_gameweeks()
             current_gw = next(gw for gw in gameweeks if gw.is_current)
             gw_id = current_gw.id
-            
+
             print(f"📅 Current Gameweek: {gw_id}")
-            
+
             # Update system settings with current gameweek if needed
             settings = await sync_to_async(SystemSettings.get_settings)()
             if settings.current_gameweek != gw_id:
                 settings.current_gameweek = gw_id
                 await sync_to_async(settings.save)()
                 print(f"✅ Updated system gameweek to {gw_id}")
-            
+
             # Get teams for opponent mapping
             teams = await fpl.get_teams()
             team_map = {team.id: team.short_name for team in teams}
-            
+
             # Get all players
             players = await fpl.get_players()
-            
-            new_matches = 0
-            updated_matches = 0
-            skipped_matches = 0
-            errors = 0
-            
-            print(f"👥 Processing {len(players)} players...")
-            
-            for i, player in enumerate(players, 1):
+
+            totals = {'new': 0, 'updated': 0, 'skipped': 0, 'errors': 0, 'processed': 0}
+
+            def handle_entry(player, gw_entry):
                 try:
-                    player_name = f"{player.first_name} {player.second_name}"
-                    
-                    # Get player's gameweek history
-                    history = await fpl.get_player_summary(player.id)
-                    
-                    # Find current gameweek entry
-                    gw_entry = None
-                    for g in history.history:
-                        if g.get('event') == gw_id or g.get('round') == gw_id:
-                            gw_entry = g
-                            break
-                    
-                    if not gw_entry:
-                        continue  # No data for this gameweek
-                    
-                    # Extract match data
-                    match_date = None
-                    if gw_entry.get('kickoff_time'):
-                        match_date = datetime.fromisoformat(
-                            gw_entry['kickoff_time'].replace("Z", "")
-                        ).date()
-                    
-                    # Get opponent team
-                    opponent_team_id = gw_entry.get('opponent_team')
-                    opponent = team_map.get(opponent_team_id, f"Team {opponent_team_id}") if opponent_team_id else "Unknown"
-                    
-                    # Calculate result
-                    was_home = gw_entry.get('was_home', False)
-                    team_h_score = gw_entry.get('team_h_score', 0)
-                    team_a_score = gw_entry.get('team_a_score', 0)
-                    
-                    if was_home:
-                        result = f"{'W' if team_h_score > team_a_score else 'L' if team_h_score < team_a_score else 'D'} {team_h_score}-{team_a_score}"
-                    else:
-                        result = f"{'W' if team_a_score > team_h_score else 'L' if team_a_score < team_h_score else 'D'} {team_a_score}-{team_h_score}"
-                    
-                    # Calculate fantasy points (simplified FPL scoring)
-                    minutes = gw_entry.get('minutes', 0)
-                    goals = gw_entry.get('goals_scored', 0)
-                    assists = gw_entry.get('assists', 0)
-                    clean_sheets = gw_entry.get('clean_sheets', 0)
-                    goals_conceded = gw_entry.get('goals_conceded', 0)
-                    saves = gw_entry.get('saves', 0)
-                    yellow_cards = gw_entry.get('yellow_cards', 0)
-                    red_cards = gw_entry.get('red_cards', 0)
-                    bonus = gw_entry.get('bonus', 0)
-                    
-                    # Basic FPL points calculation
-                    points = 0
-                    if minutes > 0:
-                        points += 1  # Playing
-                    if minutes >= 60:
-                        points += 1  # 60+ minutes
-                    
-                    points += goals * 4  # Goals (simplified - varies by position)
-                    points += assists * 3  # Assists
-                    points += clean_sheets * 4  # Clean sheets (simplified)
-                    points += saves // 3  # Every 3 saves = 1 point
-                    points -= yellow_cards  # Yellow card
-                    points -= red_cards * 3  # Red card
-                    points += bonus  # Bonus points
-                    
-                    # Check if match already exists (improved deduplication)
-                    existing_match = await sync_to_async(
-                        PlayerMatch.objects.filter(
-                            player_name=player_name,
-                            date=match_date,
-                            round_info__in=[f"Gameweek {gw_id}", f"Matchweek {gw_id}", str(gw_id)]
-                        ).first
-                    )()
-                    
-                    match_data = {
-                        'player_name': player_name,
-                        'season': f"{datetime.now().year}-{datetime.now().year + 1}",
-                        'date': match_date,
-                        'competition': 'Premier League',
-                        'round_info': f"Gameweek {gw_id}",
-                        'opponent': opponent,
-                        'result': result,
-                        'position': player.position if hasattr(player, 'position') else '',
-                        'minutes_played': minutes,
-                        'goals': goals,
-                        'assists': assists,
-                        'points': points,
-                        'saves': saves,
-                        'goals_conceded': goals_conceded,
-                        'clean_sheet': clean_sheets > 0,
-                        'elo_before_match': 1200.0,  # Will be calculated later
-                        'elo_after_match': 1200.0,   # Will be calculated later
-                    }
-                    
-                    if existing_match:
-                        # Update existing match if data has changed
-                        updated = False
-                        for field, value in match_data.items():
-                            if hasattr(existing_match, field) and getattr(existing_match, field) != value:
-                                setattr(existing_match, field, value)
-                                updated = True
-                        
-                        if updated:
-                            await sync_to_async(existing_match.save)()
-                            updated_matches += 1
-                        else:
-                            skipped_matches += 1
-                    else:
-                        # Create new match record
-                        await sync_to_async(PlayerMatch.objects.create)(**match_data)
-                        new_matches += 1
-                    
-                    # Show progress every 100 players
-                    if i % 100 == 0:
-                        print(f"🔄 Processed {i}/{len(players)} players...")
-                        
+                    return [(gw_id, build_match_data(player, gw_entry, gw_id, team_map))]
                 except Exception as e:
-                    errors += 1
-                    if errors <= 5:  # Show first few errors
+                    totals['errors'] += 1
+                    if totals['errors'] <= 5:  # Show first few errors
                         print(f"❌ Error processing {player.first_name} {player.second_name}: {e}")
-            
+                    return []
+
+            def handle_summary(player, summary, error):
+                totals['processed'] += 1
+                if totals['processed'] % 100 == 0:
+                    print(f"🔄 Processed {totals['processed']}/{len(players)} players...")
+                if error is not None:
+                    totals['errors'] += 1
+                    if totals['errors'] <= 5:
+                        print(f"❌ Error processing {player.first_name} {player.second_name}: {error}")
+                    return []
+
+                # Find current gameweek entry
+                gw_entry = None
+                for g in summary.get('history', []):
+                    if g.get('event') == gw_id or g.get('round') == gw_id:
+                        gw_entry = g
+                        break
+
+                if not gw_entry:
+                    return []  # No data for this gameweek
+                return handle_entry(player, gw_entry)
+
+            async def write_batch(rows):
+                try:
+                    counts = await sync_to_async(write_match_batch)(rows)
+                except Exception as e:
+                    totals['errors'] += len(rows)
+                    print(f"❌ Error writing {len(rows)} matches: {e}")
+                    return
+                for key, value in counts.get(gw_id, {}).items():
+                    totals[key] += value
+
+            if mode == 'live':
+                print(f"👥 Processing {len(players)} players from the gameweek {gw_id} live data...")
+                live, fixtures, fetch_stats = await fetch_live_gameweek(client, gw_id)
+                entries = build_live_entries(
+                    live.get('elements', []), fixtures, gw_id, {player.id: player.team for player in players}
+                )
+                rows = []
+                for player in players:
+                    totals['processed'] += 1
+                    if player.id in entries:
+                        rows.extend(handle_entry(player, entries[player.id]))
+                for i in range(0, len(rows), batch_size):
+                    await write_batch(rows[i:i + batch_size])
+            else:
+                print(f"👥 Processing {len(players)} players (concurrency {get_fetch_concurrency(concurrency)})...")
+                queue = asyncio.Queue()
+                fetch_stats, _ = await asyncio.gather(
+                    fetch_player_summaries(fpl, players, queue, concurrency=concurrency),
+                    consume_in_batches(queue, handle_summary, write_batch, batch_size),
+                )
+
             # Summary
             end_time = datetime.now()
             duration = (end_time - start_time).total_seconds()
-            
+
             print(f"✅ Gameweek {gw_id} data import complete!")
-            print(f"   New matches: {new_matches}")
-            print(f"   Updated matches: {updated_matches}")
-            print(f"   Skipped matches: {skipped_matches}")
-            print(f"   Errors: {errors}")
+            print(f"   New matches: {totals['new']}")
+            print(f"   Updated matches: {totals['updated']}")
+            print(f"   Skipped matches: {totals['skipped']}")
+            print(f"   Errors: {totals['errors']}")
+            print(f"   Requests: {fetch_stats['requests']} ({fetch_stats['retries']} retries, "
+                  f"mean {fetch_stats['mean_request_time']}s, p95 {fetch_stats['p95_request_time']}s)")
             print(f"   Duration: {duration:.2f} seconds")
-            
+
             return {
                 'success': True,
+                'mode': mode,
                 'gameweek': gw_id,
-                'new_matches': new_matches,
-                'updated_matches': updated_matches,
-                'skipped_matches': skipped_matches,
-                'errors': errors,
+                'new_matches': totals['new'],
+                'updated_matches': totals['updated'],
+                'skipped_matches': totals['skipped'],
+                'errors': totals['errors'],
                 'duration': duration,
-                'total_players': len(players)
+                'total_players': len(players),
+                'fetch_stats': fetch_stats,
             }
-            
+
     except Exception as e:
         print(f"❌ Fatal error during gameweek data import: {e}")
         return {
@@ -214,14 +382,17 @@ async def get_current_gameweek_data() -> Dict[str, Any]:
         }
 
 
-async def refresh_current_gameweek_players() -> Dict[str, Any]:
+async def refresh_current_gameweek_players(mode: Optional[str] = None) -> Dict[str, Any]:
     """
     Convenience function to refresh current gameweek player data
     
+    Args:
+        mode (str, optional): 'history' or 'live' import mode
+    
     Returns:
         Dict[str, Any]: Import result summary
     """
-    return await get_current_gameweek_data()
+    return await get_current_gameweek_data(mode=mode)
 
 
 # Standalone execution
@@ -1,6 +1,7 @@
 import pandas as pd
 from pulp import LpProblem, LpVariable, lpSum, LpMaximize, LpBinary, LpStatus, value
 from MyApi.models import Player, SystemSettings
+from MyApi.utils.full_squad_optimizer import select_full_squads
 
 
 class SquadSelector:
@@ -9,6 +10,7 @@ class SquadSelector:
         self.current_week = SystemSettings.get_settings().current_gameweek
         self.formation = formation
         self.position_counts = self.get_position_counts(formation)
+        self.solve_stats = []
 
     def get_position_counts(self, formation):
         formation_map = {
@@ -28,18 +30,27 @@ class SquadSelector:
                 'Player': p.name,
                 'Position': p.position,
                 'Elo': float(p.elo),
-                'Cost': float(p.cost)
+                'Cost': float(p.cost),
+                'Team': p.team
             } for p in qs
         ])
         return df
 
-    def select_top_n_squads(self, budget=82.5, top_n=4):
-        counts = self.position_counts
+    def get_all_players(self):
+        # Every player of the week; select_full_squads prunes the dominated ones
+        rows = Player.objects.filter(week=self.current_week).values_list('name', 'position', 'elo', 'cost', 'team')
+        return pd.DataFrame(list(rows), columns=['Player', 'Position', 'Elo', 'Cost', 'Team'])
+
+    def get_candidate_pool(self):
         gks = self.get_top_players('Keeper', 10)
         defs = self.get_top_players('Defender', 40)
         mids = self.get_top_players('Midfielder', 40)
         atts = self.get_top_players('Attacker', 40)
-        squad_df = pd.concat([gks, defs, mids, atts], ignore_index=True)
+        return pd.concat([gks, defs, mids, atts], ignore_index=True)
+
+    def select_top_n_squads(self, budget=82.5, top_n=4):
+        counts = self.position_counts
+        squad_df = self.get_candidate_pool()
 
         squads = []
         used_players = set()
@@ -80,6 +91,14 @@ class SquadSelector:
             print(f"Squad {idx}: {squad_dict}")
         return squads
 
+    def select_top_n_full_squads(self, budget=100.0, top_n=1, bench_weight=0.1, max_per_club=3, time_limit_ms=None):
+        # 15-player squads (2-5-5-3) with the formation as the starting XI
+        squad_df = self.get_all_players()
+        self.solve_stats = []
+        return select_full_squads(squad_df, 'Elo', self.position_counts, budget=budget, top_n=top_n,
+                                  bench_weight=bench_weight, max_per_club=max_per_club,
+                                  time_limit_ms=time_limit_ms, solve_stats=self.solve_stats)
+
     def generate_squads(self):
         return self.select_top_n_squads()
 
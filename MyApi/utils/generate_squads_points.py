@@ -1,6 +1,9 @@
+import time
 import pandas as pd
 from pulp import LpProblem, LpVariable, lpSum, LpMaximize, LpBinary
 from MyApi.models import Player, ProjectedPoints, SystemSettings
+from MyApi.utils.anytime_solver import get_time_limit_ms, greedy_lineup, solve_with_time_limit
+from MyApi.utils.full_squad_optimizer import select_full_squads
 
 
 class SquadSelector:
@@ -112,21 +115,43 @@ class SquadSelectorPoints:
                 'Player': p.name,
                 'Position': p.position,
                 'ProjectedPoints': projected_points,
-                'Cost': float(p.cost)
+                'Cost': float(p.cost),
+                'Team': p.team
             })
         df = pd.DataFrame(player_data)
         return df.nlargest(n, 'ProjectedPoints')
 
-    def select_top_n_squads(self, budget=82.5, top_n=4):
-        counts = self.position_counts
+    def get_all_players(self):
+        # Every player of the week with points over their next N projections, in two queries;
+        # select_full_squads prunes the dominated ones
+        projections = {}
+        for name, points in ProjectedPoints.objects.order_by('player_name', 'gameweek', 'id').values_list(
+                'player_name', 'adjusted_expected_points'):
+            player_points = projections.setdefault(name, [])
+            if len(player_points) < self.games_to_consider:
+                player_points.append(float(points))
+        rows = Player.objects.filter(week=self.current_week).values_list('name', 'position', 'cost', 'team')
+        return pd.DataFrame(
+            [(name, position, sum(projections.get(name, [])), float(cost), team) for name, position, cost, team in rows],
+            columns=['Player', 'Position', 'ProjectedPoints', 'Cost', 'Team'],
+        )
+
+    def get_candidate_pool(self):
         gks = self.get_top_players('Keeper', 10)
         defs = self.get_top_players('Defender', 40)
         mids = self.get_top_players('Midfielder', 40)
         atts = self.get_top_players('Attacker', 40)
-        squad_df = pd.concat([gks, defs, mids, atts], ignore_index=True)
+        return pd.concat([gks, defs, mids, atts], ignore_index=True)
+
+    def select_top_n_squads(self, budget=82.5, top_n=4, time_limit_ms=None):
+        counts = self.position_counts
+        squad_df = self.get_candidate_pool()
 
         squads = []
         used_players = set()
+        self.solve_stats = []
+        # One solve budget for the whole request, shared by the top_n solves
+        deadline = time.perf_counter() + get_time_limit_ms(time_limit_ms) / 1000.0
 
         for _ in range(top_n):
             available_idx = [i for i in range(len(squad_df)) if squad_df.loc[i, "Player"] not in used_players]
@@ -142,12 +167,24 @@ class SquadSelectorPoints:
             prob += lpSum([choices[j] for j in range(len(available_idx)) if squad_df.loc[available_idx[j], "Position"] == "Midfielder"]) == counts['midfielder']
             prob += lpSum([choices[j] for j in range(len(available_idx)) if squad_df.loc[available_idx[j], "Position"] == "Attacker"]) == counts['attacker']
 
-            prob.solve()
-            selected = [available_idx[j] for j in range(len(available_idx)) if choices[j].varValue == 1]
+            remaining_ms = (deadline - time.perf_counter()) * 1000
+            selected = []
+            if remaining_ms >= 1:
+                stats = solve_with_time_limit(prob, remaining_ms)
+                if stats['status'] in ('optimal', 'feasible'):
+                    selected = [available_idx[j] for j in range(len(available_idx)) if choices[j].varValue is not None and choices[j].varValue > 0.5]
+            else:
+                stats = {'status': 'not_solved', 'objective': None, 'optimality_gap': None, 'solve_time': 0.0, 'timed_out': True}
             if not selected:
-                break
+                # Nothing feasible within the budget: fall back to a greedy lineup
+                selected = greedy_lineup(squad_df, 'ProjectedPoints', counts, budget, exclude=used_players)
+                if not selected:
+                    break
+                stats['status'] = 'greedy'
+                stats['objective'] = float(squad_df.loc[selected, 'ProjectedPoints'].sum())
+            self.solve_stats.append(stats)
             used_players.update(squad_df.loc[selected, "Player"])
-            result = squad_df.iloc[selected]
+            result = squad_df.loc[selected]
             squads.append(result)
 
         for idx, squad in enumerate(squads, 1):
@@ -163,6 +200,14 @@ class SquadSelectorPoints:
             print(f"Squad {idx}: {squad_dict}")
         return squads
 
+    def select_top_n_full_squads(self, budget=100.0, top_n=1, bench_weight=0.1, max_per_club=3, time_limit_ms=None):
+        # 15-player squads (2-5-5-3) with the formation as the starting XI
+        squad_df = self.get_all_players()
+        self.solve_stats = []
+        return select_full_squads(squad_df, 'ProjectedPoints', self.position_counts, budget=budget, top_n=top_n,
+                                  bench_weight=bench_weight, max_per_club=max_per_club,
+                                  time_limit_ms=time_limit_ms, solve_stats=self.solve_stats)
+
     def generate_squads(self):
         return self.select_top_n_squads()
 
@@ -0,0 +1,140 @@
+"""
+Concurrent FPL player history fetching.
+
+Player summaries are requested through one shared session with at most
+`concurrency` requests in flight. Each summary is requested once; retries
+with backoff happen in the shared session (see fpl_http_cache.CachingSession),
+every request is timed, and results are put on an
+asyncio queue as they arrive so a writer can store them in batches while
+the remaining requests are still running.
+"""
+
+import asyncio
+import time
+from django.conf import settings
+
+from MyApi.utils.fpl_http_cache import DEFAULT_API_BASE_URL, fetch_json
+
+
+PLAYER_SUMMARY_URL = DEFAULT_API_BASE_URL + 'element-summary/{}/'
+
+DEFAULT_FETCH_CONCURRENCY = 16
+DEFAULT_WRITE_BATCH_SIZE = 200
+
+
+def get_fetch_concurrency(requested=None):
+    """
+    Resolve the number of concurrent FPL requests.
+
+    Args:
+        requested: Per-call limit (may be None)
+
+    Returns:
+        int: Concurrency limit, at least 1
+    """
+    if requested is None:
+        requested = getattr(settings, 'FPL_FETCH_CONCURRENCY', DEFAULT_FETCH_CONCURRENCY)
+    try:
+        return max(int(requested), 1)
+    except (TypeError, ValueError):
+        return DEFAULT_FETCH_CONCURRENCY
+
+
+class FetchStats:
+    """Per-request timings, retries and failures for one fetch run."""
+
+    def __init__(self):
+        self.timings = []
+        self.retries = 0
+        self.failures = 0
+        self.start = time.perf_counter()
+
+    def summary(self):
+        timings = sorted(self.timings)
+        count = len(timings)
+        return {
+            'requests': count,
+            'retries': self.retries,
+            'failures': self.failures,
+            'mean_request_time': round(sum(timings) / count, 3) if count else 0.0,
+            'p95_request_time': round(timings[min(int(count * 0.95), count - 1)], 3) if count else 0.0,
+            'max_request_time': round(timings[-1], 3) if count else 0.0,
+            'wall_time': round(time.perf_counter() - self.start, 2),
+        }
+
+
+async def fetch_player_summary(fpl, player_id, semaphore, stats):
+    """
+    Fetch one player's summary JSON through the client's session (not the fpl
+    library's fetch, which would add its own retry loop on top of the session's).
+
+    Returns:
+        dict: Summary with 'history', 'fixtures' and 'history_past' lists
+    """
+    async with semaphore:
+        request_start = time.perf_counter()
+        try:
+            return await fetch_json(fpl.session, PLAYER_SUMMARY_URL.format(player_id))
+        finally:
+            stats.timings.append(time.perf_counter() - request_start)
+
+
+async def fetch_player_summaries(fpl, players, queue, concurrency=None):
+    """
+    Fetch summaries for all players concurrently, streaming results to a queue.
+
+    Each result is put on the queue as (player, summary, error) in completion
+    order; a final None marks the end of the stream.
+
+    Args:
+        fpl: FPL client sharing one aiohttp session
+        players (list): FPL player objects
+        queue (asyncio.Queue): Destination for results
+        concurrency (int, optional): Requests in flight, defaults to settings.FPL_FETCH_CONCURRENCY
+
+    Returns:
+        dict: Timing summary from FetchStats
+    """
+    semaphore = asyncio.Semaphore(get_fetch_concurrency(concurrency))
+    stats = FetchStats()
+    session_stats = getattr(fpl.session, 'stats', {})
+    retries_before = session_stats.get('retries', 0)
+
+    async def fetch_one(player):
+        try:
+            summary = await fetch_player_summary(fpl, player.id, semaphore, stats)
+            await queue.put((player, summary, None))
+        except Exception as e:
+            stats.failures += 1
+            await queue.put((player, None, e))
+
+    try:
+        await asyncio.gather(*(fetch_one(player) for player in players))
+    finally:
+        await queue.put(None)
+    # Retries are made (and counted) by the shared session
+    stats.retries = session_stats.get('retries', 0) - retries_before
+    return stats.summary()
+
+
+async def consume_in_batches(queue, handle_item, write_batch, batch_size=DEFAULT_WRITE_BATCH_SIZE):
+    """
+    Drain a fetch queue, turning items into rows and writing them in batches.
+
+    Args:
+        queue (asyncio.Queue): Queue filled by fetch_player_summaries
+        handle_item (callable): (player, summary, error) -> list of rows
+        write_batch (coroutine function): Writes a list of rows
+        batch_size (int): Rows per write
+    """
+    batch = []
+    while True:
+        item = await queue.get()
+        if item is None:
+            break
+        batch.extend(handle_item(*item))
+        if len(batch) >= batch_size:
+            await write_batch(batch)
+            batch = []
+    if batch:
+        await write_batch(batch)
@@ -0,0 +1,220 @@
+"""
+Batched upsert of imported PlayerMatch rows.
+
+Rows are matched to existing matches by (fpl_id, date, gameweek) and, for
+rows not yet linked to an FPL element, by (player_name, date, gameweek),
+where the gameweek is read from round_info ('Gameweek 5', 'Matchweek 5' or
+'5'). A name match is never taken for a row linked to a different element,
+and an update links the row it matched. A row that matches on neither key
+but shares the table's unique (player_name, date, opponent) with a stored
+match updates that match, or is rejected when the match belongs to another
+element. Rows missing a name, date or opponent are rejected up front, so
+one bad row never fails the batch. Existing rows for a batch are loaded
+with one IN query per chunk of ids and of names; new rows are inserted with
+bulk_create and changed rows written with bulk_update, all in a single
+transaction. An insert that collides on the unique key with a match stored
+concurrently updates that match (ON CONFLICT DO UPDATE) where the database
+supports it, and is skipped elsewhere, instead of failing the batch.
+"""
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from MyApi.models import PlayerMatch
+
+
+DEFAULT_UPSERT_CHUNK_SIZE = 500
+
+# Set on insert only: Elo placeholders must not overwrite values calculated
+# later, and a match found by fpl_id keeps the name it was stored under
+INSERT_ONLY_FIELDS = {'elo_before_match', 'elo_after_match', 'player_name'}
+
+# Fields of the table's unique key, which must be present on every row
+REQUIRED_FIELDS = ('player_name', 'date', 'opponent')
+
+OUTCOMES = ('inserted', 'updated', 'unchanged', 'rejected')
+
+# Never written by a conflict update: the unique key itself, insert-only
+# fields, the creation time, and fpl_id (a conflicting row may be unlinked)
+CONFLICT_PRESERVED_FIELDS = set(REQUIRED_FIELDS) | INSERT_ONLY_FIELDS | {'id', 'created_at', 'fpl_id'}
+
+# Rejection messages kept in the result
+MAX_REJECTIONS_REPORTED = 20
+
+
+def parse_gameweek(round_info):
+    """Gameweek number from 'Gameweek 5', 'Matchweek 5' or '5', else None."""
+    text = (round_info or '').strip()
+    for prefix in ('Gameweek ', 'Matchweek '):
+        if text.startswith(prefix):
+            text = text[len(prefix):]
+            break
+    return int(text) if text.isdigit() else None
+
+
+def _normalize(match_data):
+    """Convert incoming values to the model's Python types so comparisons are exact."""
+    return {
+        field: PlayerMatch._meta.get_field(field).to_python(value)
+        for field, value in match_data.items()
+    }
+
+
+def _match_key(player, match_date, round_info):
+    """Key by FPL element id or player name (the two never collide: int vs str)."""
+    return player, match_date, parse_gameweek(round_info)
+
+
+def _row_key(data):
+    player = data['fpl_id'] if data.get('fpl_id') is not None else data['player_name']
+    return _match_key(player, data['date'], data['round_info'])
+
+
+def _unique_key(player_name, match_date, opponent):
+    return player_name, match_date, opponent
+
+
+def _load_existing(rows, chunk_size):
+    """
+    Existing matches for the rows' players and dates.
+
+    Returns:
+        tuple: (matches keyed like _match_key, by fpl_id for linked matches and
+            by player_name for all of them; matches keyed like _unique_key)
+    """
+    ids = sorted({row['fpl_id'] for row in rows if row.get('fpl_id') is not None})
+    names = sorted({row['player_name'] for row in rows})
+    dates = sorted({row['date'] for row in rows})
+    existing = {}
+    by_unique = {}
+    for field, values in (('fpl_id', ids), ('player_name', names)):
+        for i in range(0, len(values), chunk_size):
+            lookup = {f'{field}__in': values[i:i + chunk_size], 'date__in': dates}
+            for match in PlayerMatch.objects.filter(**lookup):
+                if match.fpl_id is not None:
+                    existing.setdefault(_match_key(match.fpl_id, match.date, match.round_info), match)
+                existing.setdefault(_match_key(match.player_name, match.date, match.round_info), match)
+                by_unique.setdefault(_unique_key(match.player_name, match.date, match.opponent), match)
+    return existing, by_unique
+
+
+def _find_existing(existing, key, data):
+    match = existing.get(key)
+    if match is None and data.get('fpl_id') is not None:
+        # Fall back to the name for matches stored before they were linked
+        match = existing.get(_match_key(data['player_name'], data['date'], data['round_info']))
+        if match is not None and match.fpl_id is not None and match.fpl_id != data['fpl_id']:
+            match = None  # Same name, different FPL player
+    return match
+
+
+def _insert_new_matches(to_create, chunk_size):
+    """Bulk insert rows, updating (or skipping) any that a concurrent import stored first."""
+    features = connection.features
+    if features.supports_update_conflicts:
+        update_fields = [
+            field.name for field in PlayerMatch._meta.concrete_fields
+            if field.name not in CONFLICT_PRESERVED_FIELDS
+        ]
+        unique_fields = list(REQUIRED_FIELDS) if features.supports_update_conflicts_with_target else None
+        PlayerMatch.objects.bulk_create(
+            to_create, batch_size=chunk_size, update_conflicts=True,
+            unique_fields=unique_fields, update_fields=update_fields,
+        )
+    else:
+        PlayerMatch.objects.bulk_create(to_create, batch_size=chunk_size, ignore_conflicts=True)
+
+
+def upsert_player_matches(rows, chunk_size=DEFAULT_UPSERT_CHUNK_SIZE):
+    """
+    Insert new and update changed PlayerMatch rows in one transaction.
+
+    Args:
+        rows (list): PlayerMatch field dicts (must include player_name, date and round_info;
+            fpl_id when known)
+        chunk_size (int): Rows per IN query, bulk_create and bulk_update batch
+
+    Returns:
+        dict: {'inserted', 'updated', 'unchanged', 'rejected', 'rejections': [message, ...],
+            'by_gameweek': {gameweek: {'inserted', 'updated', 'unchanged', 'rejected'}}}
+    """
+    counts = {outcome: 0 for outcome in OUTCOMES}
+    counts.update({'rejections': [], 'by_gameweek': {}})
+    if not rows:
+        return counts
+
+    def count(gameweek, outcome, reason=None):
+        counts[outcome] += 1
+        gameweek_counts = counts['by_gameweek'].setdefault(gameweek, {outcome: 0 for outcome in OUTCOMES})
+        gameweek_counts[outcome] += 1
+        if reason and len(counts['rejections']) < MAX_REJECTIONS_REPORTED:
+            counts['rejections'].append(reason)
+
+    # Last row wins when a batch repeats a match
+    incoming = {}
+    for row in rows:
+        try:
+            data = _normalize(row)
+        except ValidationError as e:
+            count(parse_gameweek(row.get('round_info')), 'rejected', f"{row.get('player_name')}: {e}")
+            continue
+        missing = [field for field in REQUIRED_FIELDS if data.get(field) in (None, '')]
+        if missing:
+            count(parse_gameweek(data.get('round_info')), 'rejected',
+                  f"{data.get('player_name')}: missing {', '.join(missing)}")
+            continue
+        incoming[_row_key(data)] = data
+
+    now = timezone.now()
+    with transaction.atomic():
+        existing, by_unique = _load_existing(list(incoming.values()), chunk_size)
+
+        to_create = []
+        to_update = []
+        update_fields = set()
+        for key, data in incoming.items():
+            unique = _unique_key(data['player_name'], data['date'], data['opponent'])
+            match = _find_existing(existing, key, data)
+            if match is None:
+                # Rows the match keys miss (e.g. unparseable round_info) may still hit the unique key
+                clash = by_unique.get(unique)
+                if clash is not None and clash.fpl_id is not None and data.get('fpl_id') not in (None, clash.fpl_id):
+                    count(key[2], 'rejected', f"{data['player_name']} {data['date']}: stored match belongs to another FPL player")
+                    continue
+                match = clash
+            if match is not None and match.pk is None:
+                count(key[2], 'rejected', f"{data['player_name']} {data['date']}: repeats another row of the batch")
+                continue
+            if match is None:
+                by_unique[unique] = PlayerMatch(**data)
+                to_create.append(by_unique[unique])
+                count(key[2], 'inserted')
+                continue
+            changed = [
+                field for field, value in data.items()
+                if field not in INSERT_ONLY_FIELDS and getattr(match, field) != value
+                and not (field == 'fpl_id' and value is None)  # Never unlink a linked match
+            ]
+            if not changed:
+                count(key[2], 'unchanged')
+                continue
+            stored_unique = _unique_key(match.player_name, match.date, match.opponent)
+            new_unique = _unique_key(match.player_name, data['date'], data['opponent'])
+            if new_unique != stored_unique and by_unique.get(new_unique) not in (None, match):
+                count(key[2], 'rejected', f"{data['player_name']} {data['date']}: would duplicate another stored match")
+                continue
+            for field in changed:
+                setattr(match, field, data[field])
+            by_unique[new_unique] = match
+            match.updated_at = now
+            update_fields.update(changed)
+            to_update.append(match)
+            count(key[2], 'updated')
+
+        if to_create:
+            _insert_new_matches(to_create, chunk_size)
+        if to_update:
+            PlayerMatch.objects.bulk_update(to_update, sorted(update_fields | {'updated_at'}), batch_size=chunk_size)
+
+    return counts
@@ -0,0 +1,125 @@
+"""
+Per-gameweek player pool for substitution recommendations.
+
+The pool joins a gameweek's PlayerFixture rows to the current week's Player
+rows in one query and keeps the result as compact arrays. Pools are cached
+in-process and rebuilt only when the dataset version changes, so repeated
+recommendation calls for the same gameweek do not re-query the fixtures.
+"""
+
+import threading
+import numpy as np
+from django.db import connection
+
+from MyApi.models import Player, PlayerFixture, SystemSettings
+from MyApi.utils.dataset_version import get_dataset_version
+
+
+_pool_cache = {}
+_pool_lock = threading.Lock()
+
+
+class PlayerPool:
+    """
+    Players with a fixture in one gameweek, stored column-wise.
+    Double gameweeks are summed into a single projected_points value.
+    """
+
+    def __init__(self, gameweek, week, names, positions, teams, costs, points, elos):
+        self.gameweek = gameweek
+        self.week = week
+        self.names = names
+        self.teams = teams
+        self.positions = np.asarray(positions, dtype=object)
+        self.costs = np.asarray(costs, dtype=np.float64)
+        self.points = np.asarray(points, dtype=np.float64)
+        self.elos = np.asarray(elos, dtype=np.float64)
+        self.index_by_name = {name: i for i, name in enumerate(names)}
+        self._position_indexes = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def position_indexes(self, position):
+        """Row indexes of players in a position."""
+        if position not in self._position_indexes:
+            self._position_indexes[position] = np.flatnonzero(self.positions == position)
+        return self._position_indexes[position]
+
+    def to_dicts(self, exclude=None):
+        """
+        Player dicts in the format used by recommend_substitutes, best projected points first.
+
+        Args:
+            exclude (set, optional): Player names to leave out
+        """
+        exclude = exclude or set()
+        order = np.argsort(-self.points, kind='stable')
+        return [
+            {
+                'name': self.names[i],
+                'position': self.positions[i],
+                'team': self.teams[i],
+                'cost': float(self.costs[i]),
+                'elo': float(self.elos[i]),
+                'projected_points': float(self.points[i]),
+            }
+            for i in order
+            if self.names[i] not in exclude
+        ]
+
+
+def build_player_pool(gameweek, week):
+    """
+    Load the pool for a gameweek with a single join of fixtures to the week's players.
+
+    Args:
+        gameweek (int): Fixture gameweek
+        week (int): Player week providing position, cost and Elo
+
+    Returns:
+        PlayerPool
+    """
+    sql = f"""
+        SELECT pf.player_name, p.position, MAX(pf.team), p.cost, p.elo, SUM(pf.projected_points)
+        FROM {PlayerFixture._meta.db_table} pf
+        JOIN {Player._meta.db_table} p ON p.name = pf.player_name AND p.week = %s
+        WHERE pf.gameweek = %s
+        GROUP BY pf.player_name, p.position, p.cost, p.elo
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [week, gameweek])
+        rows = cursor.fetchall()
+
+    columns = list(zip(*rows)) if rows else [[] for _ in range(6)]
+    names, positions, teams, costs, elos, points = columns
+    return PlayerPool(
+        gameweek, week, list(names), list(positions), list(teams),
+        [cost or 0.0 for cost in costs], [point or 0.0 for point in points], elos
+    )
+
+
+def get_player_pool(gameweek, week=None):
+    """
+    Cached player pool for a gameweek, rebuilt when the dataset version changes.
+
+    Args:
+        gameweek (int): Fixture gameweek
+        week (int, optional): Player week, defaults to the current gameweek setting
+
+    Returns:
+        PlayerPool
+    """
+    if week is None:
+        week = SystemSettings.get_settings().current_gameweek
+    version = get_dataset_version(week)
+    key = (week, gameweek)
+    with _pool_lock:
+        cached = _pool_cache.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+    pool = build_player_pool(gameweek, week)
+    with _pool_lock:
+        _pool_cache[key] = (version, pool)
+    return pool
+
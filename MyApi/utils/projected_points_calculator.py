@@ -1,8 +1,10 @@
 from MyApi.models import ProjectedPoints, PlayerFixture, Player
+from MyApi.utils.dataset_version import bump_dataset_version
 import logging
 import asyncio
 import aiohttp
 from datetime import datetime
+from django.utils import timezone
 from typing import Dict, Any
 
 
@@ -65,12 +67,17 @@ async def calculate_and_store_projected_points(override_existing=True):
     skipped_players = []
     # Delete all ProjectedPoints records (full refresh)
     await sync_to_async(ProjectedPoints.objects.all().delete)()
+    await sync_to_async(bump_dataset_version)()
     # Get all future PlayerFixtures
     fixtures = await sync_to_async(list)(PlayerFixture.objects.all())
     for fixture in fixtures:
         try:
-            # Try to get the player, skip if not found
-            player = await sync_to_async(Player.objects.filter(name=fixture.player_name).first)()
+            # Try to get the player (by FPL id when linked), skip if not found
+            if fixture.fpl_id is not None:
+                player_lookup = Player.objects.filter(fpl_id=fixture.fpl_id)
+            else:
+                player_lookup = Player.objects.filter(name=fixture.player_name)
+            player = await sync_to_async(player_lookup.first)()
             if not player:
                 print(f"[WARN] No Player found for fixture: {fixture.player_name} GW{fixture.gameweek}")
                 skipped_fixtures += 1
@@ -93,6 +100,7 @@ async def calculate_and_store_projected_points(override_existing=True):
                 ).delete)()
                 await sync_to_async(ProjectedPoints.objects.create)(
                     player_name=fixture.player_name,
+                    fpl_id=fixture.fpl_id,
                     gameweek=fixture.gameweek,
                     opponent=fixture.opponent,
                     is_home=fixture.is_home,
@@ -111,7 +119,8 @@ async def calculate_and_store_projected_points(override_existing=True):
                     player_name=fixture.player_name,
                     gameweek=fixture.gameweek
                 ).update)(
-                    projected_points=round(adjusted_points, 1)
+                    projected_points=round(adjusted_points, 1),
+                    updated_at=timezone.now()
                 )
                 projections_created += 1
             else:
@@ -120,6 +129,7 @@ async def calculate_and_store_projected_points(override_existing=True):
                     gameweek=fixture.gameweek,
                     opponent=fixture.opponent,
                     defaults={
+                        'fpl_id': fixture.fpl_id,
                         'is_home': fixture.is_home,
                         'current_elo': player.elo,
                         'current_cost': player.cost,
@@ -196,10 +206,12 @@ async def refresh_fixtures_util(next_gameweeks=3) -> dict:
 from asgiref.sync import sync_to_async
 
 async def fetch_fpl_fixtures():
-    async with aiohttp.ClientSession() as session:
-        async with session.get('https://fantasy.premierleague.com/api/fixtures/') as response:
-            if response.status == 200:
-                return await response.json()
+    from MyApi.utils.fpl_client import fpl_client
+    async with fpl_client() as client:
+        try:
+            return await client.fixtures()
+        except Exception as e:
+            print(f"[ERROR] Fetching FPL fixtures: {e}")
             return []
 
 
@@ -215,7 +227,7 @@ async def update_player_fixtures(next_gameweeks=3):
     fixtures = await fetch_fpl_fixtures()
     team_id_to_name = {t.fpl_team_id: t.name for t in await sync_to_async(list)(Team.objects.all())}
     # Get all player names and their teams in our DB for the current week
-    db_players = await sync_to_async(list)(Player.objects.filter(week=current_gw).values('name', 'team'))
+    db_players = await sync_to_async(list)(Player.objects.filter(week=current_gw).values('name', 'team', 'fpl_id'))
     print(f"[DEBUG] Found {len(db_players)} players for week {current_gw}")
     team_name_to_id = {t.name.lower(): t.fpl_team_id for t in await sync_to_async(list)(Team.objects.all())}
     fixtures_to_create = []
@@ -242,6 +254,7 @@ async def update_player_fixtures(next_gameweeks=3):
             difficulty = fixture['team_h_difficulty'] if is_home else fixture['team_a_difficulty']
             fixtures_to_create.append(PlayerFixture(
                 player_name=db_name,
+                fpl_id=player['fpl_id'],
                 team=team_id,  # Store FPL team_id for player's team
                 gameweek=fixture['event'],
                 opponent=opponent_id,  # Store FPL team_id for opponent
@@ -253,6 +266,7 @@ async def update_player_fixtures(next_gameweeks=3):
     if skipped_players:
         print(f"[DEBUG] Skipped {len(skipped_players)} players due to missing/mismatched team: {skipped_players}")
     await sync_to_async(PlayerFixture.objects.bulk_create)(fixtures_to_create)
+    await sync_to_async(bump_dataset_version)()
     print(f"Created {len(fixtures_to_create)} player fixtures.")
 
 
@@ -342,10 +356,12 @@ async def add_current_gameweek_points():
 
     for fixture in fixtures:
         try:
-            # Get the most recent PlayerMatch for the player
-            recent_match = await sync_to_async(PlayerMatch.objects.filter(
-                player_name=fixture.player_name
-            ).order_by('-date').first)()
+            # Get the most recent PlayerMatch for the player (by FPL id when linked)
+            if fixture.fpl_id is not None:
+                player_matches = PlayerMatch.objects.filter(fpl_id=fixture.fpl_id)
+            else:
+                player_matches = PlayerMatch.objects.filter(player_name=fixture.player_name)
+            recent_match = await sync_to_async(player_matches.order_by('-date').first)()
 
             if not recent_match:
                 print(f"[WARN] No recent match found for player: {fixture.player_name}")
@@ -359,6 +375,7 @@ async def add_current_gameweek_points():
                 player_name=fixture.player_name,
                 gameweek=fixture.round_info.split()[1],
                 defaults={
+                    'fpl_id': fixture.fpl_id,
                     'projected_points': current_points
                 }
             )
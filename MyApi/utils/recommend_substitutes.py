@@ -3,17 +3,20 @@ Utility functions for recommending substitutes based on projected points optimiz
 Uses PuLP linear programming to find optimal packages of 3-4 substitutions together.
 """
 
+import bisect
 import json
+import time
 import pulp
 from django.db.models import Sum
 from MyApi.models import Player, ProjectedPoints, SystemSettings, PlayerFixture
-from django.db.models import OuterRef, Subquery
+from MyApi.utils.anytime_solver import solve_with_time_limit
+from MyApi.utils.player_pool import get_player_pool
 
 
 
 
 
-def get_all_players_with_projected_points(user, squad_data, gameweek=None, exclude_current_squad=True):
+def get_all_players_with_projected_points(user, squad_data, gameweek=None, exclude_current_squad=True, player_pool=None):
     """
     Get all available players with their projected points for a specific gameweek.
     Args:
@@ -21,22 +24,15 @@ def get_all_players_with_projected_points(user, squad_data, gameweek=None, exclu
         squad_data: Current squad data (dict)
         gameweek (int, optional): Gameweek to use for projections
         exclude_current_squad (bool): Whether to exclude current squad players
+        player_pool (PlayerPool, optional): Preloaded pool for the gameweek
     Returns:
         list: List of all players with projected points, sorted by points descending
     """
     try:
-        if not PlayerFixture.objects.filter(gameweek=gameweek).exists():
+        pool = player_pool if player_pool is not None else get_player_pool(gameweek)
+        if not len(pool):
             print(f"Error: gameweek {gameweek} is not present in the upcoming fixtures")
             return []
-        # Annotate player fixtures with position and cost from Player model using Subquery
-        player_fixtures = PlayerFixture.objects.filter(gameweek=gameweek).annotate(
-            position=Subquery(
-            Player.objects.filter(name=OuterRef('player_name')).values('position')[:1]
-            ),
-            cost=Subquery(
-            Player.objects.filter(name=OuterRef('player_name')).values('cost')[:1]
-            )
-        )
 
         # Get current squad player names if excluding them
         current_squad_players = set()
@@ -46,25 +42,8 @@ def get_all_players_with_projected_points(user, squad_data, gameweek=None, exclu
                     if isinstance(player_data, dict) and 'name' in player_data:
                         current_squad_players.add(player_data['name'])
 
-        players_with_projections = []
-        for pf in player_fixtures:
-            # Skip if player is already in current squad (when excluding)
-            if exclude_current_squad and pf.player_name in current_squad_players:
-                continue
-            # Use the projected points from the PlayerFixtures table for this gameweek
-            projected_points = getattr(pf, 'projected_points', None)
-            players_with_projections.append({
-                'name': pf.player_name,
-                'position': pf.position,  # Position is now correctly annotated
-                'team': pf.team,
-                'cost': pf.cost,
-                'elo': getattr(pf, 'elo', 0),
-                'projected_points': projected_points
-            })
-
-        # Sort by projected points (descending)
-        players_with_projections.sort(key=lambda x: x['projected_points'], reverse=True)
-        return players_with_projections
+        # Sorted by projected points (descending)
+        return pool.to_dicts(exclude=current_squad_players)
     except Exception as e:
         print(f"Error getting players with projected points: {e}")
         return []
@@ -285,6 +264,97 @@ def analyze_squad_weaknesses_test(current_squad=None):
             'improvement_suggestions': []
         }
 
+def prune_dominated_candidates(candidates, slots):
+    """
+    Drop candidates that at least `slots` other candidates weakly dominate
+    (no more expensive and at least as many projected points).
+
+    A package can replace at most `slots` players in a position, so any package
+    using a pruned candidate can swap it for an unused dominator without raising
+    cost or lowering improvement; the optimum is unchanged.
+
+    Args:
+        candidates (list): Player dicts of one position
+        slots (int): Number of squad players in that position
+
+    Returns:
+        list: Candidates on the first `slots` layers of the cost/points frontier
+    """
+    scored = [p for p in candidates if p.get('cost') is not None and p.get('projected_points') is not None]
+    unscored = [p for p in candidates if p.get('cost') is None or p.get('projected_points') is None]
+    if slots <= 0:
+        return unscored
+
+    # Cheapest first (best points first on ties): every earlier candidate costs no more
+    scored.sort(key=lambda p: (p['cost'], -p['projected_points'], p['name']))
+    kept = []
+    best_points = []  # descending points of the `slots` best earlier candidates
+    for player in scored:
+        points = player['projected_points']
+        if len(best_points) < slots or best_points[-1] < points:
+            kept.append(player)
+        best_points.append(points)
+        best_points.sort(reverse=True)
+        del best_points[slots:]
+    return kept + unscored
+
+
+def prune_substitute_pool(current_squad_players, all_players, top_k=None):
+    """
+    Shrink the candidate pool before the MILP is built.
+
+    Per position, only candidates that beat the weakest squad player are kept,
+    then dominated candidates are removed. `top_k` optionally caps each
+    position to its best candidates by projected points; unlike dominance
+    pruning this cap can change the optimum.
+
+    Returns:
+        tuple: (pruned players, stats dict with candidate and variable counts)
+    """
+    position_mapping = {
+        'goalkeepers': 'Keeper',
+        'defenders': 'Defender',
+        'midfielders': 'Midfielder',
+        'forwards': 'Attacker'
+    }
+    by_position = {}
+    for player in all_players:
+        by_position.setdefault(player['position'], []).append(player)
+
+    def pair_count(candidates, squad_players):
+        return sum(
+            1
+            for current_player in squad_players
+            for candidate in candidates
+            if candidate.get('projected_points') is not None
+            and candidate['projected_points'] > current_player.get('projected_points', 0)
+        )
+
+    pruned = []
+    variables_before = 0
+    variables_after = 0
+    for position, player_position in position_mapping.items():
+        squad_players = [p for p in current_squad_players.get(position, []) if p.get('name')]
+        candidates = by_position.get(player_position, [])
+        if not squad_players:
+            continue
+        variables_before += pair_count(candidates, squad_players)
+        weakest = min(p.get('projected_points', 0) for p in squad_players)
+        candidates = [p for p in candidates if p.get('projected_points') is not None and p['projected_points'] > weakest]
+        candidates = prune_dominated_candidates(candidates, len(squad_players))
+        if top_k:
+            candidates = sorted(candidates, key=lambda p: p['projected_points'], reverse=True)[:top_k]
+        variables_after += pair_count(candidates, squad_players)
+        pruned.extend(candidates)
+
+    return pruned, {
+        'candidates_before': len(all_players),
+        'candidates_after': len(pruned),
+        'substitution_variables_before': variables_before,
+        'substitution_variables_after': variables_after,
+    }
+
+
 def build_substitution_options(current_squad_players, all_players):
     """
     Build substitution options for optimization.
@@ -342,36 +412,44 @@ def build_substitution_options(current_squad_players, all_players):
                     })
     return substitution_options, substitution_vars, current_player_vars
 
+def index_substitution_options(substitution_options):
+    """
+    Group substitution variables by current player, position and substitute in one pass.
+
+    Returns:
+        dict: {'by_current': {name: [var]}, 'by_position': {position: [var]}, 'by_substitute': {name: [var]}}
+    """
+    by_current = {}
+    by_position = {}
+    by_substitute = {}
+    for option in substitution_options:
+        var = option['var']
+        by_current.setdefault(option['current_player'].get('name', ''), []).append(var)
+        by_position.setdefault(option['position'], []).append(var)
+        by_substitute.setdefault(option['substitute']['name'], []).append(var)
+    return {'by_current': by_current, 'by_position': by_position, 'by_substitute': by_substitute}
+
+
 def add_constraints(prob, current_player_vars, substitution_vars, substitution_options,
                    current_squad_players, current_formation, budget_constraint, current_total_cost, max_recommendations):
+    index = index_substitution_options(substitution_options)
+    cost_by_name = {}
+    for position in current_squad_players:
+        for player in current_squad_players[position]:
+            cost_by_name.setdefault(player.get('name'), player.get('cost', 0))
+
     # 1. Each current player can only be kept OR substituted (not both)
-    for current_name in current_player_vars:
-        player_substitutions = [
-            substitution_vars[(curr, sub)]
-            for (curr, sub) in substitution_vars.keys()
-            if curr == current_name
-        ]
+    for current_name, keep_var in current_player_vars.items():
+        player_substitutions = index['by_current'].get(current_name, [])
         if player_substitutions:
-            prob += current_player_vars[current_name] + pulp.lpSum(player_substitutions) == 1
+            prob += pulp.LpAffineExpression([(keep_var, 1)] + [(var, 1) for var in player_substitutions]) == 1
         else:
-            prob += current_player_vars[current_name] == 1
+            prob += keep_var == 1
 
     # 2. Budget constraint
-    total_cost_expr = 0
-    for current_name in current_player_vars:
-        player_cost = 0
-        for position in current_squad_players:
-            for player in current_squad_players[position]:
-                if player.get('name') == current_name:
-                    player_cost = player.get('cost', 0)
-                    break
-            if player_cost > 0:
-                break
-        total_cost_expr += player_cost * current_player_vars[current_name]
-    for option in substitution_options:
-        substitute_cost = option['substitute']['cost']
-        total_cost_expr += substitute_cost * option['var']
-    prob += total_cost_expr <= budget_constraint
+    total_cost_expr = [(keep_var, cost_by_name.get(current_name) or 0) for current_name, keep_var in current_player_vars.items()]
+    total_cost_expr.extend((option['var'], option['substitute']['cost']) for option in substitution_options)
+    prob += pulp.LpAffineExpression(total_cost_expr) <= budget_constraint
 
     # 3. Formation constraints (maintain same formation)
     formation_requirements = {
@@ -382,33 +460,23 @@ def add_constraints(prob, current_player_vars, substitution_vars, substitution_o
     }
     for position in ['goalkeepers', 'defenders', 'midfielders', 'forwards']:
         required_count = formation_requirements[position]
-        kept_players_expr = pulp.lpSum([
-            current_player_vars[player.get('name', '')]
+        terms = [
+            (current_player_vars[player.get('name', '')], 1)
             for player in current_squad_players[position]
             if player.get('name', '') in current_player_vars
-        ])
-        substituted_players_expr = pulp.lpSum([
-            option['var']
-            for option in substitution_options
-            if option['position'] == position
-        ])
-        prob += kept_players_expr + substituted_players_expr == required_count
+        ]
+        terms.extend((var, 1) for var in index['by_position'].get(position, []))
+        prob += pulp.LpAffineExpression(terms) == required_count
 
     # 4. Limit number of substitutions to 3-4
-    total_substitutions = pulp.lpSum([option['var'] for option in substitution_options])
+    total_substitutions = pulp.LpAffineExpression([(option['var'], 1) for option in substitution_options])
     prob += total_substitutions >= 3
     prob += total_substitutions <= max_recommendations
 
     # 5. No duplicate substitute players constraint
-    substitute_player_usage = {}
-    for option in substitution_options:
-        substitute_name = option['substitute']['name']
-        if substitute_name not in substitute_player_usage:
-            substitute_player_usage[substitute_name] = []
-        substitute_player_usage[substitute_name].append(option['var'])
-    for substitute_name, variables in substitute_player_usage.items():
+    for substitute_name, variables in index['by_substitute'].items():
         if len(variables) > 1:
-            prob += pulp.lpSum(variables) <= 1
+            prob += pulp.LpAffineExpression([(var, 1) for var in variables]) <= 1
 
 def extract_optimization_results(prob, substitution_options, current_total_cost, budget_constraint, current_total_points):
     recommended_substitutes = []
@@ -435,17 +503,63 @@ def extract_optimization_results(prob, substitution_options, current_total_cost,
         'available_budget': available_budget
     }
 
-def recommend_substitutes(user, max_recommendations=4, budget_constraint=82.5, squad_data=None, gameweek=None):
+def greedy_substitutions(substitution_options, current_total_cost, budget_constraint, max_recommendations):
+    """
+    Greedy fallback when no feasible package is found within the solve budget.
+    Takes the largest single improvements that keep the squad under budget,
+    using each current player and each substitute at most once.
+    """
+    recommended_substitutes = []
+    total_improvement = 0
+    total_cost_change = 0
+    replaced = set()
+    used_substitutes = set()
+    for option in sorted(substitution_options, key=lambda o: o['improvement'], reverse=True):
+        if len(recommended_substitutes) >= max_recommendations:
+            break
+        current_name = option['current_player']['name']
+        substitute_name = option['substitute']['name']
+        if current_name in replaced or substitute_name in used_substitutes:
+            continue
+        if current_total_cost + total_cost_change + option['cost_difference'] > budget_constraint:
+            continue
+        replaced.add(current_name)
+        used_substitutes.add(substitute_name)
+        recommended_substitutes.append({
+            'current_player': option['current_player'],
+            'substitute': option['substitute'],
+            'improvement': round(option['improvement'], 1),
+            'cost_difference': round(option['cost_difference'], 1),
+            'position': option['position'],
+            'swap_description': f"Replace {current_name} with {substitute_name}"
+        })
+        total_improvement += option['improvement']
+        total_cost_change += option['cost_difference']
+    return {
+        'recommended_substitutes': recommended_substitutes,
+        'total_improvement': total_improvement,
+        'total_cost_change': total_cost_change,
+        'available_budget': budget_constraint - current_total_cost - total_cost_change
+    }
+
+def recommend_substitutes(user, max_recommendations=4, budget_constraint=82.5, squad_data=None, gameweek=None, time_limit_ms=None,
+                          prune=True, top_k=None, player_pool=None):
     """
     Orchestrates optimized package substitute recommendations using helper functions.
     Args:
         user: Django user instance
         max_recommendations: int
         budget_constraint: float
+        time_limit_ms: Solve budget in milliseconds (defaults to SQUAD_SOLVER_TIME_LIMIT_MS);
+            the best package found in time is returned, or a greedy one if none is feasible
+        prune: Remove dominated candidates before building the model (optimum unchanged)
+        top_k: Optional cap on candidates per position after pruning
+        player_pool: Preloaded PlayerPool for the gameweek (loaded on demand when omitted)
     """
     try:
         current_squad = squad_data
-        all_players = get_all_players_with_projected_points(user, squad_data, gameweek, exclude_current_squad=True)
+        all_players = get_all_players_with_projected_points(user, squad_data, gameweek, exclude_current_squad=True,
+                                                            player_pool=player_pool)
         current_formation = detect_formation_from_squad(current_squad)
         current_total_points = calculate_squad_total_projected_points(current_squad)
         current_total_cost = 0
@@ -455,17 +569,33 @@ def recommend_substitutes(user, max_recommendations=4, budget_constraint=82.5, s
                 if isinstance(player, dict) and 'cost' in player:
                     current_total_cost += player['cost']
                     current_squad_players[position].append(player)
+        model_stats = {}
+        if prune:
+            all_players, model_stats = prune_substitute_pool(current_squad_players, all_players, top_k)
         # Build optimization problem
+        build_start = time.perf_counter()
         prob = pulp.LpProblem("Squad_Optimization", pulp.LpMaximize)
         substitution_options, substitution_vars, current_player_vars = build_substitution_options(current_squad_players, all_players)
-        prob += pulp.lpSum([option['improvement'] * option['var'] for option in substitution_options])
+        prob += pulp.LpAffineExpression([(option['var'], option['improvement']) for option in substitution_options])
         add_constraints(prob, current_player_vars, substitution_vars, substitution_options,
                        current_squad_players, current_formation, budget_constraint, current_total_cost, max_recommendations)
-        prob.solve(pulp.PULP_CBC_CMD(msg=0))
-        results = extract_optimization_results(prob, substitution_options, current_total_cost, budget_constraint, current_total_points)
+        build_time = time.perf_counter() - build_start
+        solve_stats = solve_with_time_limit(prob, time_limit_ms)
+        if solve_stats['status'] in ('optimal', 'feasible'):
+            results = extract_optimization_results(prob, substitution_options, current_total_cost, budget_constraint, current_total_points)
+        else:
+            results = greedy_substitutions(substitution_options, current_total_cost, budget_constraint, max_recommendations)
+            solve_stats['status'] = 'greedy'
+        model_stats['variables'] = len(prob.variables())
+        model_stats['constraints'] = len(prob.constraints)
+        model_stats['build_time'] = round(build_time, 4)
+        model_stats['solve_time'] = solve_stats['solve_time']
         return {
             'success': True,
-            'optimization_status': 'optimal' if prob.status == pulp.LpStatusOptimal else 'suboptimal',
+            'optimization_status': solve_stats['status'],
+            'optimality_gap': solve_stats['optimality_gap'],
+            'solve_time': solve_stats['solve_time'],
+            'model_stats': model_stats,
             'current_squad': current_squad,
             'current_formation': current_formation,
             'current_total_points': current_total_points,
@@ -493,25 +623,66 @@ def recommend_substitutes(user, max_recommendations=4, budget_constraint=82.5, s
             'package_optimization': True
         }
 
-def recommend_individual_substitutes(user, budget_constraint=82.5, squad_data=None, gameweek=None):
+class CandidateIndex:
+    """
+    Candidates of one position held in two sorted arrays so that per-player
+    searches are bisect queries instead of full scans.
+
+    - by cost, with a running best-points index: best candidate under a cost cap
+    - by projected points: candidates within a points range
+    """
+
+    def __init__(self, players):
+        players = [p for p in players if p.get('cost') is not None and p.get('projected_points') is not None]
+        by_cost = sorted(players, key=lambda p: (p['cost'], -p['projected_points']))
+        self.costs = [p['cost'] for p in by_cost]
+        self.by_cost = by_cost
+        # best_upto[i] is the highest-scoring of the i + 1 cheapest candidates (cheapest wins ties)
+        self.best_upto = []
+        best = None
+        for player in by_cost:
+            if best is None or player['projected_points'] > best['projected_points']:
+                best = player
+            self.best_upto.append(best)
+
+        self.by_points = sorted(players, key=lambda p: p['projected_points'])
+        self.points = [p['projected_points'] for p in self.by_points]
+
+    def best_under_cost(self, max_cost):
+        """Highest projected points among candidates costing at most max_cost, or None."""
+        end = bisect.bisect_right(self.costs, max_cost + 1e-9)
+        return self.best_upto[end - 1] if end else None
+
+    def points_between(self, low, high):
+        """Candidates with low <= projected_points <= high, best first (bounds widened by 1e-9)."""
+        start = bisect.bisect_left(self.points, low - 1e-9)
+        end = bisect.bisect_right(self.points, high + 1e-9)
+        return self.by_points[start:end][::-1]
+
+
+def recommend_individual_substitutes(user, budget_constraint=82.5, squad_data=None, gameweek=None, player_pool=None):
     """
     Recommend the best individual substitute for each player in the current squad using projected points.
     Args:
         user: Django user instance
         budget_constraint (float): Maximum budget for the squad (default 82.5)
+        player_pool (PlayerPool, optional): Preloaded pool for the gameweek
     Returns:
         dict: List of recommended individual substitutions
     """
     try:
         current_squad = squad_data
-        all_players = get_all_players_with_projected_points(user, squad_data, gameweek, exclude_current_squad=True)
-        print(all_players[:5])  # Debug: print first 5 players
+        all_players = get_all_players_with_projected_points(user, squad_data, gameweek, exclude_current_squad=True,
+                                                            player_pool=player_pool)
         position_mapping = {
             'goalkeepers': 'Keeper',
             'defenders': 'Defender',
             'midfielders': 'Midfielder',
             'forwards': 'Attacker'
         }
+        players_by_position = {}
+        for player in all_players:
+            players_by_position.setdefault(player['position'], []).append(player)
         recommendations = []
         cheaper_similar_all = []
         total_cost_change = 0
@@ -523,30 +694,23 @@ def recommend_individual_substitutes(user, budget_constraint=82.5, squad_data=No
         )
         for position in ['goalkeepers', 'defenders', 'midfielders', 'forwards']:
             current_players = current_squad.get(position, [])
-            available_subs = [p for p in all_players if p['position'] == position_mapping[position]]
+            available_subs = CandidateIndex(players_by_position.get(position_mapping[position], []))
             for current_player in current_players:
-                best_sub = None
-                best_improvement = 0
-                for sub in available_subs:
-                    improvement = sub['projected_points'] - current_player.get('projected_points', 0)
-                    cost_diff = sub['cost'] - current_player.get('cost', 0)
-                    # Only consider if improvement > 0 and swapping keeps squad under budget
-                    if improvement > 0:
-                        projected_total_cost = current_total_cost + cost_diff
-                        if projected_total_cost <= budget_constraint:
-                            if improvement > best_improvement:
-                                best_sub = sub
-                                best_improvement = improvement
-                if best_sub:
+                current_points = current_player.get('projected_points', 0)
+                current_cost = current_player.get('cost', 0)
+                # Best improvement among substitutes that keep the squad under budget
+                best_sub = available_subs.best_under_cost(budget_constraint - current_total_cost + current_cost)
+                if best_sub and best_sub['projected_points'] > current_points:
+                    best_improvement = best_sub['projected_points'] - current_points
                     recommendations.append({
                         'current_player': current_player,
                         'substitute': best_sub,
                         'position': position,
                         'improvement': round(best_improvement, 2),
-                        'cost_difference': round(best_sub['cost'] - current_player.get('cost', 0), 2)
+                        'cost_difference': round(best_sub['cost'] - current_cost, 2)
                     })
-                    total_cost_change += best_sub['cost'] - current_player.get('cost', 0)
-                    current_total_cost += best_sub['cost'] - current_player.get('cost', 0)
+                    total_cost_change += best_sub['cost'] - current_cost
+                    current_total_cost += best_sub['cost'] - current_cost
                 # Find cheaper similar players (max 1 point less, at least 1 mil cheaper)
                 cheaper_similar = find_cheaper_similar_players(current_player, available_subs, point_threshold=1.0, min_cost_diff=1.0)
                 if cheaper_similar:
@@ -571,16 +735,18 @@ def find_cheaper_similar_players(current_player, available_players, point_thresh
     Find cheaper players with similar projected points for a given player.
     Args:
         current_player (dict): The current player dict
-        available_players (list): List of available player dicts (same position)
+        available_players (list or CandidateIndex): Available players (same position)
         point_threshold (float): Max points less than current (default 1.0)
         min_cost_diff (float): Minimum cost difference (default 1.0)
     Returns:
         list: List of cheaper similar players
     """
+    if not isinstance(available_players, CandidateIndex):
+        available_players = CandidateIndex(available_players)
     current_points = current_player.get('projected_points', 0)
     current_cost = current_player.get('cost', 0)
     similar_cheaper = []
-    for p in available_players:
+    for p in available_players.points_between(current_points - point_threshold, current_points):
         point_diff = current_points - p.get('projected_points', 0)
         cost_diff = current_cost - p.get('cost', 0)
         if 0 < point_diff <= point_threshold and cost_diff >= min_cost_diff:
@@ -591,4 +757,4 @@ def find_cheaper_similar_players(current_player, available_players, point_thresh
                 'point_difference': round(point_diff, 2),
                 'cost_saving': round(cost_diff, 2)
             })
-    return similar_cheaper
\ No newline at end of file
+    return similar_cheaper
@@ -10,270 +10,293 @@ Key features:
 - Safe deduplication to prevent duplicate entries
 - Comprehensive season data import
 - Clean opponent names (team abbreviations)
+- Fetches each player's history once per run for all requested gameweeks
 """
 
 import asyncio
-import aiohttp
 from datetime import datetime, date
 from typing import Dict, List, Any, Optional
 from asgiref.sync import sync_to_async
 
+from MyApi.utils.gameweek_importer import write_match_batch
+from MyApi.utils.player_history_fetcher import consume_in_batches, fetch_player_summaries
 
-async def import_season_gameweeks(season_year: str = "2025-26", start_gw: int = 1, end_gw: Optional[int] = None) -> Dict[str, Any]:
+
+def build_season_match_data(player, gw_entry, gw_info, season_year: str, team_map) -> Dict[str, Any]:
+    """
+    Convert a player's FPL history entry into PlayerMatch field values
+
+    Args:
+        player: FPL player object
+        gw_entry (dict): Entry from the player's summary history
+        gw_info: FPL gameweek object (deadline used when kickoff time is missing)
+        season_year (str): Season identifier
+        team_map (dict): FPL team id -> short name
+
+    Returns:
+        Dict[str, Any]: PlayerMatch field values
+    """
+    player_name = f"{player.first_name} {player.second_name}".strip()
+    gw_num = gw_info.id
+
+    # Extract match data - improved date handling
+    match_date = None
+
+    # Try to get date from gw_entry first (more accurate)
+    if gw_entry.get('kickoff_time'):
+        try:
+            match_date = datetime.fromisoformat(
+                str(gw_entry['kickoff_time']).replace("Z", "")
+            ).date()
+        except:
+            pass
+
+    # Fallback to gameweek deadline
+    if not match_date and gw_info.deadline_time:
+        try:
+            if hasattr(gw_info.deadline_time, 'date'):
+                match_date = gw_info.deadline_time.date()
+            else:
+                parsed_date = datetime.fromisoformat(str(gw_info.deadline_time).replace('Z', ''))
+                match_date = parsed_date.date()
+        except:
+            pass
+
+    # Final fallback
+    if not match_date:
+        match_date = date.today()
+
+    # Get opponent team
+    opponent_team_id = gw_entry.get('opponent_team')
+    opponent = team_map.get(opponent_team_id, f"Team_{opponent_team_id}") if opponent_team_id else "Unknown"
+
+    # Calculate result
+    was_home = gw_entry.get('was_home', False)
+    team_h_score = gw_entry.get('team_h_score', 0)
+    team_a_score = gw_entry.get('team_a_score', 0)
+
+    if was_home:
+        result = f"{'W' if team_h_score > team_a_score else 'L' if team_h_score < team_a_score else 'D'} {team_h_score}-{team_a_score}"
+    else:
+        result = f"{'W' if team_a_score > team_h_score else 'L' if team_a_score < team_h_score else 'D'} {team_a_score}-{team_h_score}"
+
+    # Calculate fantasy points (FPL scoring)
+    minutes = gw_entry.get('minutes', 0)
+    goals = gw_entry.get('goals_scored', 0)
+    assists = gw_entry.get('assists', 0)
+    clean_sheets = gw_entry.get('clean_sheets', 0)
+    goals_conceded = gw_entry.get('goals_conceded', 0)
+    saves = gw_entry.get('saves', 0)
+    yellow_cards = gw_entry.get('yellow_cards', 0)
+    red_cards = gw_entry.get('red_cards', 0)
+    bonus = gw_entry.get('bonus', 0)
+
+    # Basic FPL points calculation
+    points = 0
+    if minutes > 0:
+        points += 1  # Playing
+    if minutes >= 60:
+        points += 1  # 60+ minutes
+
+    points += goals * 4  # Goals (simplified - varies by position)
+    points += assists * 3  # Assists
+    points += clean_sheets * 4  # Clean sheets (simplified)
+    points += saves // 3  # Every 3 saves = 1 point
+    points -= yellow_cards  # Yellow card
+    points -= red_cards * 3  # Red card
+    points += bonus  # Bonus points
+
+    return {
+        'player_name': player_name,
+        'fpl_id': player.id,
+        'date': match_date,
+        'round_info': f"Gameweek {gw_num}",
+        'opponent': opponent,
+        'result': result,
+        'minutes_played': minutes,
+        'goals': goals,
+        'assists': assists,
+        'points': points,
+        'saves': saves,
+        'goals_conceded': goals_conceded,
+        'clean_sheet': clean_sheets > 0,
+        'season': season_year,
+        'competition': 'Premier League',
+        'position': player.element_type,  # Position type from FPL
+        'elo_before_match': 1200.0,  # Will be calculated later
+        'elo_after_match': 1200.0,   # Will be calculated later
+    }
+
+
+async def import_season_gameweeks(season_year: str = "2025-26", start_gw: int = 1, end_gw: Optional[int] = None,
+                                  gameweek_list: Optional[List[int]] = None,
+                                  concurrency: Optional[int] = None) -> Dict[str, Any]:
     """
     Import all gameweek data for the specified season
-    
+
+    Each player's history is fetched once per run and split across all
+    requested gameweeks in memory, so the number of requests depends only on
+    the number of players.
+
     Args:
         season_year: Season identifier (e.g., "2025-26")
         start_gw: Starting gameweek (default: 1)
         end_gw: Ending gameweek (default: current gameweek or 38)
-    
+        gameweek_list: Specific gameweeks to import instead of the start_gw..end_gw range
+        concurrency: Concurrent requests, defaults to settings.FPL_FETCH_CONCURRENCY
+
     Returns:
         Dict[str, Any]: Import summary with detailed statistics
     """
     try:
-        from fpl import FPL
-        from MyApi.models import PlayerMatch, SystemSettings, Player
-        
+        from MyApi.utils.fpl_client import fpl_client
+
         print(f"🚀 Starting Season {season_year} Gameweek Data Import")
-        print(f"📅 Importing gameweeks {start_gw} to {end_gw or 'current'}")
+        if gameweek_list:
+            print(f"📅 Importing gameweeks {sorted(gameweek_list)}")
+        else:
+            print(f"📅 Importing gameweeks {start_gw} to {end_gw or 'current'}")
         start_time = datetime.now()
-        
-        async with aiohttp.ClientSession() as session:
-            fpl = FPL(session)
-            
+
+        async with fpl_client() as client:
+            fpl = await client.fpl()
+
             # Get all gameweeks
             gameweeks = await fpl.get_gameweeks()
-            
-            # Determine end gameweek if not specified
-            if end_gw is None:
-                # Find current or latest finished gameweek
-                current_gw = next((gw for gw in gameweeks if gw.is_current), None)
-                if current_gw:
-                    end_gw = current_gw.id
+
+            if gameweek_list:
+                requested = sorted(set(gameweek_list))
+            else:
+                # Determine end gameweek if not specified
+                if end_gw is None:
+                    # Find current or latest finished gameweek
+                    current_gw = next((gw for gw in gameweeks if gw.is_current), None)
+                    if current_gw:
+                        end_gw = current_gw.id
+                    else:
+                        # Find latest finished gameweek
+                        finished_gws = [gw for gw in gameweeks if gw.finished]
+                        end_gw = max(finished_gws, key=lambda x: x.id).id if finished_gws else 1
+                requested = list(range(start_gw, end_gw + 1))
+
+            print(f"📊 Target gameweeks: {requested}")
+
+            # Keep gameweeks that exist and have started
+            gw_infos = {}
+            for gw_num in requested:
+                gw_info = next((gw for gw in gameweeks if gw.id == gw_num), None)
+                if not gw_info:
+                    print(f"⚠️  Gameweek {gw_num} not found, skipping...")
+                elif not gw_info.finished and not gw_info.is_current:
+                    print(f"⏭️  Gameweek {gw_num} not started yet, skipping...")
                 else:
-                    # Find latest finished gameweek
-                    finished_gws = [gw for gw in gameweeks if gw.finished]
-                    end_gw = max(finished_gws, key=lambda x: x.id).id if finished_gws else 1
-            
-            print(f"📊 Target range: Gameweeks {start_gw} to {end_gw}")
-            
+                    gw_infos[gw_num] = gw_info
+
             # Get teams for opponent mapping
             teams = await fpl.get_teams()
             team_map = {team.id: team.short_name for team in teams}
-            
+
             print(f"🏟️  Found {len(team_map)} teams:")
             for team_id, team_name in sorted(team_map.items()):
                 print(f"   {team_id:2d}: {team_name}")
-            
+
             # Get all players
             players = await fpl.get_players()
-            print(f"👥 Processing {len(players)} players...")
-            
+            print(f"👥 Processing {len(players)} players for {len(gw_infos)} gameweeks...")
+
             # Statistics tracking
-            total_new_matches = 0
-            total_updated_matches = 0
-            total_skipped_matches = 0
-            total_errors = 0
-            gameweek_stats = {}
-            
-            # Process each gameweek
-            for gw_num in range(start_gw, end_gw + 1):
-                print(f"\\n🔄 Processing Gameweek {gw_num}...")
-                
-                gw_new = 0
-                gw_updated = 0
-                gw_skipped = 0
-                gw_errors = 0
-                
-                # Get gameweek info
-                gw_info = next((gw for gw in gameweeks if gw.id == gw_num), None)
-                if not gw_info:
-                    print(f"⚠️  Gameweek {gw_num} not found, skipping...")
-                    continue
-                
-                # Skip if gameweek hasn't started yet
-                if not gw_info.finished and not gw_info.is_current:
-                    print(f"⏭️  Gameweek {gw_num} not started yet, skipping...")
-                    continue
-                
-                # Process each player for this gameweek
-                for i, player in enumerate(players):
+            gameweek_stats = {
+                gw_num: {'new_matches': 0, 'updated_matches': 0, 'skipped_matches': 0, 'errors': 0}
+                for gw_num in gw_infos
+            }
+            fetch_errors = 0
+
+            def handle_summary(player, summary, error):
+                nonlocal fetch_errors
+                player_name = f"{player.first_name} {player.second_name}".strip()
+                if error is not None:
+                    fetch_errors += 1
+                    if fetch_errors <= 3:
+                        print(f"   ❌ Error fetching {player_name}: {error}")
+                    return []
+
+                # First history entry of each requested gameweek
+                entries = {}
+                for h in summary.get('history', []):
+                    gw_num = h.get('event') or h.get('round')
+                    if gw_num in gw_infos and gw_num not in entries:
+                        entries[gw_num] = h
+
+                rows = []
+                for gw_num, gw_entry in entries.items():
                     try:
-                        player_name = f"{player.first_name} {player.second_name}".strip()
-                        
-                        # Get player's gameweek history
-                        history = await fpl.get_player_summary(player.id)
-                        
-                        # Find specific gameweek entry
-                        gw_entry = None
-                        for h in history.history:
-                            if h.get('event') == gw_num or h.get('round') == gw_num:
-                                gw_entry = h
-                                break
-                        
-                        if not gw_entry:
-                            continue  # No data for this gameweek
-                        
-                        # Extract match data - improved date handling
-                        match_date = None
-                        
-                        # Try to get date from gw_entry first (more accurate)
-                        if gw_entry.get('kickoff_time'):
-                            try:
-                                match_date = datetime.fromisoformat(
-                                    str(gw_entry['kickoff_time']).replace("Z", "")
-                                ).date()
-                            except:
-                                pass
-                        
-                        # Fallback to gameweek deadline
-                        if not match_date and gw_info.deadline_time:
-                            try:
-                                if hasattr(gw_info.deadline_time, 'date'):
-                                    match_date = gw_info.deadline_time.date()
-                                else:
-                                    parsed_date = datetime.fromisoformat(str(gw_info.deadline_time).replace('Z', ''))
-                                    match_date = parsed_date.date()
-                            except:
-                                pass
-                        
-                        # Final fallback
-                        if not match_date:
-                            match_date = date.today()
-                        
-                        # Get opponent team
-                        opponent_team_id = gw_entry.get('opponent_team')
-                        opponent = team_map.get(opponent_team_id, f"Team_{opponent_team_id}") if opponent_team_id else "Unknown"
-                        
-                        # Calculate result
-                        was_home = gw_entry.get('was_home', False)
-                        team_h_score = gw_entry.get('team_h_score', 0)
-                        team_a_score = gw_entry.get('team_a_score', 0)
-                        
-                        if was_home:
-                            result = f"{'W' if team_h_score > team_a_score else 'L' if team_h_score < team_a_score else 'D'} {team_h_score}-{team_a_score}"
-                        else:
-                            result = f"{'W' if team_a_score > team_h_score else 'L' if team_a_score < team_h_score else 'D'} {team_a_score}-{team_h_score}"
-                        
-                        # Calculate fantasy points (FPL scoring)
-                        minutes = gw_entry.get('minutes', 0)
-                        goals = gw_entry.get('goals_scored', 0)
-                        assists = gw_entry.get('assists', 0)
-                        clean_sheets = gw_entry.get('clean_sheets', 0)
-                        goals_conceded = gw_entry.get('goals_conceded', 0)
-                        saves = gw_entry.get('saves', 0)
-                        yellow_cards = gw_entry.get('yellow_cards', 0)
-                        red_cards = gw_entry.get('red_cards', 0)
-                        bonus = gw_entry.get('bonus', 0)
-                        
-                        # Basic FPL points calculation
-                        points = 0
-                        if minutes > 0:
-                            points += 1  # Playing
-                        if minutes >= 60:
-                            points += 1  # 60+ minutes
-                        
-                        points += goals * 4  # Goals (simplified - varies by position)
-                        points += assists * 3  # Assists
-                        points += clean_sheets * 4  # Clean sheets (simplified)
-                        points += saves // 3  # Every 3 saves = 1 point
-                        points -= yellow_cards  # Yellow card
-                        points -= red_cards * 3  # Red card
-                        points += bonus  # Bonus points
-                        
-                        # Check if match already exists (improved deduplication)
-                        existing_match = await sync_to_async(
-                            PlayerMatch.objects.filter(
-                                player_name=player_name,
-                                date=match_date,
-                                round_info__in=[f"Gameweek {gw_num}", f"Matchweek {gw_num}", str(gw_num)]
-                            ).first
-                        )()
-                        
-                        match_data = {
-                            'player_name': player_name,
-                            'date': match_date,
-                            'round_info': f"Gameweek {gw_num}",
-                            'opponent': opponent,
-                            'result': result,
-                            'minutes_played': minutes,
-                            'goals': goals,
-                            'assists': assists,
-                            'points': points,
-                            'saves': saves,
-                            'goals_conceded': goals_conceded,
-                            'clean_sheet': clean_sheets > 0,
-                            'season': season_year,
-                            'competition': 'Premier League',
-                            'position': player.element_type,  # Position type from FPL
-                            'elo_before_match': 1200.0,  # Will be calculated later
-                            'elo_after_match': 1200.0,   # Will be calculated later
-                        }
-                        
-                        if existing_match:
-                            # Update existing match if data has changed
-                            updated = False
-                            for field, value in match_data.items():
-                                if hasattr(existing_match, field) and getattr(existing_match, field) != value:
-                                    setattr(existing_match, field, value)
-                                    updated = True
-                            
-                            if updated:
-                                await sync_to_async(existing_match.save)()
-                                gw_updated += 1
-                            else:
-                                gw_skipped += 1
-                        else:
-                            # Create new match record
-                            await sync_to_async(PlayerMatch.objects.create)(**match_data)
-                            gw_new += 1
-                            
+                        rows.append((gw_num, build_season_match_data(
+                            player, gw_entry, gw_infos[gw_num], season_year, team_map
+                        )))
                     except Exception as e:
-                        gw_errors += 1
-                        if gw_errors <= 3:  # Show first 3 errors per gameweek
+                        gameweek_stats[gw_num]['errors'] += 1
+                        if gameweek_stats[gw_num]['errors'] <= 3:  # Show first 3 errors per gameweek
                             print(f"   ❌ Error processing {player_name}: {e}")
-                
-                # Store gameweek statistics
-                gameweek_stats[gw_num] = {
-                    'new_matches': gw_new,
-                    'updated_matches': gw_updated,
-                    'skipped_matches': gw_skipped,
-                    'errors': gw_errors
-                }
-                
-                total_new_matches += gw_new
-                total_updated_matches += gw_updated
-                total_skipped_matches += gw_skipped
-                total_errors += gw_errors
-                
-                print(f"   ✅ GW{gw_num}: {gw_new} new, {gw_updated} updated, {gw_skipped} skipped, {gw_errors} errors")
-        
+                return rows
+
+            async def write_batch(rows):
+                try:
+                    counts = await sync_to_async(write_match_batch)(rows)
+                except Exception as e:
+                    print(f"   ❌ Error writing {len(rows)} matches: {e}")
+                    for gw_num, _ in rows:
+                        gameweek_stats[gw_num]['errors'] += 1
+                    return
+                for gw_num, gw_counts in counts.items():
+                    gameweek_stats[gw_num]['new_matches'] += gw_counts['new']
+                    gameweek_stats[gw_num]['updated_matches'] += gw_counts['updated']
+                    gameweek_stats[gw_num]['skipped_matches'] += gw_counts['skipped']
+                    gameweek_stats[gw_num]['errors'] += gw_counts['errors']
+
+            fetch_stats = {'requests': 0}
+            if gw_infos:
+                queue = asyncio.Queue()
+                fetch_stats, _ = await asyncio.gather(
+                    fetch_player_summaries(fpl, players, queue, concurrency=concurrency),
+                    consume_in_batches(queue, handle_summary, write_batch),
+                )
+
+            for gw_num, stats in gameweek_stats.items():
+                print(f"   ✅ GW{gw_num}: {stats['new_matches']} new, {stats['updated_matches']} updated, "
+                      f"{stats['skipped_matches']} skipped, {stats['errors']} errors")
+
+        total_new_matches = sum(stats['new_matches'] for stats in gameweek_stats.values())
+        total_updated_matches = sum(stats['updated_matches'] for stats in gameweek_stats.values())
+        total_skipped_matches = sum(stats['skipped_matches'] for stats in gameweek_stats.values())
+        total_errors = sum(stats['errors'] for stats in gameweek_stats.values()) + fetch_errors
+
         # Calculate duration
         duration = (datetime.now() - start_time).total_seconds()
-        
+
         print(f"\\n🎉 Season Import Complete!")
         print(f"   📊 Total: {total_new_matches} new, {total_updated_matches} updated, {total_skipped_matches} skipped")
         print(f"   ⚠️  Errors: {total_errors}")
+        print(f"   🌐 Requests: {fetch_stats['requests']}")
         print(f"   ⏱️  Duration: {duration:.2f} seconds")
-        
+
         return {
             'success': True,
             'season': season_year,
-            'gameweeks_processed': list(range(start_gw, end_gw + 1)),
+            'gameweeks_processed': requested,
             'total_new_matches': total_new_matches,
             'total_updated_matches': total_updated_matches,
             'total_skipped_matches': total_skipped_matches,
             'total_errors': total_errors,
             'duration': duration,
-            'gameweek_stats': gameweek_stats
+            'gameweek_stats': gameweek_stats,
+            'fetch_stats': fetch_stats,
         }
-        
+
     except Exception as e:
         print(f"❌ Season import failed: {e}")
         import traceback
         traceback.print_exc()
-        
+
         return {
             'success': False,
             'error': str(e),
@@ -303,25 +326,6 @@ async def import_specific_gameweeks(gameweek_list: List[int], season_year: str =
         Dict[str, Any]: Import summary
     """
     print(f"🎯 Importing specific gameweeks: {gameweek_list}")
-    
-    results = []
-    for gw in gameweek_list:
-        result = await import_season_gameweeks(season_year, start_gw=gw, end_gw=gw)
-        results.append(result)
-    
-    # Combine results
-    total_new = sum(r.get('total_new_matches', 0) for r in results if r.get('success'))
-    total_updated = sum(r.get('total_updated_matches', 0) for r in results if r.get('success'))
-    total_skipped = sum(r.get('total_skipped_matches', 0) for r in results if r.get('success'))
-    total_errors = sum(r.get('total_errors', 0) for r in results if r.get('success'))
-    
-    return {
-        'success': all(r.get('success', False) for r in results),
-        'season': season_year,
-        'gameweeks_processed': gameweek_list,
-        'total_new_matches': total_new,
-        'total_updated_matches': total_updated,
-        'total_skipped_matches': total_skipped,
-        'total_errors': total_errors,
-        'individual_results': results
-    }
\ No newline at end of file
+
+    # One run fetches each player's history once for all requested gameweeks
+    return await import_season_gameweeks(season_year, gameweek_list=gameweek_list)
@@ -0,0 +1,54 @@
+"""
+Ownership queries over the normalized SquadMembership table.
+Each query is a single indexed aggregate instead of parsing every squad's JSON.
+"""
+
+from django.db.models import Count
+
+from MyApi.models import SquadMembership, UserSquad
+
+
+def player_ownership(week, limit=50):
+    """
+    Most-owned players for a week with their ownership percentage.
+
+    Returns:
+        dict: {'squads': int, 'players': list of {player_name, owners, ownership_pct}}
+    """
+    total = UserSquad.objects.filter(week=week).count()
+    rows = (
+        SquadMembership.objects.filter(week=week)
+        .values('player_name')
+        .annotate(owners=Count('user_squad_id'))
+        .order_by('-owners', 'player_name')[:limit]
+    )
+    return {
+        'squads': total,
+        'players': [
+            {
+                'player_name': row['player_name'],
+                'owners': row['owners'],
+                'ownership_pct': round(100.0 * row['owners'] / total, 1) if total else 0.0,
+            }
+            for row in rows
+        ],
+    }
+
+
+def users_affected(week, player_names):
+    """
+    Users whose squad for a week contains any of the given players (e.g. injured players).
+
+    Returns:
+        list: [{'user_id', 'username', 'affected_players'}] most affected first
+    """
+    rows = (
+        SquadMembership.objects.filter(week=week, player_name__in=player_names)
+        .values('user_id', 'user__username')
+        .annotate(affected_players=Count('id'))
+        .order_by('-affected_players', 'user_id')
+    )
+    return [
+        {'user_id': row['user_id'], 'username': row['user__username'], 'affected_players': row['affected_players']}
+        for row in rows
+    ]
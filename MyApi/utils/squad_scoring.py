@@ -0,0 +1,129 @@
+"""
+Vectorized scoring of every user's squad for a gameweek.
+
+All squads of a week are turned into a sparse users x players ownership
+matrix (COO row/column index arrays) read from SquadMembership. Multiplying
+it by a per-player points vector gives every user's total in a single NumPy
+operation, for both the projected points and the actual points scored.
+"""
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.db.models import Sum
+
+from MyApi.models import PlayerFixture, PlayerMatch, SquadMembership, SystemSettings
+
+
+def build_ownership_matrix(week):
+    """
+    Build the sparse ownership matrix for all squads saved for a week
+    from the SquadMembership table.
+
+    Returns:
+        tuple: (user_ids, player_names, rows, cols) where (rows[k], cols[k]) marks
+               user_ids[rows[k]] owning player_names[cols[k]]
+    """
+    user_index = {}
+    player_index = {}
+    rows = []
+    cols = []
+    for user_id, player_name in SquadMembership.objects.filter(week=week).values_list('user_id', 'player_name'):
+        rows.append(user_index.setdefault(user_id, len(user_index)))
+        cols.append(player_index.setdefault(player_name, len(player_index)))
+    user_ids = sorted(user_index, key=user_index.get)
+    player_names = sorted(player_index, key=player_index.get)
+    return user_ids, player_names, np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+
+
+def season_key(season=None):
+    """Convert the settings season ('2025/26') to the PlayerMatch format ('2025-2026')."""
+    season = season or SystemSettings.get_current_season()
+    if "/" in season and len(season.split("/")[1]) == 2:
+        start, end = season.split("/")
+        season = f"{start}-{start[:2]}{end}"
+    return season.replace('/', '-')
+
+
+def projected_points_vector(player_names, gameweek):
+    """Projected points for a gameweek aligned with player_names (double gameweeks summed)."""
+    totals = dict(
+        PlayerFixture.objects.filter(gameweek=gameweek, player_name__in=player_names)
+        .values_list('player_name').annotate(points=Sum('projected_points'))
+    )
+    return np.array([totals.get(name) or 0.0 for name in player_names], dtype=np.float64)
+
+
+def actual_points_vector(player_names, gameweek, season=None):
+    """Fantasy points scored in a gameweek aligned with player_names."""
+    totals = dict(
+        PlayerMatch.objects.filter(
+            player_name__in=player_names,
+            season=season_key(season),
+            round_info__in=[f"Gameweek {gameweek}", f"Matchweek {gameweek}", str(gameweek)],
+        ).values_list('player_name').annotate(points=Sum('points'))
+    )
+    return np.array([totals.get(name) or 0.0 for name in player_names], dtype=np.float64)
+
+
+def sparse_matvec(rows, cols, vector, n_rows):
+    """Multiply a 0/1 COO matrix by a vector."""
+    if not len(rows):
+        return np.zeros(n_rows, dtype=np.float64)
+    return np.bincount(rows, weights=vector[cols], minlength=n_rows)
+
+
+def score_all_squads(week, gameweek=None, season=None):
+    """
+    Projected and actual totals for every squad saved for a week.
+
+    Args:
+        week (int): UserSquad week
+        gameweek (int, optional): Gameweek to score, defaults to week
+        season (str, optional): Season for actual points, defaults to the settings season
+
+    Returns:
+        dict: {'user_ids', 'player_names', 'projected', 'actual', 'ownership'} with NumPy arrays
+    """
+    gameweek = week if gameweek is None else gameweek
+    user_ids, player_names, rows, cols = build_ownership_matrix(week)
+    n_users = len(user_ids)
+    projected = sparse_matvec(rows, cols, projected_points_vector(player_names, gameweek), n_users)
+    actual = sparse_matvec(rows, cols, actual_points_vector(player_names, gameweek, season), n_users)
+    ownership = np.bincount(cols, minlength=len(player_names)) if len(cols) else np.zeros(0, dtype=np.int64)
+    return {
+        'user_ids': user_ids,
+        'player_names': player_names,
+        'projected': projected,
+        'actual': actual,
+        'ownership': ownership,
+    }
+
+
+def squad_leaderboard(week, gameweek=None, metric='projected', limit=50, season=None):
+    """
+    Rank every squad of a week by projected or actual points.
+
+    Returns:
+        dict: {'squads': int, 'leaderboard': list of {rank, user_id, username, projected_points, actual_points}}
+    """
+    scores = score_all_squads(week, gameweek, season)
+    values = scores['actual'] if metric == 'actual' else scores['projected']
+    order = np.argsort(-values, kind='stable')[:limit]
+    top_ids = [scores['user_ids'][i] for i in order]
+    usernames = dict(User.objects.filter(id__in=top_ids).values_list('id', 'username'))
+    leaderboard = [
+        {
+            'rank': rank,
+            'user_id': scores['user_ids'][i],
+            'username': usernames.get(scores['user_ids'][i]),
+            'projected_points': round(float(scores['projected'][i]), 1),
+            'actual_points': round(float(scores['actual'][i]), 1),
+        }
+        for rank, i in enumerate(order, 1)
+    ]
+    return {
+        'squads': len(scores['user_ids']),
+        'average_projected_points': round(float(scores['projected'].mean()), 1) if len(values) else 0.0,
+        'average_actual_points': round(float(scores['actual'].mean()), 1) if len(values) else 0.0,
+        'leaderboard': leaderboard,
+    }
@@ -0,0 +1,110 @@
+"""
+Per-user store for generated squads.
+
+Squads live in the 'squad_results' cache, which is shared by all worker
+processes and expires entries after its TIMEOUT. Each user keeps at most
+SQUAD_RESULTS_PER_USER squads; a per-user recency index evicts the least
+recently used squad when a new one is stored. The index is read, changed and
+written back under a per-owner lock (a cache.add key, atomic on shared cache
+backends, plus a process lock), so concurrent requests of one user never
+drop each other's entries.
+"""
+
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.cache import caches
+
+
+DEFAULT_SQUADS_PER_USER = 10
+
+# Seconds a lock is held at most (a crashed holder's lock expires after this)
+LOCK_TIMEOUT = 5
+LOCK_POLL_INTERVAL = 0.01
+
+_process_lock = threading.Lock()
+
+
+def _cache():
+    return caches['squad_results']
+
+
+def _max_squads():
+    return getattr(settings, 'SQUAD_RESULTS_PER_USER', DEFAULT_SQUADS_PER_USER)
+
+
+def owner_key(request):
+    """
+    Cache owner for a request: the user id, or the session key for anonymous users.
+    """
+    if getattr(request, 'user', None) is not None and request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    session = getattr(request, 'session', None)
+    if session is None:
+        return "anonymous"
+    if not session.session_key:
+        session.save()
+    return f"session:{session.session_key}"
+
+
+def _squad_key(owner, squad_number):
+    return f"squads:{owner}:{squad_number}"
+
+
+def _index_key(owner):
+    return f"squads:{owner}:index"
+
+
+def _lock_key(owner):
+    return f"squads:{owner}:lock"
+
+
+@contextmanager
+def _owner_lock(owner):
+    """Hold the owner's index lock; an expired (abandoned) lock is taken over."""
+    cache = _cache()
+    token = uuid.uuid4().hex
+    with _process_lock:
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while not cache.add(_lock_key(owner), token, LOCK_TIMEOUT) and time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+        try:
+            yield
+        finally:
+            if cache.get(_lock_key(owner)) == token:
+                cache.delete(_lock_key(owner))
+
+
+def _touch(owner, squad_numbers):
+    """Move squads to the front of the owner's recency index (first = most recent) and evict beyond the cap."""
+    cache = _cache()
+    with _owner_lock(owner):
+        index = list(squad_numbers) + [n for n in cache.get(_index_key(owner), []) if n not in squad_numbers]
+        evicted = index[_max_squads():]
+        if evicted:
+            cache.delete_many([_squad_key(owner, n) for n in evicted])
+        cache.set(_index_key(owner), index[:_max_squads()])
+
+
+def store_squad(owner, squad_number, squad):
+    """Store one generated squad for an owner."""
+    _cache().set(_squad_key(owner, squad_number), squad)
+    _touch(owner, [squad_number])
+
+
+def store_squads(owner, squads):
+    """Store a numbered set of squads ({squad_number: squad}) for an owner."""
+    if not squads:
+        return
+    _cache().set_many({_squad_key(owner, number): squad for number, squad in squads.items()})
+    _touch(owner, sorted(squads))
+
+
+def get_squad(owner, squad_number):
+    """A stored squad, or None if it was never stored, expired or was evicted."""
+    squad = _cache().get(_squad_key(owner, squad_number))
+    if squad is not None:
+        _touch(owner, [squad_number])
+    return squad
@@ -0,0 +1,406 @@
+"""
+Multi-gameweek transfer planner.
+
+Plans transfers for a saved `UserSquad` over a horizon of upcoming gameweeks
+with a single MILP: squad membership per week, transfers in and out, free
+transfers that roll over (up to a cap), 4-point hits for extra transfers and
+the bank carried from week to week. Each week picks a starting XI in a valid
+formation and a captain; the objective is the XI's points with the captain
+counted twice, plus a small weight for bench points, minus hits. At most
+three players per club are held. Per-gameweek scores come from
+`PlayerFixture.projected_points`.
+
+The saved squad is validated first (positions matching the player table,
+no player listed twice, the club limit); problems are reported instead of
+handing the solver a model that cannot be satisfied.
+
+The plan is meant to be used on a rolling horizon: apply the first week's
+transfers, then re-plan next week with fresh projections.
+
+Candidates are pre-pruned to the current squad plus the best players per
+position by horizon points and by points per million, and the model is built
+from sparse coefficient lists so a 5-week horizon solves in seconds.
+"""
+
+import time
+import pulp
+from django.db.models import Sum
+from MyApi.models import Player, PlayerFixture, SystemSettings, UserSquad
+from MyApi.utils.anytime_solver import UNKNOWN_TEAM, solve_with_time_limit
+
+
+DEFAULT_PLANNER_TIME_LIMIT_MS = 5000
+HIT_COST = 4
+MAX_FREE_TRANSFERS = 5
+MAX_PER_CLUB = 3
+
+# Starting XI: exactly one keeper and at least these many outfield players
+XI_SIZE = 11
+MIN_STARTERS = {'Keeper': 1, 'Defender': 3, 'Midfielder': 2, 'Attacker': 1}
+
+# Weight of bench points in the objective (cover for unplanned absences)
+BENCH_WEIGHT = 0.1
+
+SQUAD_POSITIONS = {
+    'goalkeepers': 'Keeper',
+    'defenders': 'Defender',
+    'midfielders': 'Midfielder',
+    'forwards': 'Attacker',
+}
+
+
+def get_gameweek_points(player_names, gameweeks):
+    """
+    Projected points per player per gameweek (double gameweeks are summed).
+
+    Returns:
+        dict: {player_name: {gameweek: points}}
+    """
+    rows = PlayerFixture.objects.filter(gameweek__in=gameweeks)
+    if player_names is not None:
+        rows = rows.filter(player_name__in=player_names)
+    points = {}
+    for row in rows.values('player_name', 'gameweek').annotate(points=Sum('projected_points')):
+        points.setdefault(row['player_name'], {})[row['gameweek']] = float(row['points'] or 0.0)
+    return points
+
+
+def club_of(info):
+    """A player's club for the club limit, or None when unknown."""
+    team = info.get('team')
+    return team if isinstance(team, str) and team and team != UNKNOWN_TEAM else None
+
+
+def validate_squad(squad_data, players, max_per_club=MAX_PER_CLUB):
+    """
+    Problems that would make a saved squad impossible to plan for.
+
+    Args:
+        squad_data (dict): Saved squad keyed 'goalkeepers', 'defenders', ...
+        players (dict): {name: {'position', 'cost', 'team'}} from the player table
+        max_per_club (int): Club limit
+
+    Returns:
+        list: Problem descriptions (empty when the squad can be planned)
+    """
+    problems = []
+    seen = set()
+    clubs = {}
+    for group, position in SQUAD_POSITIONS.items():
+        for player in squad_data.get(group, []):
+            if not isinstance(player, dict) or not player.get('name'):
+                continue
+            name = player['name']
+            if name in seen:
+                problems.append(f"{name} is listed more than once")
+                continue
+            seen.add(name)
+            info = players.get(name)
+            if info is None:
+                continue
+            if info['position'] != position:
+                problems.append(f"{name} is saved under {group} but is a {info['position']}")
+            club = club_of(info)
+            if club is not None:
+                clubs.setdefault(club, []).append(name)
+    for club, names in sorted(clubs.items()):
+        if len(names) > max_per_club:
+            problems.append(f"{len(names)} players from {club} (at most {max_per_club}): {', '.join(sorted(names))}")
+    return problems
+
+
+def lineup_points(names, players, week_points):
+    """
+    Points of the best starting XI (with captain counted twice) from a squad
+    for one gameweek. Greedy is exact here: the keeper, each position's
+    minimum, then the best remaining outfield players.
+    """
+    by_position = {}
+    for name in names:
+        by_position.setdefault(players[name]['position'], []).append(week_points.get(name, 0.0))
+    for scores in by_position.values():
+        scores.sort(reverse=True)
+
+    starters = []
+    rest = []
+    for position, scores in by_position.items():
+        needed = MIN_STARTERS.get(position, 0)
+        starters.extend(scores[:needed])
+        if position != 'Keeper':
+            rest.extend(scores[needed:])
+    starters.extend(sorted(rest, reverse=True)[:max(XI_SIZE - len(starters), 0)])
+    return sum(starters) + (max(starters) if starters else 0.0)
+
+
+def prune_candidates(players, points, gameweeks, keep, top_k=15):
+    """
+    Keep the squad players plus, per position, the top_k candidates by horizon
+    points and the top_k by horizon points per million.
+
+    Args:
+        players (dict): {name: {'position', 'cost', 'team'}}
+        points (dict): {name: {gameweek: points}}
+        keep (set): Names that must stay in the pool (current squad)
+
+    Returns:
+        list: Candidate names
+    """
+    by_position = {}
+    for name, info in players.items():
+        total = sum(points.get(name, {}).get(gw, 0.0) for gw in gameweeks)
+        by_position.setdefault(info['position'], []).append((name, total, total / max(info['cost'], 0.1)))
+
+    selected = set(keep)
+    for candidates in by_position.values():
+        candidates = [c for c in candidates if c[1] > 0]
+        selected.update(name for name, _, _ in sorted(candidates, key=lambda c: c[1], reverse=True)[:top_k])
+        selected.update(name for name, _, _ in sorted(candidates, key=lambda c: c[2], reverse=True)[:top_k])
+    return sorted(name for name in selected if name in players)
+
+
+def build_transfer_problem(candidates, players, points, gameweeks, initial_squad, counts,
+                           bank, free_transfers=1, hit_cost=HIT_COST, max_free_transfers=MAX_FREE_TRANSFERS,
+                           max_per_club=MAX_PER_CLUB, bench_weight=BENCH_WEIGHT):
+    """
+    Build the multi-week transfer MILP with a starting XI and captain per week.
+
+    Args:
+        candidates (list): Player names in the model
+        players (dict): {name: {'position', 'cost', 'team'}}
+        points (dict): {name: {gameweek: points}}
+        gameweeks (list): Planned gameweeks in order
+        initial_squad (set): Names in the squad before the first planned week
+        counts (dict): Required players per position, keyed by Player.position
+        bank (float): Money in the bank before the first week
+        free_transfers (int): Free transfers available for the first week
+
+    Returns:
+        tuple: (prob, variables) where variables holds the per-week variable dicts
+    """
+    weeks = range(len(gameweeks))
+    squad = {}
+    buy = {}
+    sell = {}
+    start = {}
+    captain = {}
+    for i, name in enumerate(candidates):
+        for t in weeks:
+            squad[i, t] = pulp.LpVariable(f"squad_{i}_{t}", cat=pulp.LpBinary)
+            buy[i, t] = pulp.LpVariable(f"buy_{i}_{t}", cat=pulp.LpBinary)
+            sell[i, t] = pulp.LpVariable(f"sell_{i}_{t}", cat=pulp.LpBinary)
+            start[i, t] = pulp.LpVariable(f"start_{i}_{t}", cat=pulp.LpBinary)
+            captain[i, t] = pulp.LpVariable(f"captain_{i}_{t}", cat=pulp.LpBinary)
+
+    bank_vars = [pulp.LpVariable(f"bank_{t}", lowBound=0) for t in weeks]
+    free = [pulp.LpVariable(f"free_{t}", lowBound=0, upBound=max_free_transfers, cat=pulp.LpInteger) for t in weeks]
+    used_free = [pulp.LpVariable(f"used_free_{t}", lowBound=0, cat=pulp.LpInteger) for t in weeks]
+    hits = [pulp.LpVariable(f"hits_{t}", lowBound=0, cat=pulp.LpInteger) for t in weeks]
+
+    costs = [players[name]['cost'] for name in candidates]
+    by_position = {}
+    by_club = {}
+    for i, name in enumerate(candidates):
+        by_position.setdefault(players[name]['position'], []).append(i)
+        club = club_of(players[name])
+        if club is not None:
+            by_club.setdefault(club, []).append(i)
+
+    squad_size = sum(counts.values())
+    xi_size = min(XI_SIZE, squad_size)
+    min_starters = {position: min(MIN_STARTERS.get(position, 0), counts.get(position, 0)) for position in by_position}
+
+    prob = pulp.LpProblem("FPL_Transfer_Plan", pulp.LpMaximize)
+
+    # XI points, the captain's again, and bench points at bench_weight
+    objective = []
+    for i, name in enumerate(candidates):
+        player_points = points.get(name, {})
+        for t, gw in enumerate(gameweeks):
+            score = player_points.get(gw, 0.0)
+            if score:
+                objective.append((start[i, t], score * (1 - bench_weight)))
+                objective.append((captain[i, t], score))
+                if bench_weight:
+                    objective.append((squad[i, t], score * bench_weight))
+    objective.extend((hits[t], -hit_cost) for t in weeks)
+    prob += pulp.LpAffineExpression(objective)
+
+    for t in weeks:
+        # Squad flow: this week's squad is last week's plus buys minus sells
+        for i, name in enumerate(candidates):
+            previous = 1 if name in initial_squad else 0
+            flow = [(squad[i, t], 1), (buy[i, t], -1), (sell[i, t], 1)]
+            if t > 0:
+                flow.append((squad[i, t - 1], -1))
+                previous = 0
+            prob += pulp.LpAffineExpression(flow) == previous, f"flow_{i}_{t}"
+            prob += buy[i, t] + sell[i, t] <= 1, f"buy_or_sell_{i}_{t}"
+
+        for position, indexes in by_position.items():
+            prob += pulp.LpAffineExpression([(squad[i, t], 1) for i in indexes]) == counts.get(position, 0), f"count_{position}_{t}"
+            starters = pulp.LpAffineExpression([(start[i, t], 1) for i in indexes])
+            if position == 'Keeper':
+                prob += starters == min_starters[position], f"xi_{position}_{t}"
+            else:
+                prob += starters >= min_starters[position], f"xi_{position}_{t}"
+
+        # Starting XI and captain from this week's squad
+        for i in range(len(candidates)):
+            prob += start[i, t] - squad[i, t] <= 0, f"start_in_squad_{i}_{t}"
+            prob += captain[i, t] - start[i, t] <= 0, f"captain_starts_{i}_{t}"
+        prob += pulp.LpAffineExpression([(start[i, t], 1) for i in range(len(candidates))]) == xi_size, f"xi_{t}"
+        prob += pulp.LpAffineExpression([(captain[i, t], 1) for i in range(len(candidates))]) == 1, f"captain_{t}"
+
+        for c, indexes in enumerate(by_club.values()):
+            if len(indexes) > max_per_club:
+                prob += pulp.LpAffineExpression([(squad[i, t], 1) for i in indexes]) <= max_per_club, f"club_{c}_{t}"
+
+        # Bank carry-over, selling at the current price
+        money = [(bank_vars[t], 1)]
+        money.extend((buy[i, t], cost) for i, cost in enumerate(costs))
+        money.extend((sell[i, t], -cost) for i, cost in enumerate(costs))
+        if t > 0:
+            money.append((bank_vars[t - 1], -1))
+        prob += pulp.LpAffineExpression(money) == (bank if t == 0 else 0), f"bank_{t}"
+
+        # Transfers beyond the free ones cost a hit each
+        transfers = [(buy[i, t], 1) for i in range(len(candidates))]
+        prob += pulp.LpAffineExpression(transfers + [(used_free[t], -1), (hits[t], -1)]) <= 0, f"hits_{t}"
+        prob += used_free[t] - free[t] <= 0, f"used_free_{t}"
+        prob += pulp.LpAffineExpression([(used_free[t], 1)] + [(var, -1) for var, _ in transfers]) <= 0, f"used_free_cap_{t}"
+
+        # Unused free transfers roll over, capped at max_free_transfers
+        if t == 0:
+            prob += free[t] == min(free_transfers, max_free_transfers), "free_0"
+        else:
+            prob += free[t] - free[t - 1] + used_free[t - 1] <= 1, f"free_{t}"
+
+    return prob, {'squad': squad, 'buy': buy, 'sell': sell, 'start': start, 'captain': captain,
+                  'bank': bank_vars, 'free': free, 'used_free': used_free, 'hits': hits}
+
+
+def plan_transfers(user, week, horizon=5, free_transfers=1, budget_constraint=100.0,
+                   top_k=15, hit_cost=HIT_COST, time_limit_ms=None):
+    """
+    Plan transfers for a user's saved squad over the next `horizon` gameweeks.
+
+    Args:
+        user: Django user instance
+        week (int): Week of the saved UserSquad, also the first planned gameweek
+        horizon (int): Number of gameweeks to plan (3-6)
+        free_transfers (int): Free transfers available for the first week
+        budget_constraint (float): Total budget; the bank is budget minus squad cost
+        top_k (int): Candidates kept per position per pruning criterion
+        hit_cost (int): Points deducted per extra transfer
+        time_limit_ms (int, optional): Solve budget, defaults to DEFAULT_PLANNER_TIME_LIMIT_MS
+
+    Returns:
+        dict: Plan with per-week transfers, squad, bank, hits and projected points
+    """
+    try:
+        user_squad = UserSquad.objects.filter(user=user, week=week).first()
+        if user_squad is None:
+            return {'success': False, 'error': f'No saved squad for gameweek {week}'}
+        squad_data = user_squad.squad
+
+        horizon = max(1, min(int(horizon), 6))
+        gameweeks = sorted(
+            PlayerFixture.objects.filter(gameweek__gte=week, gameweek__lt=week + horizon)
+            .values_list('gameweek', flat=True).distinct()
+        )
+        if not gameweeks:
+            return {'success': False, 'error': f'No fixtures found from gameweek {week}'}
+
+        current_week = SystemSettings.get_settings().current_gameweek
+        players = {
+            p['name']: {'position': p['position'], 'cost': float(p['cost']), 'team': p['team']}
+            for p in Player.objects.filter(week=current_week).values('name', 'position', 'cost', 'team')
+        }
+
+        initial_squad = set()
+        counts = {}
+        for group, position in SQUAD_POSITIONS.items():
+            for player in squad_data.get(group, []):
+                if not isinstance(player, dict) or not player.get('name'):
+                    continue
+                name = player['name']
+                initial_squad.add(name)
+                counts[position] = counts.get(position, 0) + 1
+                # Squad players missing from this week's table keep their saved details
+                players.setdefault(name, {'position': position, 'cost': float(player.get('cost', 0)),
+                                          'team': player.get('team')})
+        if not initial_squad:
+            return {'success': False, 'error': 'Saved squad is empty'}
+        problems = validate_squad(squad_data, players)
+        if problems:
+            return {'success': False, 'error': 'Saved squad cannot be planned: ' + '; '.join(problems),
+                    'problems': problems}
+
+        points = get_gameweek_points(None, gameweeks)
+        squad_cost = sum(players[name]['cost'] for name in initial_squad)
+        bank = max(float(budget_constraint) - squad_cost, 0.0)
+        candidates = prune_candidates(players, points, gameweeks, initial_squad, top_k)
+
+        build_start = time.perf_counter()
+        prob, variables = build_transfer_problem(
+            candidates, players, points, gameweeks, initial_squad, counts, bank, free_transfers, hit_cost
+        )
+        build_time = time.perf_counter() - build_start
+
+        if time_limit_ms in (None, ''):
+            time_limit_ms = DEFAULT_PLANNER_TIME_LIMIT_MS
+        solve_stats = solve_with_time_limit(prob, time_limit_ms)
+        if solve_stats['status'] not in ('optimal', 'feasible'):
+            return {'success': False, 'error': f"No transfer plan found ({solve_stats['status']})"}
+
+        def chosen(var):
+            return var.varValue is not None and var.varValue > 0.5
+
+        plan = []
+        available_free = min(int(free_transfers), MAX_FREE_TRANSFERS)
+        for t, gw in enumerate(gameweeks):
+            transfers_in = [candidates[i] for i in range(len(candidates)) if chosen(variables['buy'][i, t])]
+            transfers_out = [candidates[i] for i in range(len(candidates)) if chosen(variables['sell'][i, t])]
+            squad = [candidates[i] for i in range(len(candidates)) if chosen(variables['squad'][i, t])]
+            starting_xi = [candidates[i] for i in range(len(candidates)) if chosen(variables['start'][i, t])]
+            captain = next((candidates[i] for i in range(len(candidates)) if chosen(variables['captain'][i, t])), None)
+            week_points = {name: points.get(name, {}).get(gw, 0.0) for name in squad}
+            hits = int(round(variables['hits'][t].varValue or 0))
+            plan.append({
+                'gameweek': gw,
+                'transfers_in': [dict(name=name, **players[name]) for name in transfers_in],
+                'transfers_out': [dict(name=name, **players[name]) for name in transfers_out],
+                'free_transfers': available_free,
+                'hits': hits,
+                'hit_cost': hits * hit_cost,
+                'bank': round(variables['bank'][t].varValue or 0.0, 1),
+                'squad': squad,
+                'starting_xi': starting_xi,
+                'captain': captain,
+                'projected_points': round(sum(week_points[name] for name in starting_xi) + week_points.get(captain, 0.0), 1),
+            })
+            available_free = min(max(available_free - len(transfers_in), 0) + 1, MAX_FREE_TRANSFERS)
+
+        baseline = sum(
+            lineup_points(initial_squad, players, {name: points.get(name, {}).get(gw, 0.0) for name in initial_squad})
+            for gw in gameweeks
+        )
+        return {
+            'success': True,
+            'gameweeks': gameweeks,
+            'plan': plan,
+            'total_projected_points': round(sum(week['projected_points'] - week['hit_cost'] for week in plan), 1),
+            'no_transfer_points': round(baseline, 1),
+            'initial_bank': round(bank, 1),
+            'optimization_status': solve_stats['status'],
+            'optimality_gap': solve_stats['optimality_gap'],
+            'model_stats': {
+                'candidates': len(candidates),
+                'variables': len(prob.variables()),
+                'constraints': len(prob.constraints),
+                'build_time': round(build_time, 4),
+                'solve_time': solve_stats['solve_time'],
+            },
+        }
+    except Exception as e:
+        return {'success': False, 'error': f'Transfer planning failed: {str(e)}'}
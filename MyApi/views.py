@@ -26,8 +26,18 @@ def generate_squads_elo(request):
     """
     formation_str = request.GET.get('formation', '3-4-3')
     try:
+        squad_size = int(request.GET.get('squad_size', 11))
         selector = SquadSelector(formation=formation_str)
-        squads_pd = selector.select_top_n_squads(budget=82.5, top_n=4)
+        if squad_size == 15:
+            # Full squad mode: 2-5-5-3 with bench weighting and 3-per-club limit
+            squads_pd = selector.select_top_n_full_squads(
+                budget=float(request.GET.get('budget', 100.0)),
+                top_n=int(request.GET.get('top_n', 1)),
+                bench_weight=float(request.GET.get('bench_weight', 0.1)),
+                time_limit_ms=request.GET.get('time_limit_ms')
+            )
+        else:
+            squads_pd = selector.select_top_n_squads(budget=82.5, top_n=4)
         squads = []
         for idx, squad_df in enumerate(squads_pd, 1):
             # Convert DataFrame to squad dict for frontend
@@ -77,11 +87,15 @@ def generate_squads_elo(request):
             player_count = len(all_players)
             squad['total_cost'] = round(total_cost, 1)
             squad['avg_elo'] = round(total_elo / player_count, 1) if player_count > 0 else 0
+            if 'Starter' in squad_df.columns:
+                squad['bench'] = [row['Player'] for _, row in squad_df.iterrows() if not row['Starter']]
             squads.append(squad)
         return JsonResponse({
             'squads': squads,
             'formation': formation_str,
-            'counts': selector.position_counts
+            'counts': selector.position_counts,
+            'squad_size': squad_size,
+            'solve_stats': selector.solve_stats
         })
     except Exception as e:
         return JsonResponse({'error': f'Failed to generate squads: {str(e)}'}, status=500)
@@ -468,7 +482,8 @@ def update_player_positions_from_fpl(request):
     
     try:
         import asyncio
-        from MyApi.models import Player, SystemSettings
+        from MyApi.models import SystemSettings
+        from MyApi.utils.fpl_position_updater import update_player_positions_from_fpl as update_positions
         
         # Get the current week from settings
         try:
@@ -477,113 +492,9 @@ def update_player_positions_from_fpl(request):
         except:
             current_week = 4
         
-        async def fetch_and_update_positions():
-            """
-            Async function to fetch FPL data and update positions and teams.
-            """
-            import aiohttp
-            from fpl import FPL
-            from asgiref.sync import sync_to_async
-            
-            async with aiohttp.ClientSession() as session:
-                fpl = FPL(session)
-                
-                try:
-                    # Get all FPL players and teams
-                    players = await fpl.get_players()
-                    teams = await fpl.get_teams()
-                    
-                    # Create team mapping
-                    team_map = {team.id: team.name for team in teams}
-                    
-                    updated_count = 0
-                    team_updated_count = 0
-                    errors = []
-                    position_changes = []
-                    team_changes = []
-                    
-                    position_map = {
-                        1: 'Keeper',      # Goalkeeper
-                        2: 'Defender',    # Defender
-                        3: 'Midfielder',  # Midfielder
-                        4: 'Attacker',    # Forward
-                    }
-                    
-                    for fpl_player in players:
-                        try:
-                            # Clean player name to match our database format
-                            player_name = f"{fpl_player.first_name} {fpl_player.second_name}"
-                            player_name_clean = player_name.replace(' ', '_')
-                            
-                            # Get FPL position and team
-                            fpl_position = position_map.get(fpl_player.element_type, 'Midfielder')
-                            fpl_team = team_map.get(fpl_player.team, 'Unknown')
-                            
-                            # Try to find player in our database (try both formats)
-                            player_obj = None
-                            for name_variant in [player_name, player_name_clean, player_name.replace('_', ' ')]:
-                                try:
-                                    player_obj = await sync_to_async(Player.objects.filter(
-                                        name=name_variant, 
-                                        week=current_week
-                                    ).first)()
-                                    if player_obj:
-                                        break
-                                except:
-                                    continue
-                            
-                            if player_obj:
-                                updated = False
-                                
-                                # Check if position needs updating
-                                if player_obj.position != fpl_position:
-                                    old_position = player_obj.position
-                                    player_obj.position = fpl_position
-                                    updated = True
-                                    
-                                    position_changes.append({
-                                        'name': player_obj.name,
-                                        'old_position': old_position,
-                                        'new_position': fpl_position
-                                    })
-                                    updated_count += 1
-                                
-                                # Check if team needs updating
-                                if player_obj.team != fpl_team:
-                                    old_team = player_obj.team
-                                    player_obj.team = fpl_team
-                                    updated = True
-                                    
-                                    team_changes.append({
-                                        'name': player_obj.name,
-                                        'old_team': old_team,
-                                        'new_team': fpl_team
-                                    })
-                                    team_updated_count += 1
-                                
-                                if updated:
-                                    await sync_to_async(player_obj.save)()
-                            
-                        except Exception as e:
-                            errors.append(f"Error updating {player_name}: {str(e)}")
-                            continue
-                    
-                    return {
-                        'updated_count': updated_count,
-                        'team_updated_count': team_updated_count,
-                        'position_changes': position_changes,
-                        'team_changes': team_changes[:20],  # Limit to first 20
-                        'errors': errors[:10]  # Limit errors to first 10
-                    }
-                    
-                except Exception as e:
-                    return {'error': f"FPL API error: {str(e)}"}
-        
-        # Run the async function
-        result = asyncio.run(fetch_and_update_positions())
-        
-        if 'error' in result:
-            return JsonResponse({'success': False, 'error': result['error']})
+        result = asyncio.run(update_positions(current_week))
+        if not result['success']:
+            return JsonResponse(result)
         
         return JsonResponse({
             'success': True,
@@ -683,6 +594,8 @@ def import_current_gameweek_data(request):
     """
     Import current gameweek player performance data from FPL API.
     Safely appends new data without destroying existing records.
+    
+    Optional JSON body: {"mode": "history" | "live"}
     """
     if request.method != 'POST':
         return JsonResponse({'success': False, 'error': 'Only POST method allowed'})
@@ -691,13 +604,16 @@ def import_current_gameweek_data(request):
         import asyncio
         from MyApi.utils.gameweek_importer import get_current_gameweek_data
         
+        data = json.loads(request.body) if request.body else {}
+        
         # Run the gameweek data import
-        result = asyncio.run(get_current_gameweek_data())
+        result = asyncio.run(get_current_gameweek_data(mode=data.get('mode')))
         
         if result.get('success'):
             return JsonResponse({
                 'success': True,
                 'message': f"Successfully imported gameweek {result['gameweek']} data",
+                'mode': result['mode'],
                 'gameweek': result['gameweek'],
                 'new_matches': result['new_matches'],
                 'updated_matches': result['updated_matches'],
@@ -995,9 +911,20 @@ def generate_squads_points(request):
         data = json.loads(request.body) if request.body else {}
         formation_str = data.get('formation', '3-4-3')
         games_to_consider = int(data.get('games_to_consider', 3))
+        squad_size = int(data.get('squad_size', 11))
+        time_limit_ms = data.get('time_limit_ms')
 
         selector = SquadSelectorPoints(formation=formation_str, games_to_consider=games_to_consider)
-        squads_pd = selector.select_top_n_squads(budget=82.5, top_n=4)
+        if squad_size == 15:
+            # Full squad mode: 2-5-5-3 with bench weighting and 3-per-club limit
+            squads_pd = selector.select_top_n_full_squads(
+                budget=float(data.get('budget', 100.0)),
+                top_n=int(data.get('top_n', 1)),
+                bench_weight=float(data.get('bench_weight', 0.1)),
+                time_limit_ms=time_limit_ms
+            )
+        else:
+            squads_pd = selector.select_top_n_squads(budget=82.5, top_n=4, time_limit_ms=time_limit_ms)
         squads = []
         for idx, squad_df in enumerate(squads_pd, 1):
             squad = {
@@ -1013,7 +940,7 @@ def generate_squads_points(request):
                         'name': row['Player'],
                         'projected_points': round(float(row['ProjectedPoints']), 1),
                         'cost': float(row['Cost']),
-                        'team': row.get('Team', 'Unknown') if hasattr(row, 'get') else row['Team'] if 'Team' in row else 'Unknown'
+                        'team': (row.get('Team') if hasattr(row, 'get') else row['Team'] if 'Team' in row else None) or 'Unknown'
                     }
                     for _, row in squad_df.iterrows() if row['Position'] == 'Keeper'
                 ],
@@ -1022,7 +949,7 @@ def generate_squads_points(request):
                         'name': row['Player'],
                         'projected_points': round(float(row['ProjectedPoints']), 1),
                         'cost': float(row['Cost']),
-                        'team': row.get('Team', 'Unknown') if hasattr(row, 'get') else row['Team'] if 'Team' in row else 'Unknown'
+                        'team': (row.get('Team') if hasattr(row, 'get') else row['Team'] if 'Team' in row else None) or 'Unknown'
                     }
                     for _, row in squad_df.iterrows() if row['Position'] == 'Defender'
                 ],
@@ -1031,7 +958,7 @@ def generate_squads_points(request):
                         'name': row['Player'],
                         'projected_points': round(float(row['ProjectedPoints']), 1),
                         'cost': float(row['Cost']),
-                        'team': row.get('Team', 'Unknown') if hasattr(row, 'get') else row['Team'] if 'Team' in row else 'Unknown'
+                        'team': (row.get('Team') if hasattr(row, 'get') else row['Team'] if 'Team' in row else None) or 'Unknown'
                     }
                     for _, row in squad_df.iterrows() if row['Position'] == 'Midfielder'
                 ],
@@ -1040,7 +967,7 @@ def generate_squads_points(request):
                         'name': row['Player'],
                         'projected_points': round(float(row['ProjectedPoints']), 1),
                         'cost': float(row['Cost']),
-                        'team': row.get('Team', 'Unknown') if hasattr(row, 'get') else row['Team'] if 'Team' in row else 'Unknown'
+                        'team': (row.get('Team') if hasattr(row, 'get') else row['Team'] if 'Team' in row else None) or 'Unknown'
                     }
                     for _, row in squad_df.iterrows() if row['Position'] == 'Attacker'
                 ]
@@ -1056,18 +983,71 @@ def generate_squads_points(request):
             player_count = len(all_players)
             squad['total_cost'] = round(total_cost, 1)
             squad['avg_projected_points'] = round(total_points / player_count, 1) if player_count > 0 else 0
+            if 'Starter' in squad_df.columns:
+                squad['bench'] = [row['Player'] for _, row in squad_df.iterrows() if not row['Starter']]
             squads.append(squad)
+        # Keep the generated squads for /api/squad_points/<n>/ across worker processes
+        from MyApi.utils.squad_store import owner_key, store_squads
+        store_squads(owner_key(request), {squad['squad_number']: squad for squad in squads})
         return JsonResponse({
             'success': True,
             'squads': squads,
             'formation': formation_str,
             'counts': selector.position_counts,
+            'squad_size': squad_size,
+            'solve_stats': selector.solve_stats,
             'selection_mode': 'projected_points'
         })
     except Exception as e:
         return JsonResponse({'success': False, 'error': f'Failed to generate squads: {str(e)}'})
 
 
+@csrf_exempt
+def budget_frontier(request):
+    """
+    Points-vs-cost Pareto frontier of the best lineup across a budget range.
+    Query params: mode ('points' or 'elo'), formation, games_to_consider, min_budget, max_budget, step
+    """
+    if request.method != 'GET':
+        return JsonResponse({'success': False, 'error': 'Only GET method allowed'})
+    try:
+        from MyApi.utils.budget_frontier import budget_steps, get_budget_frontier
+
+        mode = request.GET.get('mode', 'points')
+        formation_str = request.GET.get('formation', '3-4-3')
+        try:
+            min_budget = float(request.GET.get('min_budget', 75.0))
+            max_budget = float(request.GET.get('max_budget', 100.0))
+            step = float(request.GET.get('step', 0.5))
+            budget_steps(min_budget, max_budget, step)
+        except ValueError as e:
+            return JsonResponse({'success': False, 'error': f'Invalid budget range: {str(e)}'}, status=400)
+
+        if mode == 'elo':
+            selector = SquadSelector(formation=formation_str)
+            score_column = 'Elo'
+        else:
+            from MyApi.utils.generate_squads_points import SquadSelectorPoints
+            games_to_consider = int(request.GET.get('games_to_consider', 3))
+            selector = SquadSelectorPoints(formation=formation_str, games_to_consider=games_to_consider)
+            score_column = 'ProjectedPoints'
+
+        result = get_budget_frontier(selector, score_column, min_budget, max_budget, step)
+        return JsonResponse({
+            'success': True,
+            'mode': mode,
+            'formation': formation_str,
+            'frontier': [p for p in result['points'] if p.get('on_frontier')],
+            'points': result['points'],
+            'solves': result['solves'],
+            'total_solve_time': result['total_solve_time'],
+            'cached': result['cached'],
+            'dataset_version': result['dataset_version']
+        })
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': f'Failed to compute budget frontier: {str(e)}'})
+
+
 @csrf_exempt
 def recalculate_multipliers(request):
     """
@@ -1153,20 +1133,14 @@ def generate_single_squad_points(players, formation, squad_num):
                 if sum(p['cost'] for p in selected_players) + candidate['cost'] <= budget:
                     selected_players.append(candidate)
     
-    # Store squad in session/cache (simplified for now)
-    # In a real implementation, you'd save to database
-    global generated_squads_points
-    if 'generated_squads_points' not in globals():
-        generated_squads_points = {}
-    
-    generated_squads_points[squad_num] = {
+    squad = {
         'goalkeepers': [p for p in selected_players if p['position'] == 'Keeper'],
         'defenders': [p for p in selected_players if p['position'] == 'Defender'],
         'midfielders': [p for p in selected_players if p['position'] == 'Midfielder'],
         'forwards': [p for p in selected_players if p['position'] == 'Attacker']
     }
     
-    return generated_squads_points[squad_num]
+    return squad
 
 
 def get_squad_points(request, squad_number):
@@ -1174,11 +1148,8 @@ def get_squad_points(request, squad_number):
     Get a specific squad generated using projected points.
     """
     try:
-        global generated_squads_points
-        if 'generated_squads_points' not in globals():
-            return JsonResponse({'success': False, 'error': 'No squads generated yet'})
-        
-        squad = generated_squads_points.get(int(squad_number))
+        from MyApi.utils.squad_store import get_squad, owner_key
+        squad = get_squad(owner_key(request), int(squad_number))
         if not squad:
             return JsonResponse({'success': False, 'error': f'Squad {squad_number} not found'})
         
@@ -1276,9 +1247,22 @@ def recommend_substitutes(request):
         budget_constraint = data.get('budget_constraint', 100.0)
         squad_data = data.get('squad')
         gameweek = data.get('gameweek')
+        time_limit_ms = data.get('time_limit_ms')
+        # Accepts JSON booleans as well as "false" / "0" strings
+        prune = str(data.get('prune', True)).lower() in ('1', 'true', 'yes')
+        top_k = data.get('top_k')
         if not squad_data:
             return JsonResponse({'success': False, 'error': 'Missing squad data in request.'}, status=400)
-        result = recommend_subs_util(request.user, max_recommendations, budget_constraint, squad_data, gameweek)
+        # Serve the nightly result when the squad and projections are unchanged
+        from MyApi.utils.batch_recommendations import get_stored_recommendation
+        stored = get_stored_recommendation(request.user, gameweek, squad_data)
+        if (stored and not top_k and time_limit_ms is None
+                and float(budget_constraint) == stored.package_budget
+                and int(max_recommendations) == stored.max_recommendations):
+            return JsonResponse(dict(stored.package, precomputed=True, computed_at=stored.computed_at.isoformat()))
+        result = recommend_subs_util(request.user, max_recommendations, budget_constraint, squad_data, gameweek,
+                                     time_limit_ms=time_limit_ms, prune=prune,
+                                     top_k=int(top_k) if top_k else None)
         return JsonResponse(result)
     except Exception as e:
         return JsonResponse({
@@ -1286,6 +1270,109 @@ def recommend_substitutes(request):
             'error': f'Substitute recommendation failed: {str(e)}'
         })
 
+@csrf_exempt
+def plan_transfers(request):
+    """
+    API endpoint to plan transfers for the user's saved squad over several gameweeks.
+    Expects POST data: { "gameweek": 8, "horizon": 5, "free_transfers": 1, "budget_constraint": 100.0 }
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Only POST method allowed'})
+    try:
+        from MyApi.utils.transfer_planner import plan_transfers as plan_transfers_util
+        data = json.loads(request.body) if request.body else {}
+        gameweek = data.get('gameweek') or request.headers.get('Gameweek')
+        if not gameweek:
+            return JsonResponse({'success': False, 'error': 'Missing gameweek in request.'}, status=400)
+        result = plan_transfers_util(
+            request.user,
+            int(gameweek),
+            horizon=int(data.get('horizon', 5)),
+            free_transfers=int(data.get('free_transfers', 1)),
+            budget_constraint=float(data.get('budget_constraint', 100.0)),
+            top_k=int(data.get('top_k', 15)),
+            time_limit_ms=data.get('time_limit_ms')
+        )
+        return JsonResponse(result)
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': f'Transfer planning failed: {str(e)}'
+        })
+
+@csrf_exempt
+def squad_leaderboard(request):
+    """
+    Leaderboard of all saved squads for a gameweek by projected or actual points.
+    Query params: gameweek (required), metric ('projected' or 'actual'), limit
+    """
+    if request.method != 'GET':
+        return JsonResponse({'success': False, 'error': 'Only GET method allowed'})
+    try:
+        from MyApi.utils.squad_scoring import squad_leaderboard as squad_leaderboard_util
+        gameweek = request.GET.get('gameweek') or request.headers.get('Gameweek')
+        if not gameweek:
+            return JsonResponse({'success': False, 'error': 'Missing gameweek parameter.'}, status=400)
+        metric = request.GET.get('metric', 'projected')
+        limit = int(request.GET.get('limit', 50))
+        result = squad_leaderboard_util(int(gameweek), metric=metric, limit=limit)
+        return JsonResponse(dict(result, success=True, gameweek=int(gameweek), metric=metric))
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': f'Failed to build leaderboard: {str(e)}'})
+
+@csrf_exempt
+def squad_ownership(request):
+    """
+    Player ownership across saved squads for a gameweek.
+    Query params: gameweek (required), players (comma-separated, optional), limit
+    With players given, returns the users whose squads contain any of them.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'success': False, 'error': 'Only GET method allowed'})
+    try:
+        from MyApi.utils.squad_ownership import player_ownership, users_affected
+        gameweek = request.GET.get('gameweek') or request.headers.get('Gameweek')
+        if not gameweek:
+            return JsonResponse({'success': False, 'error': 'Missing gameweek parameter.'}, status=400)
+        players = [name.strip() for name in request.GET.get('players', '').split(',') if name.strip()]
+        if players:
+            users = users_affected(int(gameweek), players)
+            return JsonResponse({'success': True, 'gameweek': int(gameweek), 'players': players,
+                                 'users_affected': len(users), 'users': users})
+        result = player_ownership(int(gameweek), limit=int(request.GET.get('limit', 50)))
+        return JsonResponse(dict(result, success=True, gameweek=int(gameweek)))
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': f'Failed to load ownership: {str(e)}'})
+
+@csrf_exempt
+def captaincy(request):
+    """
+    API endpoint to pick captain and vice-captain for a squad.
+    Expects POST data: { "squad": {...}, "gameweek": 9, "simulations": 200 }
+    The nightly pick is served when it was computed with the requested
+    simulations (default DEFAULT_CAPTAIN_SIMULATIONS); 'method' says which was used.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Only POST method allowed'})
+    try:
+        data = json.loads(request.body) if request.body else {}
+        squad_data = data.get('squad')
+        gameweek = data.get('gameweek') or request.headers.get('Gameweek')
+        if not squad_data or not gameweek:
+            return JsonResponse({'success': False, 'error': 'Missing squad or gameweek in request.'}, status=400)
+        from MyApi.utils.batch_recommendations import DEFAULT_CAPTAIN_SIMULATIONS, get_stored_recommendation
+        simulations = data.get('simulations')
+        simulations = DEFAULT_CAPTAIN_SIMULATIONS if simulations in (None, '') else int(simulations)
+        stored = get_stored_recommendation(request.user, gameweek, squad_data)
+        if stored and stored.captaincy and stored.captaincy.get('simulations') == simulations:
+            return JsonResponse(dict(stored.captaincy, success=True, precomputed=True, method='precomputed'))
+        from MyApi.utils.captaincy import captain_for_squad
+        result = captain_for_squad(squad_data, int(gameweek), simulations=simulations)
+        return JsonResponse(dict(result, success=True, precomputed=False, method='computed',
+                                 simulations=simulations))
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': f'Captain selection failed: {str(e)}'})
+
 @csrf_exempt
 def recommend_individual_substitutes_api(request):
     """
@@ -1301,6 +1388,10 @@ def recommend_individual_substitutes_api(request):
         gameweek = data.get('gameweek')
         if not squad_data:
             return JsonResponse({'success': False, 'error': 'Missing squad data in request.'}, status=400)
+        from MyApi.utils.batch_recommendations import get_stored_recommendation
+        stored = get_stored_recommendation(request.user, gameweek, squad_data)
+        if stored and budget_constraint == stored.individual_budget:
+            return JsonResponse({'success': True, 'recommendations': stored.individual, 'precomputed': True})
         from MyApi.utils.recommend_substitutes import recommend_individual_substitutes
         result = recommend_individual_substitutes(request.user, budget_constraint=budget_constraint, squad_data=squad_data, gameweek=gameweek)
         return JsonResponse({'success': True, 'recommendations': result})
@@ -0,0 +1,119 @@
+"""
+Django management command to backtest squad selection strategies over a season.
+Replays the season week by week from PlayerMatch and reports the actual points each strategy would have scored.
+"""
+
+import json
+from django.core.management.base import BaseCommand, CommandError
+from MyApi.utils.backtester import (
+    DEFAULT_BACKTEST_TIME_LIMIT_MS,
+    DEFAULT_GAMES_TO_CONSIDER,
+    FORMATIONS,
+    STRATEGIES,
+    run_backtest,
+)
+
+
+class Command(BaseCommand):
+    help = 'Backtest Elo and points squad selection against actual points for a season'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--season',
+            type=str,
+            help='Season to replay (e.g., --season 2024-2025), defaults to the current season',
+        )
+        parser.add_argument(
+            '--strategy',
+            action='append',
+            choices=sorted(STRATEGIES),
+            help='Strategy to include (repeatable, defaults to all)',
+        )
+        parser.add_argument(
+            '--formation',
+            type=str,
+            default='3-4-3',
+            choices=sorted(FORMATIONS),
+            help='Starting formation',
+        )
+        parser.add_argument(
+            '--budget',
+            type=float,
+            help='Budget per pick (defaults to 82.5, or 100.0 with --full-squad)',
+        )
+        parser.add_argument(
+            '--full-squad',
+            action='store_true',
+            help='Pick 15-player squads and score the starting XI',
+        )
+        parser.add_argument(
+            '--start-gameweek',
+            type=int,
+            help='First gameweek to replay',
+        )
+        parser.add_argument(
+            '--end-gameweek',
+            type=int,
+            help='Last gameweek to replay',
+        )
+        parser.add_argument(
+            '--time-limit-ms',
+            type=int,
+            default=DEFAULT_BACKTEST_TIME_LIMIT_MS,
+            help='Solve time limit per pick in milliseconds',
+        )
+        parser.add_argument(
+            '--games-to-consider',
+            type=int,
+            default=DEFAULT_GAMES_TO_CONSIDER,
+            help='Upcoming fixtures summed into the points projection',
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Write the full weekly results to this JSON file',
+        )
+
+    def handle(self, *args, **options):
+        strategies = options['strategy'] or sorted(STRATEGIES)
+        try:
+            result = run_backtest(
+                season=options['season'],
+                strategies=strategies,
+                formation=options['formation'],
+                budget=options['budget'],
+                full_squad=options['full_squad'],
+                start_gameweek=options['start_gameweek'],
+                end_gameweek=options['end_gameweek'],
+                time_limit_ms=options['time_limit_ms'],
+                games_to_consider=options['games_to_consider'],
+            )
+        except Exception as e:
+            raise CommandError(f'Error running backtest: {str(e)}')
+
+        if not result['gameweeks']:
+            raise CommandError(f"No gameweek matches found for season {result['season']}")
+
+        self.stdout.write(
+            f"Season {result['season']}, GW{result['gameweeks'][0]}-{result['gameweeks'][-1]}, "
+            f"{result['formation']}, budget {result['budget']}"
+        )
+        header = 'GW'.ljust(6) + ''.join(s.rjust(10) for s in strategies)
+        self.stdout.write(header)
+        for row, gameweek in enumerate(result['gameweeks']):
+            points = ''.join(
+                f"{result['strategies'][s]['weeks'][row]['points']:10.0f}" for s in strategies
+            )
+            self.stdout.write(str(gameweek).ljust(6) + points)
+
+        for strategy in strategies:
+            summary = result['strategies'][strategy]
+            self.stdout.write(self.style.SUCCESS(
+                f"{strategy}: {summary['total_points']:.0f} points ({summary['average_points']} per gameweek)"
+            ))
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(result, f, indent=2)
+            self.stdout.write(f"Weekly results written to {options['output']}")
+        self.stdout.write(f"Completed in {result['elapsed']}s")
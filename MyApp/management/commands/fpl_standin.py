@@ -0,0 +1,116 @@
+"""
+Django management command to run a local stand-in for the FPL API.
+
+Serves synthetic or recorded payloads for offline runs and load tests, or
+with --benchmark imports the current gameweek against an in-process
+stand-in and reports throughput.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from asgiref.sync import async_to_sync
+
+
+class Command(BaseCommand):
+    help = 'Serve a local FPL API stand-in (synthetic or recorded payloads), or benchmark the importer against one'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+        parser.add_argument('--port', type=int, default=8100, help='Port to bind')
+        parser.add_argument(
+            '--recorded',
+            nargs='?',
+            const=str(getattr(settings, 'FPL_HTTP_CACHE_DIR', '')),
+            help='Serve responses recorded in this FPL HTTP cache directory (default: FPL_HTTP_CACHE_DIR) '
+                 'instead of a synthetic season',
+        )
+        parser.add_argument('--players', type=int, default=700, help='Synthetic players')
+        parser.add_argument('--teams', type=int, default=20, help='Synthetic teams (even)')
+        parser.add_argument('--gameweek', type=int, default=8, help='Synthetic current gameweek')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for payloads, latency and errors')
+        parser.add_argument('--latency-ms', type=float, default=0, help='Delay added to every response')
+        parser.add_argument('--jitter-ms', type=float, default=0, help='Extra random delay of up to this many ms')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with an error')
+        parser.add_argument('--error-status', type=int, default=503, help='Status of injected errors')
+        parser.add_argument(
+            '--benchmark',
+            action='store_true',
+            help='Import the current gameweek against an in-process stand-in (database changes are rolled back)',
+        )
+        parser.add_argument('--import-mode', choices=('history', 'live'), help='Import mode for --benchmark')
+        parser.add_argument('--concurrency', type=int, help='Concurrent requests for --benchmark')
+
+    def handle(self, *args, **options):
+        from aiohttp import web
+        from MyApi.utils.fpl_standin import RecordedPayloads, SyntheticSeason, create_app
+
+        try:
+            if options['recorded']:
+                source = RecordedPayloads(options['recorded'])
+                self.stdout.write(f"Serving {len(source.bodies)} recorded responses from {options['recorded']}")
+            else:
+                source = SyntheticSeason(
+                    players=options['players'], teams=options['teams'],
+                    current_gameweek=options['gameweek'], seed=options['seed'],
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Error preparing stand-in payloads: {str(e)}')
+
+        server_options = {
+            'latency_ms': options['latency_ms'],
+            'jitter_ms': options['jitter_ms'],
+            'error_rate': options['error_rate'],
+            'error_status': options['error_status'],
+            'seed': options['seed'],
+        }
+
+        if options['benchmark']:
+            self.benchmark(source, server_options, options['import_mode'], options['concurrency'])
+            return
+
+        base_url = f"http://{options['host']}:{options['port']}/api/"
+        self.stdout.write(self.style.SUCCESS(f'FPL stand-in listening on {base_url}'))
+        self.stdout.write(
+            f'Use it with FPL_API_BASE_URL={base_url} FPL_API_ALLOW_CUSTOM_BASE_URL=1 '
+            f'(and FPL_HTTP_CACHE_MODE=off for load tests); imports then write its synthetic data '
+            f'to the configured database, so point them at a scratch copy'
+        )
+        web.run_app(create_app(source, **server_options), host=options['host'], port=options['port'], print=None)
+
+    def benchmark(self, source, server_options, import_mode, concurrency):
+        from MyApi.utils.fpl_standin import running_standin
+        from MyApi.utils.gameweek_importer import get_current_gameweek_data
+
+        async def run():
+            async with running_standin(source, **server_options) as (base_url, stats):
+                # Allowed here because every write is rolled back below
+                with override_settings(FPL_API_BASE_URL=base_url, FPL_API_ALLOW_CUSTOM_BASE_URL=True,
+                                       FPL_HTTP_CACHE_MODE='off'):
+                    start = time.perf_counter()
+                    result = await get_current_gameweek_data(concurrency=concurrency, mode=import_mode)
+                    return result, dict(stats), time.perf_counter() - start
+
+        # The importer's database work runs on this thread, so it can all be rolled back
+        with transaction.atomic():
+            result, stats, duration = async_to_sync(run)()
+            transaction.set_rollback(True)
+
+        if not result.get('success'):
+            raise CommandError(f"Benchmark import failed: {result.get('error')}")
+        fetch_stats = result['fetch_stats']
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported gameweek {result['gameweek']} ({result['mode']} mode): "
+            f"{result['new_matches'] + result['updated_matches'] + result['skipped_matches']} matches, "
+            f"{result['errors']} errors in {duration:.2f}s "
+            f"({result['total_players'] / duration:.1f} players/s)"
+        ))
+        self.stdout.write(
+            f"Requests: {fetch_stats['requests']} timed ({fetch_stats['retries']} retries, "
+            f"mean {fetch_stats['mean_request_time']}s, p95 {fetch_stats['p95_request_time']}s, "
+            f"max {fetch_stats['max_request_time']}s)"
+        )
+        self.stdout.write(f"Stand-in: {stats}")
@@ -0,0 +1,98 @@
+"""
+Django management command to precompute substitute recommendations and captain picks for all saved squads.
+Intended to run nightly, after the projection refresh.
+"""
+
+import asyncio
+from django.core.management.base import BaseCommand, CommandError
+from MyApi.utils.batch_recommendations import (
+    DEFAULT_BATCH_TIME_LIMIT_MS,
+    DEFAULT_CAPTAIN_SIMULATIONS,
+    DEFAULT_INDIVIDUAL_BUDGET,
+    DEFAULT_PACKAGE_BUDGET,
+    precompute_recommendations,
+)
+
+
+class Command(BaseCommand):
+    help = 'Precompute substitute recommendations and captain picks for every UserSquad of a gameweek'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--gameweek',
+            type=int,
+            help='Squad gameweek to process (defaults to the next fixture gameweek)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Number of squads solved in parallel',
+        )
+        parser.add_argument(
+            '--budget',
+            type=float,
+            default=DEFAULT_PACKAGE_BUDGET,
+            help='Budget for package recommendations',
+        )
+        parser.add_argument(
+            '--individual-budget',
+            type=float,
+            default=DEFAULT_INDIVIDUAL_BUDGET,
+            help='Budget for individual recommendations',
+        )
+        parser.add_argument(
+            '--max-recommendations',
+            type=int,
+            default=4,
+            help='Maximum substitutions per package',
+        )
+        parser.add_argument(
+            '--time-limit-ms',
+            type=int,
+            default=DEFAULT_BATCH_TIME_LIMIT_MS,
+            help='Solve time limit per squad in milliseconds',
+        )
+        parser.add_argument(
+            '--captain-simulations',
+            type=int,
+            default=DEFAULT_CAPTAIN_SIMULATIONS,
+            help='Simulated samples per player for captain picks (0 uses projections only)',
+        )
+        parser.add_argument(
+            '--refresh-projections',
+            action='store_true',
+            help='Recalculate projected points before computing recommendations',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options['refresh_projections']:
+                from MyApi.utils.projected_points_calculator import calculate_and_store_projected_points
+                self.stdout.write('Refreshing projected points...')
+                refresh = asyncio.run(calculate_and_store_projected_points())
+                if not refresh.get('success'):
+                    raise CommandError(f"Projection refresh failed: {refresh.get('error')}")
+
+            result = precompute_recommendations(
+                gameweek=options['gameweek'],
+                workers=options['workers'],
+                package_budget=options['budget'],
+                individual_budget=options['individual_budget'],
+                max_recommendations=options['max_recommendations'],
+                time_limit_ms=options['time_limit_ms'],
+                captain_simulations=options['captain_simulations'],
+            )
+        except CommandError:
+            raise
+        except Exception as e:
+            raise CommandError(f'Error precomputing recommendations: {str(e)}')
+
+        message = (
+            f"GW{result['gameweek']}: stored {result['stored']}/{result['squads']} squads "
+            f"({result['failed']} failed) in {result['elapsed']}s, captains in {result['captain_time']}s"
+        )
+        if result['success']:
+            self.stdout.write(self.style.SUCCESS(message))
+        else:
+            self.stdout.write(self.style.WARNING(message))
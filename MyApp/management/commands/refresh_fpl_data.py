@@ -0,0 +1,93 @@
+"""
+Django management command to refresh FPL data in one run.
+
+The gameweek import, FPL id linking, position, cost and fixture steps share
+one pooled FPL API client, so bootstrap-static is downloaded once and
+connections are reused across steps.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from asgiref.sync import async_to_sync, sync_to_async
+
+
+STEPS = ('import', 'link', 'positions', 'costs', 'fixtures')
+
+
+class Command(BaseCommand):
+    help = 'Refresh gameweek data, FPL ids, positions, costs and fixtures from the FPL API with one shared client'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--step',
+            action='append',
+            choices=STEPS,
+            dest='steps',
+            help='Step to run; repeat for several (default: all, in order)',
+        )
+        parser.add_argument(
+            '--week',
+            type=int,
+            help='Week to update positions and costs for (default: current gameweek)',
+        )
+        parser.add_argument(
+            '--import-mode',
+            choices=('history', 'live'),
+            help='Gameweek import mode (default: settings.FPL_GAMEWEEK_IMPORT_MODE)',
+        )
+        parser.add_argument(
+            '--next-gameweeks',
+            type=int,
+            default=3,
+            help='Upcoming gameweeks to refresh fixtures for',
+        )
+
+    def handle(self, *args, **options):
+        steps = [step for step in STEPS if step in (options['steps'] or STEPS)]
+        try:
+            results, stats = async_to_sync(self.refresh)(
+                steps, options['week'], options['next_gameweeks'], options['import_mode']
+            )
+        except Exception as e:
+            raise CommandError(f'Error refreshing FPL data: {str(e)}')
+
+        failed = []
+        for step in steps:
+            result = results[step]
+            if result.get('success'):
+                self.stdout.write(self.style.SUCCESS(f'{step}: done'))
+            else:
+                failed.append(step)
+                self.stdout.write(self.style.ERROR(f"{step}: {result.get('error', 'failed')}"))
+        self.stdout.write(
+            f"FPL requests: {stats['downloads']} downloaded, {stats['hits']} from cache, "
+            f"{stats['revalidated']} revalidated, {stats['retries']} retried"
+        )
+        if failed:
+            raise CommandError(f"Failed steps: {', '.join(failed)}")
+
+    async def refresh(self, steps, week, next_gameweeks, import_mode=None):
+        from MyApi.models import SystemSettings
+        from MyApi.utils.fpl_client import fpl_client
+        from MyApi.utils.fpl_cost_updater import update_all_player_costs_from_fpl
+        from MyApi.utils.fpl_identity import link_fpl_ids_from_fpl
+        from MyApi.utils.fpl_position_updater import update_player_positions_from_fpl
+        from MyApi.utils.gameweek_importer import get_current_gameweek_data
+        from MyApi.utils.projected_points_calculator import refresh_fixtures_util
+
+        results = {}
+        async with fpl_client() as client:
+            for step in steps:
+                self.stdout.write(f'Running {step}...')
+                # The import step can move the current gameweek on, so resolve it per step
+                current_week = week or await sync_to_async(SystemSettings.get_current_gameweek)()
+                if step == 'import':
+                    results[step] = await get_current_gameweek_data(mode=import_mode)
+                elif step == 'link':
+                    results[step] = await link_fpl_ids_from_fpl()
+                elif step == 'positions':
+                    results[step] = await update_player_positions_from_fpl(current_week)
+                elif step == 'costs':
+                    results[step] = await update_all_player_costs_from_fpl(current_week, show_progress=False)
+                elif step == 'fixtures':
+                    results[step] = await refresh_fixtures_util(next_gameweeks=next_gameweeks)
+            return results, dict(client.session.stats)
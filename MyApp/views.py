@@ -193,30 +193,31 @@ def player_ratings(request):
 def player_info(request, player_name):
     """
     Display detailed information for a specific player including match history and Elo chart.
+    The URL may name the player or give their FPL element id.
     """
-    from MyApi.models import PlayerMatch, EloCalculation
+    from MyApi.models import PlayerMatch, EloCalculation, Player
     from django.db.models import Q
     from urllib.parse import unquote
     
     # URL decode the player name
     player_name = unquote(player_name)
     
-    # Try exact match first
-    matches = PlayerMatch.objects.filter(player_name=player_name).order_by('-date')[:50]
-    
-    # If no exact match, try with spaces replaced by underscores
-    if not matches.exists():
-        player_name_with_underscores = player_name.replace(' ', '_')
-        matches = PlayerMatch.objects.filter(player_name=player_name_with_underscores).order_by('-date')[:50]
-        if matches.exists():
-            player_name = player_name_with_underscores
+    # Resolve the player's FPL id: given directly, or from a Player row with the
+    # name written with spaces or underscores
+    name_variants = {player_name, player_name.replace(' ', '_'), player_name.replace('_', ' ')}
+    if player_name.isdigit():
+        fpl_id = int(player_name)
+    else:
+        fpl_id = Player.objects.filter(
+            name__in=name_variants, fpl_id__isnull=False
+        ).order_by('-week').values_list('fpl_id', flat=True).first()
     
-    # If still no match, try with underscores replaced by spaces
-    if not matches.exists():
-        player_name_with_spaces = player_name.replace('_', ' ')
-        matches = PlayerMatch.objects.filter(player_name=player_name_with_spaces).order_by('-date')[:50]
-        if matches.exists():
-            player_name = player_name_with_spaces
+    # Linked matches by id, plus any not yet linked under one of the names
+    if fpl_id is not None:
+        player_filter = Q(fpl_id=fpl_id) | Q(player_name__in=name_variants, fpl_id__isnull=True)
+    else:
+        player_filter = Q(player_name__in=name_variants)
+    matches = PlayerMatch.objects.filter(player_filter).order_by('-date')[:50]
     
     if not matches.exists():
         # Try to find similar player names (case-insensitive partial match)
@@ -245,11 +246,11 @@ def player_info(request, player_name):
     # Try to get team from Player model for current week, fallback to any week
     player_team = None
     try:
-        from MyApi.models import Player
-        player_obj = Player.objects.filter(name=actual_player_name, week=current_week).first()
+        player_lookup = Player.objects.filter(fpl_id=fpl_id) if fpl_id is not None else Player.objects.filter(name=actual_player_name)
+        player_obj = player_lookup.filter(week=current_week).first()
         if not player_obj:
             # Fallback to any week if current week not found
-            player_obj = Player.objects.filter(name=actual_player_name).order_by('-week').first()
+            player_obj = player_lookup.order_by('-week').first()
         
         if player_obj and player_obj.team:
             player_team = player_obj.team
@@ -267,9 +268,7 @@ def player_info(request, player_name):
     current_elo = matches.first().elo_after_match if matches.exists() else 0
     
     # Prepare Elo history data for chart (most recent 20 matches in chronological order)
-    elo_history_recent_desc = PlayerMatch.objects.filter(
-        player_name=actual_player_name
-    ).order_by('-date')[:20]
+    elo_history_recent_desc = PlayerMatch.objects.filter(player_filter).order_by('-date')[:20]
     elo_history = list(elo_history_recent_desc)[::-1]  # reverse to chronological
     elo_data = {
         'dates': [m.date.strftime('%Y-%m-%d') for m in elo_history],